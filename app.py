@@ -8,32 +8,198 @@ Uses Supabase REST API directly to avoid dependency conflicts.
 
 import gradio as gr
 import os
+import sys
+import threading
 import httpx
 
+from db import count_from_content_range
+from health import HealthProbe
+from matching import SEARCH_COLUMNS, SEARCH_KEY_COLUMNS, MatchEngine, ProfileRecord
+from semantic import open_vector_store
+from profile_cache import ProfileCache
+from profile_sync import ProfileReplica, start_thread_worker
+from single_flight import SingleFlight
+from profiling import Profiler
+
 # Supabase connection
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")
 
+_profile_cache = ProfileCache(
+    ttl=float(os.environ.get("PROFILE_CACHE_TTL", 30)),
+    max_entries=int(os.environ.get("PROFILE_CACHE_SIZE", 1000)),
+    list_item=ProfileRecord.from_row
+)
+_match_engine: MatchEngine = None
+# Background rebuild for a newer profile list, and the changes to replay onto it
+_engine_rebuild: threading.Thread = None
+_rebuild_changes = []
+_engine_lock = threading.Lock()
+# Semantic vectors kept across restarts (use a directory of its own, not server.py's)
+_vector_store = open_vector_store(os.environ.get("SEMANTIC_VECTORS_DIR", ""))
+# Concurrent Gradio sessions share one in-flight profile load / engine build
+_flights = SingleFlight()
+_health_probe = HealthProbe(
+    ttl=float(os.environ.get("HEALTH_CACHE_TTL", 5)),
+    count_method=os.environ.get("HEALTH_COUNT", "estimated")
+)
+
+# PROFILE_SEARCH_KEYS=1 reads the normalized keys stored by the MCP server (sql/004)
+PROFILE_COLUMNS = SEARCH_KEY_COLUMNS if os.environ.get("PROFILE_SEARCH_KEYS", "") == "1" else SEARCH_COLUMNS
+
+# PROFILE_SYNC_INTERVAL>0 serves reads from an in-memory replica that polls
+# for rows changed since the last updated_at watermark (sql/003)
+PROFILE_SYNC_INTERVAL = float(os.environ.get("PROFILE_SYNC_INTERVAL", 0))
+PROFILE_SYNC_RECONCILE = float(os.environ.get("PROFILE_SYNC_RECONCILE", 300))
+_replica = ProfileReplica(transform=ProfileRecord.from_row)
+_replica_thread: threading.Thread = None
+_replica_lock = threading.Lock()
+
+# PROFILER=cprofile|sampling profiles PROFILER_RATE of the handler calls and
+# writes <handler>.pstats / <handler>.collapsed files to PROFILER_DIR
+_profiler = Profiler(
+    mode=os.environ.get("PROFILER", ""),
+    rate=float(os.environ.get("PROFILER_RATE", 0.01)),
+    directory=os.environ.get("PROFILER_DIR", "profiles"),
+    interval=float(os.environ.get("PROFILER_INTERVAL_MS", 5)) / 1000
+)
+
+
+def _rest_get(table: str, params: dict) -> list:
+    """GET /rest/v1/<table> with PostgREST query params."""
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}"
+    }
+    response = httpx.get(f"{SUPABASE_URL}/rest/v1/{table}", params=params, headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def _fetch_profiles() -> list:
+    return [ProfileRecord.from_row(row) for row in _rest_get("profiles", {"select": PROFILE_COLUMNS})]
+
+
+def _count_profiles(count_method: str) -> int:
+    """HEAD request with a row count - no profile rows are transferred."""
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Prefer": f"count={count_method}"
+    }
+    response = httpx.head(f"{SUPABASE_URL}/rest/v1/profiles", params={"select": "id"}, headers=headers, timeout=5)
+    response.raise_for_status()
+    return count_from_content_range(response.headers.get("content-range"))
+
+
+def _fetch_profile_changes(since, offset: int, limit: int) -> list:
+    params = {"select": f"{PROFILE_COLUMNS},updated_at", "order": "updated_at.asc,id.asc", "limit": limit, "offset": offset}
+    if since is not None:
+        params["updated_at"] = f"gte.{since}"
+    return _rest_get("profiles", params)
+
+
+def _fetch_profile_ids(offset: int, limit: int) -> list:
+    return _rest_get("profiles", {"select": "id", "order": "id.asc", "limit": limit, "offset": offset})
+
+
+def _ensure_profile_sync():
+    """Start the sync worker thread (once)."""
+    global _replica_thread
+    if PROFILE_SYNC_INTERVAL <= 0 or _replica_thread is not None:
+        return
+    with _replica_lock:
+        if _replica_thread is None:
+            _replica_thread = start_thread_worker(
+                _replica, _fetch_profile_changes, _fetch_profile_ids,
+                poll_interval=PROFILE_SYNC_INTERVAL,
+                reconcile_interval=PROFILE_SYNC_RECONCILE
+            )
+
+
+def _update_engine(engine: MatchEngine, records: list, deleted_ids: list):
+    if records:
+        engine.upsert_many(records)
+    for profile_id in deleted_ids:
+        engine.remove(profile_id)
+
+
+def _apply_profile_changes(records: list, deleted_ids: list):
+    """Keep the match engine (and a rebuild in progress) in step with the replica."""
+    with _engine_lock:
+        if _match_engine is not None:
+            _update_engine(_match_engine, records, deleted_ids)
+        if _engine_rebuild is not None and _engine_rebuild.is_alive():
+            _rebuild_changes.append((records, deleted_ids))
+
+
+_replica.subscribe(_apply_profile_changes)
+
 
 def load_profiles() -> list:
-    """Load all profiles from Supabase via REST API."""
+    """Load all profiles from Supabase via REST API (replica or cached, see README)."""
     if not SUPABASE_URL or not SUPABASE_KEY:
         return []
 
+    _ensure_profile_sync()
+    if _replica.ready:
+        return _replica.snapshot()
+
     try:
-        url = f"{SUPABASE_URL}/rest/v1/profiles?select=*"
-        headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}"
-        }
-        response = httpx.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return _flights.do("profiles", lambda: _profile_cache.get_all(_fetch_profiles))
     except Exception as e:
-        print(f"Error loading profiles: {e}")
+        print(f"Error loading profiles: {e}", file=sys.stderr)
         return []
 
 
+def get_match_engine() -> MatchEngine:
+    """
+    Get the match engine. Only the first call waits for a build; after a
+    reload brought a different profile list, or once changes left the engine
+    mostly dead entries, the current engine keeps serving while the new one
+    is built in a background thread.
+    """
+    global _match_engine, _engine_rebuild
+    profiles = load_profiles()
+    generation = ("replica", _replica.generation) if _replica.ready else ("cache", _profile_cache.generation)
+    if _match_engine is None:
+        _match_engine = _flights.do(("engine", generation), lambda: _build_match_engine(profiles, generation))
+    elif _match_engine.generation != generation or _match_engine.needs_compaction:
+        with _engine_lock:
+            if _engine_rebuild is None or not _engine_rebuild.is_alive():
+                if _match_engine.generation == generation:
+                    # Same list, compacted: changes since the snapshot are replayed
+                    profiles = _match_engine.live_profiles()
+                _rebuild_changes.clear()
+                _engine_rebuild = threading.Thread(
+                    target=_rebuild_match_engine, args=(profiles, generation), name="match-engine-rebuild", daemon=True
+                )
+                _engine_rebuild.start()
+    return _match_engine
+
+
+def _rebuild_match_engine(profiles: list, generation):
+    """Build the engine for a newer list and swap it in once it is complete."""
+    global _match_engine
+    try:
+        engine = _build_match_engine(profiles, generation, _match_engine)
+    except Exception as e:
+        print(f"Error rebuilding the match engine: {e}", file=sys.stderr)
+        engine = None
+    with _engine_lock:
+        if engine is not None:
+            # Changes that reached the old engine during the build
+            for records, deleted_ids in _rebuild_changes:
+                _update_engine(engine, records, deleted_ids)
+            _match_engine = engine
+
+
+def _build_match_engine(profiles: list, generation, previous: MatchEngine = None) -> MatchEngine:
+    engine = MatchEngine(profiles, previous=previous, vector_store=_vector_store)
+    engine.generation = generation
+    return engine
+
+
 def find_matches(query: str) -> str:
     """Search for collaborators matching the query."""
     if not query.strip():
@@ -42,60 +208,16 @@ def find_matches(query: str) -> str:
     if not SUPABASE_URL or not SUPABASE_KEY:
         return "**Error:** Database not connected. Please configure SUPABASE_URL and SUPABASE_KEY."
 
-    profiles = load_profiles()
-    query_lower = query.lower()
-    matches = []
-
-    for profile in profiles:
-        score = 0
-        reasons = []
-
-        # Check offers
-        for offer in profile.get("offers") or []:
-            if query_lower in offer.lower():
-                score += 3
-                reasons.append(f"Offers: {offer}")
-
-        # Check seeks (reciprocal matching)
-        for seek in profile.get("seeks") or []:
-            if query_lower in seek.lower():
-                score += 2
-                reasons.append(f"Seeks: {seek}")
-
-        # Check skills
-        for skill in profile.get("skills") or []:
-            if query_lower in skill.lower():
-                score += 2
-                reasons.append(f"Skill: {skill}")
-
-        # Check industry
-        for industry in profile.get("industry") or []:
-            if query_lower in industry.lower():
-                score += 1
-                reasons.append(f"Industry: {industry}")
-
-        # Check role
-        if query_lower in (profile.get("role") or "").lower():
-            score += 1
-            reasons.append("Role match")
-
-        if score > 0:
-            matches.append({
-                "profile": profile,
-                "score": score,
-                "reasons": reasons
-            })
-
-    # Sort by score
-    matches.sort(key=lambda x: x["score"], reverse=True)
+    # Weighted scoring shared with the MCP server (matching.py)
+    matches_found, matches = get_match_engine().search(query, 5)
 
     if not matches:
         return f"No matches found for '{query}'.\n\nTry searching for:\n- python\n- marketing\n- e-commerce\n- automation"
 
     # Format results
-    output = f"## Found {len(matches)} match(es) for '{query}'\n\n"
+    output = f"## Found {matches_found} match(es) for '{query}'\n\n"
 
-    for i, match in enumerate(matches[:5], 1):
+    for i, match in enumerate(matches, 1):
         p = match["profile"]
         output += f"### {i}. {p.get('name', 'Unknown')}\n"
         output += f"**{p.get('role', '')}**\n\n"
@@ -114,28 +236,61 @@ def find_matches(query: str) -> str:
     return output
 
 
-def list_all_profiles() -> str:
-    """List all profiles in the network."""
+PROFILES_PAGE_SIZE = 25
+
+
+def _fetch_profiles_page(after_id: str) -> tuple:
+    """One page of profiles with id > after_id. Returns (rows, next_cursor or None)."""
+    params = {
+        "select": "id,name,role,industry,skills",
+        "order": "id.asc",
+        "limit": PROFILES_PAGE_SIZE + 1
+    }
+    if after_id:
+        params["id"] = f"gt.{after_id}"
+    rows = _rest_get("profiles", params)
+    has_more = len(rows) > PROFILES_PAGE_SIZE
+    rows = rows[:PROFILES_PAGE_SIZE]
+    return rows, rows[-1]["id"] if has_more else None
+
+
+def _profiles_page_view(cursors: list) -> tuple:
+    """Render the page that starts after cursors[-1]. Returns (table, cursors, next_cursor, info)."""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        return "**Error:** Database not connected. Please configure SUPABASE_URL and SUPABASE_KEY."
+        return [], cursors, None, "**Error:** Database not connected. Please configure SUPABASE_URL and SUPABASE_KEY."
 
-    profiles = load_profiles()
+    try:
+        rows, next_cursor = _fetch_profiles_page(cursors[-1])
+    except Exception as e:
+        return [], cursors, None, f"**Error:** {e}"
 
-    if not profiles:
-        return "No profiles found."
+    table = [
+        [
+            p.get("name", "Unknown"),
+            p.get("role", "N/A"),
+            ", ".join(p.get("industry") or []),
+            ", ".join((p.get("skills") or [])[:5])
+        ]
+        for p in rows
+    ]
+    info = f"Page {len(cursors)}" + ("" if next_cursor else " (last page)")
+    if not rows:
+        info = "No profiles found."
+    return table, cursors, next_cursor, info
 
-    output = f"## {len(profiles)} profiles in The Backroom\n\n"
 
-    for p in profiles:
-        output += f"### {p.get('name', 'Unknown')}\n"
-        output += f"- **Role:** {p.get('role', 'N/A')}\n"
-        industries = p.get("industry") or []
-        skills = p.get("skills") or []
-        output += f"- **Industry:** {', '.join(industries)}\n"
-        output += f"- **Skills:** {', '.join(skills[:5])}\n"
-        output += "\n"
+def first_profiles_page() -> tuple:
+    return _profiles_page_view([""])
+
+
+def next_profiles_page(cursors: list, next_cursor: str) -> tuple:
+    if not next_cursor:
+        return _profiles_page_view(cursors)
+    return _profiles_page_view(cursors + [next_cursor])
 
-    return output
+
+def previous_profiles_page(cursors: list, next_cursor: str) -> tuple:
+    return _profiles_page_view(cursors[:-1] or [""])
 
 
 def get_status() -> str:
@@ -143,11 +298,25 @@ def get_status() -> str:
     if not SUPABASE_URL or not SUPABASE_KEY:
         return "Not configured - set SUPABASE_URL and SUPABASE_KEY"
 
-    try:
-        profiles = load_profiles()
-        return f"Connected - {len(profiles)} profiles loaded"
-    except Exception as e:
-        return f"Error: {e}"
+    health = _health_probe.measure(_count_profiles)
+    if not health["ok"]:
+        return f"Error: {health['error']}"
+
+    cache = _profile_cache.stats()
+    status = (
+        f"Connected - {health['profiles_count']} profiles ({health['count_method']} count), "
+        f"database round trip {health['latency_ms']} ms"
+        f"{' (cached)' if health['cached'] else ''}"
+    )
+    if cache["age_seconds"] is not None:
+        status += (
+            f"\nProfile cache: {cache['profiles_cached']} profiles, age {cache['age_seconds']} s, "
+            f"hit ratio {cache['hit_ratio']}"
+        )
+    if _replica.ready:
+        replica = _replica.stats()
+        status += f"\nReplica: {replica['profiles']} profiles, lag {replica['lag_seconds']} s"
+    return status
 
 
 # Gradio UI
@@ -169,7 +338,7 @@ with gr.Blocks(title="The Backroom", theme=gr.themes.Soft()) as demo:
         results_output = gr.Markdown()
 
         search_btn.click(
-            fn=find_matches,
+            fn=_profiler.wrap(find_matches),
             inputs=query_input,
             outputs=results_output
         )
@@ -185,12 +354,34 @@ with gr.Blocks(title="The Backroom", theme=gr.themes.Soft()) as demo:
         )
 
     with gr.Tab("All Profiles"):
-        list_btn = gr.Button("Show All Profiles")
-        profiles_output = gr.Markdown()
+        # Page start IDs so far (for "Previous") and the start of the next page
+        profiles_cursors = gr.State([""])
+        profiles_next = gr.State(None)
+
+        with gr.Row():
+            prev_btn = gr.Button("Previous")
+            list_btn = gr.Button("Show Profiles", variant="primary")
+            next_btn = gr.Button("Next")
+        profiles_info = gr.Markdown()
+        profiles_table = gr.Dataframe(
+            headers=["Name", "Role", "Industry", "Skills"],
+            interactive=False
+        )
 
+        page_outputs = [profiles_table, profiles_cursors, profiles_next, profiles_info]
         list_btn.click(
-            fn=list_all_profiles,
-            outputs=profiles_output
+            fn=_profiler.wrap(first_profiles_page),
+            outputs=page_outputs
+        )
+        next_btn.click(
+            fn=_profiler.wrap(next_profiles_page),
+            inputs=[profiles_cursors, profiles_next],
+            outputs=page_outputs
+        )
+        prev_btn.click(
+            fn=_profiler.wrap(previous_profiles_page),
+            inputs=[profiles_cursors, profiles_next],
+            outputs=page_outputs
         )
 
     with gr.Tab("Status"):
@@ -198,7 +389,7 @@ with gr.Blocks(title="The Backroom", theme=gr.themes.Soft()) as demo:
         status_output = gr.Textbox(label="Database Status", interactive=False)
 
         status_btn.click(
-            fn=get_status,
+            fn=_profiler.wrap(get_status),
             outputs=status_output
         )
 
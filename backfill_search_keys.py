@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+The Backroom - One-off search_keys backfill
+Fills profiles.search_keys (sql/004) for rows written before the MCP server
+stored them, and repairs keys gone stale after edits outside the server.
+
+Walks the profiles table in id order (keyset pages, so concurrent writes do
+not shift pages) and only updates rows whose stored keys differ from
+normalize.search_keys(), so re-running it is cheap and safe.
+
+    export SUPABASE_URL="https://xxx.supabase.co"
+    export SUPABASE_KEY="your-key"
+    python backfill_search_keys.py [--dry-run]
+"""
+
+import asyncio
+import os
+import sys
+
+from db import Database
+from matching import SEARCH_KEY_COLUMNS
+from normalize import search_keys
+
+PAGE_SIZE = 500
+# Concurrent updates per page (well below SUPABASE_MAX_CONNECTIONS)
+CONCURRENCY = 10
+
+
+async def backfill(db: Database, dry_run: bool = False) -> dict:
+    """Bring every row's search_keys up to date; returns {"scanned", "updated"}."""
+    scanned = updated = 0
+    limit = asyncio.Semaphore(CONCURRENCY)
+
+    async def update(profile_id: str, keys: list):
+        async with limit:
+            await db.table("profiles").update({"search_keys": keys}).eq("id", profile_id).execute()
+
+    after_id = None
+    while True:
+        query = db.table("profiles").select(SEARCH_KEY_COLUMNS)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        rows = (await query.order("id").limit(PAGE_SIZE).execute()).data or []
+        if not rows:
+            break
+
+        stale = [(row["id"], keys) for row in rows if (keys := search_keys(row)) != (row.get("search_keys") or [])]
+        if not dry_run:
+            await asyncio.gather(*(update(profile_id, keys) for profile_id, keys in stale))
+        scanned += len(rows)
+        updated += len(stale)
+        after_id = rows[-1]["id"]
+        print(f"{scanned} scanned, {updated} {'stale' if dry_run else 'updated'}")
+
+    return {"scanned": scanned, "updated": updated}
+
+
+async def main():
+    url, key = os.environ.get("SUPABASE_URL", ""), os.environ.get("SUPABASE_KEY", "")
+    if not url or not key:
+        sys.exit("Set SUPABASE_URL and SUPABASE_KEY.")
+    db = Database(url, key, timeout=float(os.environ.get("SUPABASE_TIMEOUT", 30)))
+    try:
+        await backfill(db, dry_run="--dry-run" in sys.argv)
+    finally:
+        await db.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1 @@
+"""The Backroom - Benchmarks (synthetic corpus, PostgREST stand-in, scenario runner)."""
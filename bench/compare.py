@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+The Backroom - Compare two benchmark result files
+
+    python -m bench.compare bench/results/before.json bench/results/after.json
+
+Prints each size/scenario present in both runs with the baseline and new
+p50/p95/p99 (cold_start: seconds) and the relative change; negative is faster.
+"""
+
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(old, new) -> str:
+    if old in (None, 0) or new is None:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(baseline: dict, candidate: dict) -> list:
+    lines = []
+    for size, scenarios in candidate["results"].items():
+        old_scenarios = baseline["results"].get(size) or {}
+        for scenario, new in scenarios.items():
+            old = old_scenarios.get(scenario)
+            if not isinstance(old, dict) or "skipped" in old or "skipped" in new:
+                continue
+            metrics = ("seconds",) if scenario == "cold_start" else METRICS
+            cells = [
+                f"{metric} {old.get(metric)} -> {new.get(metric)} ({_change(old.get(metric), new.get(metric))})"
+                for metric in metrics
+            ]
+            lines.append(f"{size:>5} {scenario:<26} " + "  ".join(cells))
+    return lines
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m bench.compare BASELINE.json CANDIDATE.json")
+    with open(sys.argv[1]) as f:
+        baseline = json.load(f)
+    with open(sys.argv[2]) as f:
+        candidate = json.load(f)
+    print(f"baseline {baseline['environment'].get('commit')}  candidate {candidate['environment'].get('commit')}")
+    print("\n".join(compare(baseline, candidate)) or "No scenarios in common.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+The Backroom - Synthetic benchmark corpus
+Deterministic profiles and connection requests at any scale.
+
+Skills, offers, seeks, tags, roles and industries are drawn from
+Zipf-distributed vocabularies, so a few terms are very common and most are
+rare, like in real profiles. Everything derives from the seed: the fake
+database and the benchmark client rebuild the same vocabularies and IDs
+without exchanging data.
+
+    corpus = Corpus(seed=42)
+    rows = list(corpus.profiles(10_000))
+    queries = corpus.queries(500)
+"""
+
+import datetime
+
+import numpy as np
+
+ZIPF_EXPONENT = 1.1
+
+_SKILLS = [
+    "python", "javascript", "typescript", "go", "rust", "java", "kotlin", "swift", "sql", "postgresql",
+    "react", "vue", "node.js", "django", "fastapi", "kubernetes", "docker", "terraform", "ansible", "aws",
+    "gcp", "azure", "linux", "networking", "security", "machine learning", "ai", "data analysis", "excel",
+    "figma", "ux design", "copywriting", "seo", "content marketing", "paid ads", "sales", "negotiation",
+    "public speaking", "product management", "project management", "scrum", "finance", "accounting",
+    "legal", "recruiting", "video editing", "photography", "e-commerce", "shopify", "automation",
+    # spellings the normalizer folds (k8s -> kubernetes, js -> javascript, ...)
+    "k8s", "js", "postgres", "golang", "reactjs", "ml",
+]
+_SKILL_QUALIFIERS = [
+    "advanced", "applied", "cloud", "enterprise", "mobile", "b2b", "startup", "growth", "data", "network",
+]
+_SERVICES = [
+    "consulting", "code reviews", "mentoring", "workshops", "audits", "coaching", "strategy", "feedback",
+    "introductions", "beta testing", "pair programming", "implementation",
+]
+_NEEDS = [
+    "co-founder", "beta testers", "investors", "marketing advice", "first customers", "a mentor",
+    "design help", "a technical partner", "feedback", "clients", "partners", "speaking gigs",
+]
+_ROLES = [
+    "Python Developer", "Backend Engineer", "Frontend Developer", "DevOps Engineer", "Data Scientist",
+    "Marketing Manager", "Growth Marketer", "Founder", "CTO", "Product Manager", "UX Designer",
+    "Sales Lead", "Consultant", "Network Engineer", "Freelancer", "Student", "Recruiter", "Copywriter",
+]
+_INDUSTRIES = [
+    "e-commerce", "saas", "fintech", "healthtech", "edtech", "gaming", "media", "consulting", "retail",
+    "manufacturing", "logistics", "real estate", "telecom", "energy", "public sector", "nonprofit",
+]
+_CITIES = ["Warszawa", "Kraków", "Wrocław", "Gdańsk", "Poznań", "Berlin", "London", "Remote", "Norfolk, VA"]
+_FIRST = ["Anna", "Piotr", "Magda", "Tomek", "Kasia", "Marek", "Ola", "Jan", "Ewa", "Snow", "Alex", "Sam"]
+
+
+class _Zipf:
+    """Finite Zipf distribution over a vocabulary (rank 1 most likely)."""
+
+    def __init__(self, words: list, exponent: float = ZIPF_EXPONENT):
+        self.words = words
+        weights = 1.0 / np.arange(1, len(words) + 1) ** exponent
+        self.p = weights / weights.sum()
+
+    def draw(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.choice(len(self.words), size=size, p=self.p)
+
+
+def _popular(rng: np.random.Generator, profiles: int, size: int) -> np.ndarray:
+    """User indexes with density falling off as 1/sqrt(index)."""
+    return (rng.random(size) ** 2 * profiles).astype(np.int64)
+
+
+class Corpus:
+    """Vocabularies, profiles, connection requests and queries from one seed."""
+
+    def __init__(self, seed: int = 42, vocabulary: int = 5000):
+        """
+        Args:
+            seed: everything generated derives from it
+            vocabulary: number of distinct skills (offers/seeks/tags scale with it)
+        """
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+
+        rare = [f"{q} {s}" for q in _SKILL_QUALIFIERS for s in _SKILLS]
+        rare += [f"skill{i}" for i in range(max(0, vocabulary - len(_SKILLS) - len(rare)))]
+        rng.shuffle(rare)
+        skills = list(_SKILLS) + rare  # well-known terms stay the most frequent
+        self.skills = _Zipf(skills[:vocabulary])
+        self.offers = _Zipf([f"{s} {service}" for s in skills[:vocabulary // 3] for service in _SERVICES[:3]])
+        self.seeks = _Zipf(list(_NEEDS) + [f"{s} {need}" for s in skills[:vocabulary // 10] for need in ("help", "expert")])
+        self.tags = _Zipf(skills[:vocabulary // 5])
+        self.roles = _Zipf(list(_ROLES))
+        self.industries = _Zipf(list(_INDUSTRIES))
+
+    @staticmethod
+    def profile_id(i: int) -> str:
+        # Zero-padded, so keyset pagination by id follows generation order
+        return f"user_{i:07d}"
+
+    def _rng(self, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream])
+
+    def profiles(self, count: int, chunk: int = 50_000):
+        """Yield count profile rows (dicts shaped like the profiles table)."""
+        rng = self._rng(1)
+        epoch = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        for start in range(0, count, chunk):
+            n = min(chunk, count - start)
+            sizes = {
+                "skills": rng.integers(3, 9, n),
+                "offers": rng.integers(1, 5, n),
+                "seeks": rng.integers(1, 5, n),
+                "tags": rng.integers(0, 6, n),
+                "industry": rng.integers(1, 3, n),
+            }
+            drawn = {
+                "skills": self.skills.draw(rng, int(sizes["skills"].sum())),
+                "offers": self.offers.draw(rng, int(sizes["offers"].sum())),
+                "seeks": self.seeks.draw(rng, int(sizes["seeks"].sum())),
+                "tags": self.tags.draw(rng, int(sizes["tags"].sum())),
+                "industry": self.industries.draw(rng, int(sizes["industry"].sum())),
+            }
+            vocab = {
+                "skills": self.skills.words, "offers": self.offers.words, "seeks": self.seeks.words,
+                "tags": self.tags.words, "industry": self.industries.words,
+            }
+            offsets = {field: 0 for field in drawn}
+            roles = self.roles.draw(rng, n)
+            cities = rng.integers(0, len(_CITIES), n)
+            names = rng.integers(0, len(_FIRST), n)
+            minutes = rng.integers(0, 60 * 24 * 365, n)
+
+            for j in range(n):
+                i = start + j
+                row = {"id": self.profile_id(i)}
+                for field, indexes in drawn.items():
+                    k = int(sizes[field][j])
+                    words = vocab[field]
+                    # dict.fromkeys: drop repeats, keep draw order
+                    row[field] = list(dict.fromkeys(words[x] for x in indexes[offsets[field]:offsets[field] + k]))
+                    offsets[field] += k
+                name = f"{_FIRST[names[j]]} {i}"
+                role = self.roles.words[roles[j]]
+                stamp = (epoch + datetime.timedelta(minutes=int(minutes[j]))).isoformat()
+                row.update({
+                    "name": name,
+                    "role": role,
+                    "location": _CITIES[cities[j]],
+                    "bio": f"{role} working on {', '.join(row['skills'][:2])}.",
+                    "offer_free": f"15-min call about {row['skills'][0]}",
+                    "offer_condition": "",
+                    "email": f"{row['id']}@example.com",
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                })
+                yield row
+
+    def connection_requests(self, profiles: int, count: int):
+        """
+        Yield up to count requests between the first `profiles` users.
+
+        Senders are uniform, recipients skewed towards the first users (the
+        most popular one gets about 2 * sqrt(count) requests); at most one
+        pending request per (from, to) pair.
+        """
+        rng = self._rng(2)
+        recipients = _popular(rng, profiles, count)
+        senders = rng.integers(0, profiles, count)
+        statuses = rng.choice(["pending", "accepted", "declined"], size=count, p=[0.7, 0.2, 0.1])
+        pending = set()
+        for i in range(count):
+            from_user, to_user = int(senders[i]), int(recipients[i])
+            status = str(statuses[i])
+            if from_user == to_user or (status == "pending" and (from_user, to_user) in pending):
+                continue
+            if status == "pending":
+                pending.add((from_user, to_user))
+            yield {
+                "id": f"req_{i:08d}",
+                "from_user": self.profile_id(from_user),
+                "to_user": self.profile_id(to_user),
+                "message": "Hi, would love to connect!",
+                "reason": "Shared interests",
+                "status": status,
+                "response_message": None,
+                "contact_shared": {},
+                "created_at": f"2025-06-01T00:00:{i % 60:02d}+00:00",
+                "responded_at": None,
+            }
+
+    def queries(self, count: int) -> list:
+        """Search queries: mostly one Zipf-drawn skill or offer, some two-term."""
+        rng = self._rng(3)
+        queries = []
+        for _ in range(count):
+            source = self.skills if rng.random() < 0.7 else self.offers
+            words = [source.words[i] for i in source.draw(rng, 2 if rng.random() < 0.2 else 1)]
+            queries.append(" ".join(words))
+        return queries
+
+    def categories(self, count: int) -> list:
+        """search_by_category arguments: (category, value) pairs and some filter expressions."""
+        rng = self._rng(4)
+        fields = [("skills", self.skills), ("offering", self.offers), ("seeking", self.seeks), ("industry", self.industries)]
+        out = []
+        for _ in range(count):
+            category, vocab = fields[int(rng.integers(0, len(fields)))]
+            value = vocab.words[int(vocab.draw(rng, 1)[0])]
+            if rng.random() < 0.2:
+                industry = self.industries.words[int(self.industries.draw(rng, 1)[0])]
+                out.append({"filters": f"{category}={value} AND industry={industry}"})
+            else:
+                out.append({"category": category, "value": value})
+        return out
+
+    def users(self, profiles: int, count: int, skewed: bool = False) -> list:
+        """Profile IDs to act as; skewed=True favours the users most requests go to."""
+        rng = self._rng(5 if skewed else 6)
+        if skewed:
+            indexes = _popular(rng, profiles, count)
+        else:
+            indexes = rng.integers(0, profiles, count)
+        return [self.profile_id(int(i)) for i in indexes]
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+The Backroom - In-memory PostgREST stand-in
+Serves the subset of the Supabase REST API that server.py and app.py use,
+from in-memory tables, over real HTTP - point SUPABASE_URL at it and both
+connect exactly as they do to Supabase:
+
+    python -m bench.fake_postgrest --profiles 100000 --port 54321
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=bench python server.py --http
+
+Supported: select (columns, to-one embeds like from:profiles!from_user(name),
+Prefer count=..., HEAD), eq/neq/gt/gte/lt/lte/in/is filters, order, limit, offset, insert/update/delete with
+return=representation, the profiles primary key and the one-pending-request
+unique index (409, code 23505), and the send_connection_request /
+respond_to_connection_request functions from sql/. Lookups by id, from_user
+and to_user are indexed and keyset pages by id bisect a sorted id list, so
+the stand-in stays cheap next to the server being measured. --latency-ms
+adds a fixed delay per request to model the network round trip.
+"""
+
+import argparse
+import asyncio
+import bisect
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+# Columns with an equality index, per table
+INDEXED = {
+    "profiles": ("id",),
+    "connection_requests": ("id", "from_user", "to_user"),
+}
+_MODIFIERS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+_IN_ITEM = re.compile(r'"((?:[^"\\]|\\.)*)"|([^,]+)')
+# alias:table!foreign_key(columns) - a to-one embed in select=
+_EMBED = re.compile(r"^(?:(\w+):)?(\w+)!(\w+)\((.*)\)$")
+
+
+def _select_items(value: str) -> list:
+    """Split select= at top-level commas: "*,from:profiles!from_user(name)"."""
+    items, depth, current = [], 0, ""
+    for char in value:
+        if char == "," and depth == 0:
+            items.append(current.strip())
+            current = ""
+            continue
+        depth += (char == "(") - (char == ")")
+        current += char
+    items.append(current.strip())
+    return [item for item in items if item]
+
+
+class PostgrestError(Exception):
+    def __init__(self, status: int, message: str, code: str = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _parse_in(value: str) -> set:
+    """Items of an in.(...) list: ("a","b\\"c",d) -> {'a', 'b"c', 'd'}."""
+    items = set()
+    for quoted, bare in _IN_ITEM.findall(value[1:-1]):
+        items.add(bare.strip() if bare else quoted.replace('\\"', '"').replace("\\\\", "\\"))
+    return items
+
+
+def _typed(current, value: str):
+    """Filter operand converted to the column value's type."""
+    if isinstance(current, bool):
+        return value == "true"
+    if isinstance(current, (int, float)):
+        return float(value)
+    return value
+
+
+def _matches(row: dict, column: str, op: str, value: str) -> bool:
+    current = row.get(column)
+    if op == "is":
+        return current is None if value == "null" else current is (value == "true")
+    if op == "in":
+        return current is not None and str(current) in _parse_in(value)
+    if current is None:
+        return False
+    operand = _typed(current, value)
+    if op == "eq":
+        return current == operand
+    if op == "neq":
+        return current != operand
+    if op == "gt":
+        return current > operand
+    if op == "gte":
+        return current >= operand
+    if op == "lt":
+        return current < operand
+    if op == "lte":
+        return current <= operand
+    raise PostgrestError(400, f"Unsupported operator: {op}", "PGRST100")
+
+
+class Table:
+    """Rows plus equality indexes and (for tables keyed by id) a sorted id list."""
+
+    def __init__(self, name: str, rows=()):
+        self.name = name
+        self.indexed = INDEXED.get(name, ())
+        self.rows = {}  # id -> row (insertion ordered)
+        self.index = {column: {} for column in self.indexed if column != "id"}  # column -> value -> {id: row}
+        self.sorted_ids = []
+        for row in rows:
+            self._add(row)
+        self.sorted_ids.sort()
+
+    def _add(self, row: dict, keep_sorted: bool = False):
+        self.rows[row["id"]] = row
+        for column, values in self.index.items():
+            values.setdefault(row.get(column), {})[row["id"]] = row
+        if keep_sorted:
+            bisect.insort(self.sorted_ids, row["id"])
+        else:
+            self.sorted_ids.append(row["id"])
+
+    def _remove(self, row: dict):
+        del self.rows[row["id"]]
+        for column, values in self.index.items():
+            values.get(row.get(column), {}).pop(row["id"], None)
+        i = bisect.bisect_left(self.sorted_ids, row["id"])
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == row["id"]:
+            del self.sorted_ids[i]
+
+    def candidates(self, filters: list, order: list):
+        """
+        Rows that may match, narrowed by an index when a filter allows it.
+        Returns (rows iterable, already_ordered).
+        """
+        for column, op, value in filters:
+            if op == "eq" and column == "id":
+                row = self.rows.get(value)
+                return ([row] if row is not None else []), True
+            if op == "eq" and column in self.index:
+                return list(self.index[column].get(value, {}).values()), False
+            if op == "in" and column == "id":
+                return [self.rows[i] for i in _parse_in(value) if i in self.rows], False
+        if order in ([], [("id", False)]):
+            # Keyset pages: WHERE id > cursor ORDER BY id
+            start = 0
+            for column, op, value in filters:
+                if column == "id" and op in ("gt", "gte"):
+                    start = (bisect.bisect_right if op == "gt" else bisect.bisect_left)(self.sorted_ids, value)
+            ids = self.sorted_ids
+            return (self.rows[ids[i]] for i in range(start, len(ids))), True
+        return self.rows.values(), False
+
+
+class Store:
+    """The fake database: tables and the sql/ functions."""
+
+    def __init__(self, profiles=(), connection_requests=()):
+        self.tables = {
+            "profiles": Table("profiles", profiles),
+            "connection_requests": Table("connection_requests", connection_requests),
+        }
+        self._request_ids = itertools.count(1)
+        self.requests = 0
+
+    def table(self, name: str) -> Table:
+        table = self.tables.get(name)
+        if table is None:
+            raise PostgrestError(404, f'relation "public.{name}" does not exist', "42P01")
+        return table
+
+    # ---------- reads ----------
+
+    def select(self, table: Table, filters: list, order: list, limit, offset: int) -> tuple:
+        """(requested page of matching rows, total matching count or None if not counted)."""
+        rows, ordered = table.candidates(filters, order)
+        matching = (row for row in rows if all(_matches(row, c, op, v) for c, op, v in filters))
+        if ordered:
+            if limit is None:
+                result = list(matching)
+                return result[offset:], len(result)
+            # Stop scanning once the page is full (keyset pages over a large table)
+            return list(itertools.islice(matching, offset, offset + limit)), None
+        result = list(matching)
+        for column, desc in reversed(order):
+            result.sort(key=lambda row: (row.get(column) is None, row.get(column) or ""), reverse=desc)
+        total = len(result)
+        return result[offset:offset + limit if limit is not None else None], total
+
+    # ---------- writes ----------
+
+    def _check_unique(self, table: Table, row: dict):
+        if table.name == "profiles" and row["id"] in table.rows:
+            raise PostgrestError(409, 'duplicate key value violates unique constraint "profiles_pkey"', "23505")
+        if table.name == "connection_requests" and row.get("status") == "pending":
+            for other in table.index["from_user"].get(row.get("from_user"), {}).values():
+                if other["id"] != row["id"] and other["to_user"] == row.get("to_user") and other["status"] == "pending":
+                    raise PostgrestError(
+                        409, 'duplicate key value violates unique constraint "connection_requests_one_pending"', "23505"
+                    )
+
+    def insert(self, table: Table, body) -> list:
+        rows = body if isinstance(body, list) else [body]
+        inserted = []
+        for data in rows:
+            row = dict(data)
+            if table.name == "connection_requests":
+                row.setdefault("id", f"new_{next(self._request_ids):08d}")
+                row.setdefault("status", "pending")
+                row.setdefault("contact_shared", {})
+                row.setdefault("created_at", _now())
+            elif "id" not in row:
+                raise PostgrestError(400, 'null value in column "id" violates not-null constraint', "23502")
+            if table.name == "profiles":
+                row.setdefault("created_at", _now())
+                row.setdefault("updated_at", row["created_at"])
+            self._check_unique(table, row)
+            table._add(row, keep_sorted=True)
+            inserted.append(row)
+        return inserted
+
+    def update(self, table: Table, rows: list, data: dict) -> list:
+        updated = []
+        for row in rows:
+            changes = {k: (_now() if v == "now()" else v) for k, v in data.items()}
+            if table.name == "profiles":
+                changes["updated_at"] = _now()
+            new = {**row, **changes}
+            if table.name == "connection_requests":
+                self._check_unique(table, new)
+            table._remove(row)
+            table._add(new, keep_sorted=True)
+            updated.append(new)
+        return updated
+
+    def delete(self, table: Table, rows: list) -> list:
+        for row in rows:
+            table._remove(row)
+        return rows
+
+    # ---------- sql/ functions ----------
+
+    def rpc(self, function: str, args: dict):
+        profiles, requests = self.tables["profiles"], self.tables["connection_requests"]
+        if function == "send_connection_request":
+            if args.get("p_from_user") not in profiles.rows:
+                return {"status": "from_not_found"}
+            to = profiles.rows.get(args.get("p_to_user"))
+            if to is None:
+                return {"status": "to_not_found"}
+            try:
+                row, = self.insert(requests, {
+                    "from_user": args["p_from_user"],
+                    "to_user": args["p_to_user"],
+                    "message": args.get("p_message"),
+                    "reason": args.get("p_reason", ""),
+                    "status": "pending",
+                })
+            except PostgrestError as e:
+                if e.code == "23505":
+                    return {"status": "duplicate"}
+                raise
+            return {
+                "status": "sent",
+                "request_id": row["id"],
+                "to_user": {"id": to["id"], "name": to.get("name"), "role": to.get("role")},
+            }
+
+        if function == "respond_to_connection_request":
+            request = requests.rows.get(args.get("p_request_id"))
+            if request is None:
+                return {"status": "not_found"}
+            if request["status"] != "pending":
+                return {"status": "already_responded", "request_status": request["status"]}
+            accept = bool(args.get("p_accept"))
+            me = profiles.rows.get(request["to_user"]) or {}
+            contact = {"email": me["email"]} if accept and args.get("p_share_email") and me.get("email") else {}
+            row, = self.update(requests, [request], {
+                "status": "accepted" if accept else "declined",
+                "response_message": args.get("p_response_message", ""),
+                "contact_shared": contact,
+                "responded_at": "now()",
+            })
+            sender = profiles.rows.get(row["from_user"]) or {}
+            return {
+                "status": "ok",
+                "from_user": row["from_user"],
+                "to_user": row["to_user"],
+                "from_name": sender.get("name") or row["from_user"],
+                "contact_shared": contact,
+            }
+
+        raise PostgrestError(404, f"Could not find the function public.{function}", "PGRST202")
+
+    # ---------- HTTP ----------
+
+    def handle(self, method: str, path: str, params: list, prefer: str, body) -> tuple:
+        """One REST call -> (status, headers, JSON-able payload or None)."""
+        self.requests += 1
+        if path.startswith("rpc/"):
+            return 200, {}, self.rpc(path[4:], body or {})
+
+        table = self.table(path)
+        columns, order, limit, offset, filters = None, [], None, 0, []
+        for key, value in params:
+            if key == "select":
+                columns = None if value == "*" else _select_items(value)
+            elif key == "order":
+                for term in value.split(","):
+                    column, _, direction = term.partition(".")
+                    order.append((column, direction.startswith("desc")))
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif key not in _MODIFIERS:
+                op, _, operand = value.partition(".")
+                filters.append((key, op, operand))
+
+        headers = {}
+        if method == "POST":
+            rows = self.insert(table, body)
+            status = 201
+        else:
+            rows, total = self.select(
+                table, filters, order,
+                None if method in ("PATCH", "DELETE") else limit,
+                0 if method in ("PATCH", "DELETE") else offset
+            )
+            if method == "PATCH":
+                rows = self.update(table, rows, body or {})
+            elif method == "DELETE":
+                rows = self.delete(table, rows)
+            elif "count=" in prefer:
+                if total is None:
+                    total = sum(1 for row in table.candidates(filters, order)[0]
+                                if all(_matches(row, c, op, v) for c, op, v in filters))
+                first = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+                headers["Content-Range"] = f"{first}/{total}"
+            status = 200
+
+        if method == "HEAD":
+            return status, headers, None
+        if "return=representation" not in prefer and method in ("POST", "PATCH", "DELETE"):
+            return 204 if method != "POST" else 201, headers, None
+        if columns is not None:
+            rows = [self._project(row, columns) for row in rows]
+        return status, headers, rows
+
+    def _project(self, row: dict, columns: list) -> dict:
+        out = {}
+        for column in columns:
+            embed = _EMBED.match(column)
+            if embed is None:
+                if column == "*":
+                    out.update(row)
+                else:
+                    out[column] = row.get(column)
+                continue
+            alias, table, key, inner = embed.groups()
+            target = self.table(table).rows.get(row.get(key))
+            out[alias or table] = None if target is None else self._project(target, _select_items(inner))
+        return out
+
+
+def create_app(store: Store, latency: float = 0.0) -> Starlette:
+    """ASGI app serving store under /rest/v1 (latency: seconds added per request)."""
+
+    async def rest(request):
+        if latency:
+            await asyncio.sleep(latency)
+        raw = await request.body()
+        try:
+            body = json.loads(raw) if raw else None
+            status, headers, payload = store.handle(
+                request.method,
+                request.path_params["path"],
+                list(request.query_params.multi_items()),
+                request.headers.get("prefer", ""),
+                body
+            )
+        except PostgrestError as e:
+            return Response(
+                json.dumps({"message": str(e), "code": e.code, "details": None, "hint": None}),
+                status_code=e.status, media_type="application/json"
+            )
+        content = json.dumps(payload, separators=(",", ":")) if payload is not None else b""
+        return Response(content, status_code=status, headers=headers, media_type="application/json")
+
+    methods = ["GET", "HEAD", "POST", "PATCH", "DELETE"]
+    return Starlette(routes=[Route("/rest/v1/{path:path}", rest, methods=methods)])
+
+
+def build_store(corpus, profiles: int, requests_per_profile: float = 2.0) -> Store:
+    """Store filled with corpus.profiles(profiles) and their connection requests."""
+    return Store(
+        corpus.profiles(profiles),
+        corpus.connection_requests(profiles, int(profiles * requests_per_profile))
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def running(profiles: int, seed: int = 42, requests_per_profile: float = 2.0, latency_ms: float = 0.0,
+            timeout: float = 1800):
+    """
+    Run the stand-in in its own process (so its memory and CPU stay out of
+    the measurements); yields its base URL once it answers.
+    """
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, "-m", "bench.fake_postgrest",
+        "--profiles", str(profiles), "--seed", str(seed), "--port", str(port),
+        "--requests-per-profile", str(requests_per_profile), "--latency-ms", str(latency_ms),
+    ], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Fake PostgREST exited with code {process.returncode}")
+            try:
+                httpx.get(f"{url}/rest/v1/profiles", params={"select": "id", "limit": 1}, timeout=2).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Fake PostgREST did not start in time") from None
+                time.sleep(0.5)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    from bench.corpus import Corpus
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="In-memory PostgREST stand-in for benchmarks")
+    parser.add_argument("--profiles", type=int, default=10_000)
+    parser.add_argument("--requests-per-profile", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    store = build_store(Corpus(args.seed), args.profiles, args.requests_per_profile)
+    print(f"{len(store.tables['profiles'].rows)} profiles, "
+          f"{len(store.tables['connection_requests'].rows)} connection requests", file=sys.stderr)
+    uvicorn.run(create_app(store, args.latency_ms / 1000), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
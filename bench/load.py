@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+The Backroom - MCP load generator
+Drives many concurrent MCP sessions against server.py over the streamable
+HTTP transport and reports throughput, latency percentiles, error rates and
+the server's RSS over time:
+
+    python -m bench.load --sessions 200 --rate 100 --duration 60
+    python -m bench.load --profiles 100000 --sessions 50 --rate 0      # closed loop, as fast as possible
+    python -m bench.load --url http://host:8000/mcp --server-pid 1234  # an already running server
+
+Unless --url is given, the PostgREST stand-in (bench/fake_postgrest.py) and
+`server.py --http` pointed at it are started as subprocesses, with the
+caller's environment (SUPABASE_RPC_WRITES, PROFILE_CACHE_TTL, ...), so
+configurations can be compared on the same workload.
+
+Every session initializes its own MCP session, acts as one user and picks
+actions from a weighted mix (mostly searches, plus registrations and
+request/response flows; see MIX and --mix). --rate is the target of
+actions per second over all sessions, with Poisson arrivals per session; a
+session that falls behind its schedule starts the next action immediately
+and counts a late start, so a saturated server shows up as late starts
+and growing latency instead of a silently lower offered load.
+
+Tool errors (an {"error": ...} result, e.g. a duplicate request) and
+failures (HTTP errors, timeouts, protocol errors) are reported separately.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench.corpus import Corpus
+from bench.fake_postgrest import free_port, running
+from bench.report import environment, rss_mb, summarize, write_json
+from bench.run import parse_size
+
+PROTOCOL_VERSION = "2025-06-18"
+
+# Relative weights of session actions
+MIX = {
+    "find_collaborators": 40,
+    "search_by_category": 15,
+    "get_profile": 10,
+    "list_profiles": 5,
+    "check_incoming_requests": 10,
+    "check_my_sent_requests": 5,
+    "send_connection_request": 7,
+    "respond_to_request": 5,  # check_incoming_requests, then answer the first pending request
+    "register_profile": 3,
+}
+
+
+class McpError(Exception):
+    """The call failed at the HTTP or JSON-RPC level (not a tool error result)."""
+
+
+class McpSession:
+    """Minimal MCP client over streamable HTTP: initialize, tools/call, close."""
+
+    def __init__(self, http: httpx.AsyncClient, url: str):
+        self.http = http
+        self.url = url
+        self.session_id = None
+        self._ids = itertools.count(1)
+
+    async def _post(self, message: dict):
+        headers = {"Accept": "application/json, text/event-stream", "MCP-Protocol-Version": PROTOCOL_VERSION}
+        if self.session_id:
+            headers["Mcp-Session-Id"] = self.session_id
+        try:
+            response = await self.http.post(self.url, json=message, headers=headers)
+        except httpx.HTTPError as e:
+            raise McpError(f"{type(e).__name__}: {e}") from None
+        if response.status_code >= 400:
+            raise McpError(f"HTTP {response.status_code}")
+        self.session_id = response.headers.get("mcp-session-id", self.session_id)
+        if "id" not in message:
+            return None
+
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            replies = [json.loads(line[5:]) for line in response.text.splitlines() if line.startswith("data:")]
+        else:
+            replies = [response.json()]
+        reply = next((r for r in replies if r.get("id") == message["id"]), None)
+        if reply is None:
+            raise McpError("no response")
+        if "error" in reply:
+            raise McpError(reply["error"].get("message", "JSON-RPC error"))
+        return reply["result"]
+
+    async def open(self):
+        await self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": "initialize", "params": {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": "backroom-load", "version": "1"},
+        }})
+        await self._post({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def call_tool(self, name: str, arguments: dict) -> tuple:
+        """(ok, structured content or None); ok is False for tool error results."""
+        result = await self._post({
+            "jsonrpc": "2.0", "id": next(self._ids), "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+        })
+        structured = result.get("structuredContent")
+        failed = result.get("isError") or (isinstance(structured, dict) and "error" in structured)
+        return not failed, structured
+
+    async def close(self):
+        if self.session_id:
+            with contextlib.suppress(httpx.HTTPError):
+                await self.http.delete(self.url, headers={"Mcp-Session-Id": self.session_id})
+
+
+class Recorder:
+    """Per-tool latencies and outcomes, plus per-interval totals for the timeline."""
+
+    def __init__(self):
+        self.latencies = {}  # tool -> [seconds]
+        self.errors = {}  # tool -> tool error results
+        self.failures = {}  # tool -> failed calls
+        self.failure_kinds = {}  # message -> count
+        self.late_starts = 0
+        self.interval = []  # latencies since the last timeline point
+        self.interval_errors = 0
+
+    def record(self, tool: str, seconds: float, ok: bool = True, failure: str = None):
+        if failure is not None:
+            self.failures[tool] = self.failures.get(tool, 0) + 1
+            self.failure_kinds[failure] = self.failure_kinds.get(failure, 0) + 1
+            self.interval_errors += 1
+            return
+        self.latencies.setdefault(tool, []).append(seconds)
+        self.interval.append(seconds)
+        if not ok:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+            self.interval_errors += 1
+
+    def tick(self) -> tuple:
+        """(latencies, errors) since the previous tick."""
+        latencies, errors = self.interval, self.interval_errors
+        self.interval, self.interval_errors = [], 0
+        return latencies, errors
+
+
+class Workload:
+    """Arguments for every action, derived from the benchmark corpus."""
+
+    def __init__(self, corpus: Corpus, profiles: int, mix: dict, run_id: str):
+        self.profiles = profiles
+        self.corpus = corpus
+        self.run_id = run_id
+        self.queries = corpus.queries(5000)
+        self.categories = corpus.categories(2000)
+        self.recipients = corpus.users(profiles, 5000, skewed=True)
+        self.actions = list(mix)
+        self.weights = [mix[action] for action in self.actions]
+
+    def user(self, rng: random.Random) -> str:
+        return self.corpus.profile_id(rng.randrange(self.profiles))
+
+
+async def _call(session: McpSession, recorder: Recorder, tool: str, arguments: dict):
+    started = time.perf_counter()
+    try:
+        ok, structured = await session.call_tool(tool, arguments)
+    except McpError as e:
+        recorder.record(tool, time.perf_counter() - started, failure=str(e))
+        return None
+    recorder.record(tool, time.perf_counter() - started, ok)
+    return structured
+
+
+async def _action(action: str, session: McpSession, recorder: Recorder, workload: Workload,
+                  rng: random.Random, user: str, step: int):
+    if action == "find_collaborators":
+        await _call(session, recorder, action, {"query": rng.choice(workload.queries)})
+    elif action == "search_by_category":
+        await _call(session, recorder, action, rng.choice(workload.categories))
+    elif action == "get_profile":
+        await _call(session, recorder, action, {"profile_id": workload.user(rng)})
+    elif action == "list_profiles":
+        from pagination import encode_cursor
+        cursor = encode_cursor(workload.user(rng)) if rng.random() < 0.75 else ""
+        await _call(session, recorder, action, {"page_size": 50, "cursor": cursor})
+    elif action in ("check_incoming_requests", "check_my_sent_requests"):
+        await _call(session, recorder, action, {"user_id": user})
+    elif action == "send_connection_request":
+        await _call(session, recorder, action, {
+            "from_user_id": user, "to_user_id": rng.choice(workload.recipients), "message": "Load test hello",
+        })
+    elif action == "respond_to_request":
+        # Popular users have requests to answer
+        me = rng.choice(workload.recipients)
+        inbox = await _call(session, recorder, "check_incoming_requests", {"user_id": me})
+        pending = (inbox or {}).get("requests") or []
+        if pending:
+            await _call(session, recorder, action, {
+                "request_id": pending[0]["request_id"], "accept": rng.random() < 0.7,
+            })
+    elif action == "register_profile":
+        await _call(session, recorder, action, {
+            "name": f"Load {workload.run_id} {user} {step}",
+            "role": "Load Tester",
+            "skills": ", ".join(rng.sample(workload.queries[:200], 3)),
+            "offers": rng.choice(workload.queries),
+            "seeks": rng.choice(workload.queries),
+        })
+    else:
+        raise ValueError(f"Unknown action: {action}")
+
+
+async def _session(number: int, http: httpx.AsyncClient, url: str, recorder: Recorder, workload: Workload,
+                   rate: float, start_at: float, stop_at: float, seed: int):
+    rng = random.Random(seed * 100_003 + number)
+    user = workload.user(rng)
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(max(0.0, start_at - loop.time()))
+
+    session = McpSession(http, url)
+    started = time.perf_counter()
+    try:
+        await session.open()
+    except McpError as e:
+        recorder.record("initialize", time.perf_counter() - started, failure=str(e))
+        return
+    recorder.record("initialize", time.perf_counter() - started)
+
+    try:
+        scheduled = loop.time()
+        for step in itertools.count():
+            if rate > 0:
+                scheduled += rng.expovariate(rate)
+                delay = scheduled - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif delay < -0.1:
+                    recorder.late_starts += 1
+            if loop.time() >= stop_at:
+                break
+            action = rng.choices(workload.actions, workload.weights)[0]
+            await _action(action, session, recorder, workload, rng, user, step)
+    finally:
+        await session.close()
+
+
+async def _timeline(recorder: Recorder, server_pid, interval: float, stop_at: float, points: list):
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    while loop.time() < stop_at:
+        await asyncio.sleep(interval)
+        latencies, errors = recorder.tick()
+        latency = summarize(latencies)
+        point = {
+            "t": round(loop.time() - began, 1),
+            "calls": len(latencies),
+            "throughput_per_s": round(len(latencies) / interval, 1),
+            "errors": errors,
+            "p50_ms": latency["p50_ms"],
+            "p95_ms": latency["p95_ms"],
+            "server_rss_mb": rss_mb(server_pid) if server_pid else None,
+        }
+        points.append(point)
+        print(f"  t={point['t']:>6}s  {point['throughput_per_s']:>7}/s  p50 {point['p50_ms']} ms  "
+              f"p95 {point['p95_ms']} ms  errors {errors}  rss {point['server_rss_mb']} MB", file=sys.stderr)
+
+
+async def generate(url: str, args, server_pid=None) -> dict:
+    corpus = Corpus(args.seed)
+    workload = Workload(corpus, args.profiles, args.mix, run_id=f"{os.getpid()}{int(time.time()) % 100000}")
+    recorder = Recorder()
+    points = []
+
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    stop_at = began + args.ramp + args.duration
+    per_session_rate = args.rate / args.sessions if args.rate > 0 else 0
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        sessions = [
+            _session(i, http, url, recorder, workload, per_session_rate,
+                     began + args.ramp * i / args.sessions, stop_at, args.seed)
+            for i in range(args.sessions)
+        ]
+        await asyncio.gather(_timeline(recorder, server_pid, args.interval, stop_at, points), *sessions)
+    elapsed = loop.time() - began
+
+    tools = {}
+    for tool in sorted(set(recorder.latencies) | set(recorder.failures)):
+        latencies = recorder.latencies.get(tool, [])
+        errors, failures = recorder.errors.get(tool, 0), recorder.failures.get(tool, 0)
+        total = len(latencies) + failures
+        tools[tool] = {
+            **summarize(latencies),
+            "errors": errors,
+            "failures": failures,
+            "error_rate": round((errors + failures) / total, 4) if total else None,
+        }
+
+    everything = [s for tool, latencies in recorder.latencies.items() if tool != "initialize" for s in latencies]
+    calls = len(everything) + sum(n for tool, n in recorder.failures.items() if tool != "initialize")
+    errors = sum(n for tool, n in recorder.errors.items() if tool != "initialize")
+    failures = sum(n for tool, n in recorder.failures.items() if tool != "initialize")
+    rss = [p["server_rss_mb"] for p in points if p["server_rss_mb"] is not None]
+    return {
+        "summary": {
+            "duration_s": round(elapsed, 1),
+            "calls": calls,
+            "throughput_per_s": round(calls / elapsed, 1) if elapsed else None,
+            "errors": errors,
+            "failures": failures,
+            "error_rate": round((errors + failures) / calls, 4) if calls else None,
+            "failure_kinds": recorder.failure_kinds,
+            "late_starts": recorder.late_starts,
+            **{f"latency_{k}": v for k, v in summarize(everything).items() if k != "count"},
+            "server_rss_peak_mb": max(rss) if rss else None,
+            "server_rss_end_mb": rss[-1] if rss else None,
+        },
+        "tools": tools,
+        "timeline": points,
+    }
+
+
+@contextlib.contextmanager
+def _server(database_url: str, port: int):
+    """server.py --http on port, talking to database_url; yields the process once it serves."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "SUPABASE_URL": database_url, "SUPABASE_KEY": os.environ.get("SUPABASE_KEY", "bench"),
+           "HOST": "127.0.0.1", "PORT": str(port), "MCP_TRANSPORT": "http"}
+    env.setdefault("SUPABASE_LOAD_TIMEOUT", "600")
+    process = subprocess.Popen([sys.executable, "server.py", "--http"], cwd=root, env=env, stdout=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server.py exited with code {process.returncode}")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=2)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("server.py did not start in time") from None
+                time.sleep(0.5)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def parse_mix(text: str) -> dict:
+    """"find_collaborators=60,send_connection_request=40" -> weights (unknown actions rejected)."""
+    mix = {}
+    for item in text.split(","):
+        action, _, weight = item.partition("=")
+        action = action.strip()
+        if action not in MIX:
+            raise ValueError(f"unknown action {action!r} (choose from {', '.join(MIX)})")
+        mix[action] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent MCP load generator for The Backroom")
+    parser.add_argument("--sessions", type=int, default=200, help="concurrent MCP sessions")
+    parser.add_argument("--rate", type=float, default=100.0, help="target actions/s over all sessions (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds at full load, after the ramp")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds over which sessions start")
+    parser.add_argument("--interval", type=float, default=1.0, help="timeline resolution (s)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-call HTTP timeout (s)")
+    parser.add_argument("--mix", help="action weights, e.g. find_collaborators=60,register_profile=5")
+    parser.add_argument("--profiles", default="10k", help="corpus size of the stand-in, e.g. 10k, 100k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated database round trip")
+    parser.add_argument("--url", help="MCP endpoint of a running server (skips starting one)")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, for RSS sampling")
+    parser.add_argument("--out", help="result file (default bench/results/load-<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    args.profiles = parse_size(args.profiles)
+    try:
+        args.mix = parse_mix(args.mix) if args.mix else dict(MIX)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.url:
+        result = asyncio.run(generate(args.url, args, args.server_pid))
+    else:
+        with running(args.profiles, args.seed, latency_ms=args.latency_ms) as database_url:
+            port = free_port()
+            with _server(database_url, port) as server:
+                print(f"server.py --http on port {port} (pid {server.pid}), {args.sessions} sessions", file=sys.stderr)
+                result = asyncio.run(generate(f"http://127.0.0.1:{port}/mcp", args, server.pid))
+
+    report = {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "server_pid")},
+        **result,
+    }
+    summary = report["summary"]
+    print(f"{summary['calls']} calls, {summary['throughput_per_s']}/s, p50 {summary['latency_p50_ms']} ms, "
+          f"p95 {summary['latency_p95_ms']} ms, p99 {summary['latency_p99_ms']} ms, "
+          f"error rate {summary['error_rate']}, late starts {summary['late_starts']}", file=sys.stderr)
+    out = args.out or os.path.join(
+        "bench", "results", f"load-{time.strftime('%Y%m%d-%H%M%S')}-{report['environment']['commit'] or 'local'}.json"
+    )
+    write_json(out, report)
+
+
+if __name__ == "__main__":
+    main()
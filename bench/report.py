@@ -0,0 +1,85 @@
+"""
+The Backroom - Benchmark reporting helpers
+Latency summaries, process memory and the JSON result files runs are
+compared with.
+"""
+
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def summarize(latencies: list) -> dict:
+    """Latency summary in milliseconds."""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "mean_ms": _ms(sum(ordered) / len(ordered)) if ordered else None,
+        "min_ms": _ms(ordered[0] if ordered else None),
+        "p50_ms": _ms(percentile(ordered, 50)),
+        "p95_ms": _ms(percentile(ordered, 95)),
+        "p99_ms": _ms(percentile(ordered, 99)),
+        "max_ms": _ms(ordered[-1] if ordered else None),
+    }
+
+
+def rss_mb(pid="self") -> float:
+    """Current resident set size of a process (Linux /proc), in MB."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of this process's resident set size, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def environment() -> dict:
+    """Where and on what the run happened, so results are comparable."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        # Feature flags that change what is measured
+        "env": {k: v for k, v in os.environ.items() if k.startswith(("PROFILE_", "SUPABASE_")) and k != "SUPABASE_KEY"},
+    }
+
+
+def write_json(path: str, result: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {path}", file=sys.stderr)
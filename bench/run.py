@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+The Backroom - Benchmark runner
+Times the MCP tools against the in-memory PostgREST stand-in on synthetic
+corpora of several sizes and writes the results as JSON:
+
+    python -m bench.run                                  # 10k and 100k profiles
+    python -m bench.run --sizes 10k,100k,1m --iterations 500
+    python -m bench.run --scenarios find_collaborators,list_profiles --out before.json
+    python -m bench.compare before.json after.json
+
+Per size, the stand-in and a fresh worker process are started (so caches,
+the match engine and peak RSS never leak between sizes); the worker reaches
+the stand-in through SUPABASE_URL exactly like production reaches Supabase,
+and calls the tools through an in-memory MCP client, so middleware and
+result serialization are part of every measurement.
+
+Each scenario reports p50/p95/p99 latency, throughput and errors over its
+timed calls, the peak Python allocation of a few extra calls (tracemalloc,
+outside the timed loop) and the process RSS. cold_start is the first search
+of a fresh process: full profile load plus match engine build.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from bench.corpus import Corpus
+from bench.report import environment, peak_rss_mb, rss_mb, summarize, write_json
+
+SCENARIOS = (
+    "cold_start",
+    "find_collaborators",
+    "search_by_category",
+    "list_profiles",
+    "check_incoming_requests",
+    "send_connection_request",
+    "app_find_matches",
+)
+
+
+def parse_size(text: str) -> int:
+    """"10k" -> 10000, "1m" -> 1000000."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def size_label(profiles: int) -> str:
+    for unit, scale in (("m", 1_000_000), ("k", 1_000)):
+        if profiles >= scale and profiles % scale == 0:
+            return f"{profiles // scale}{unit}"
+    return str(profiles)
+
+
+def calls(corpus: Corpus, scenario: str, profiles: int, count: int) -> list:
+    """[(tool, arguments), ...] for count calls of a scenario."""
+    if scenario == "find_collaborators":
+        return [("find_collaborators", {"query": query}) for query in corpus.queries(count)]
+    if scenario == "search_by_category":
+        return [("search_by_category", arguments) for arguments in corpus.categories(count)]
+    if scenario == "list_profiles":
+        from pagination import encode_cursor
+        # A quarter first pages, the rest deep keyset pages
+        starts = corpus.users(profiles, count)
+        return [
+            ("list_profiles", {"page_size": 50, "cursor": encode_cursor(start) if i % 4 else ""})
+            for i, start in enumerate(starts)
+        ]
+    if scenario == "check_incoming_requests":
+        return [("check_incoming_requests", {"user_id": user}) for user in corpus.users(profiles, count, skewed=True)]
+    if scenario == "send_connection_request":
+        senders = corpus.users(profiles, count)
+        recipients = corpus.users(profiles, count, skewed=True)
+        return [
+            ("send_connection_request", {"from_user_id": a, "to_user_id": b, "message": "Benchmark hello"})
+            for a, b in zip(senders, recipients)
+        ]
+    if scenario == "app_find_matches":
+        return [("find_matches", {"query": query}) for query in corpus.queries(count)]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+# ============== WORKER (one size, one process) ==============
+
+def _app_caller(app):
+    """Gradio handlers are plain functions returning Markdown."""
+    async def call(handler: str, arguments: dict) -> bool:
+        return getattr(app, handler)(**arguments).startswith("**Error")
+    return call
+
+
+async def _worker(args) -> dict:
+    import server
+    from fastmcp import Client
+    from metrics import is_error_result
+
+    corpus = Corpus(args.seed)
+    results = {}
+
+    async with Client(server.mcp) as client:
+        async def call_tool(tool: str, arguments: dict) -> bool:
+            """Call an MCP tool; True if it failed."""
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            return is_error_result(result)
+
+        for scenario in args.scenarios:
+            call = call_tool
+            if scenario == "cold_start":
+                rss_before = rss_mb()
+                started = time.perf_counter()
+                failed = await call("find_collaborators", {"query": "python"})
+                results[scenario] = {
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "errors": int(failed),
+                    "rss_before_mb": rss_before,
+                    "rss_mb": rss_mb(),
+                    "peak_rss_mb": peak_rss_mb(),
+                }
+                continue
+
+            if scenario == "app_find_matches":
+                try:
+                    import app
+                except ImportError as e:
+                    results[scenario] = {"skipped": f"app.py not importable: {e}"}
+                    continue
+                call = _app_caller(app)
+
+            planned = calls(corpus, scenario, args.profiles, args.warmup + args.iterations + args.memory_calls)
+            warmup, timed, extra = (
+                planned[:args.warmup],
+                planned[args.warmup:args.warmup + args.iterations],
+                planned[args.warmup + args.iterations:]
+            )
+            for tool, arguments in warmup:
+                await call(tool, arguments)
+
+            latencies, errors = [], 0
+            started = time.perf_counter()
+            for tool, arguments in timed:
+                t0 = time.perf_counter()
+                errors += await call(tool, arguments)
+                latencies.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            for tool, arguments in extra:
+                await call(tool, arguments)
+            alloc_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[scenario] = {
+                **summarize(latencies),
+                "throughput_per_s": round(len(timed) / elapsed, 1) if elapsed else None,
+                "errors": errors,
+                "alloc_peak_kb": round(alloc_peak / 1024, 1),
+                "rss_mb": rss_mb(),
+                "peak_rss_mb": peak_rss_mb(),
+            }
+            print(f"  {scenario}: p50 {results[scenario]['p50_ms']} ms, p99 {results[scenario]['p99_ms']} ms",
+                  file=sys.stderr)
+
+    return results
+
+
+def run_worker(args):
+    os.environ["SUPABASE_URL"] = args.url
+    os.environ.setdefault("SUPABASE_KEY", "bench")
+    # Keep the loaded corpus for the whole run; cold_start measures the load itself
+    os.environ.setdefault("PROFILE_CACHE_TTL", "3600")
+    os.environ.setdefault("SUPABASE_LOAD_TIMEOUT", "600")
+    print(json.dumps(asyncio.run(_worker(args))))
+
+
+# ============== ORCHESTRATOR ==============
+
+def run(args) -> dict:
+    from bench.fake_postgrest import running
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for profiles in args.sizes:
+        label = size_label(profiles)
+        print(f"{label} profiles: starting the PostgREST stand-in", file=sys.stderr)
+        with running(profiles, args.seed, args.requests_per_profile, args.latency_ms) as url:
+            worker = subprocess.run([
+                sys.executable, "-m", "bench.run", "--worker",
+                "--url", url, "--profiles", str(profiles), "--seed", str(args.seed),
+                "--scenarios", ",".join(args.scenarios),
+                "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+                "--memory-calls", str(args.memory_calls),
+            ], cwd=root, stdout=subprocess.PIPE, text=True)
+        if worker.returncode != 0:
+            results[label] = {"error": f"worker exited with code {worker.returncode}"}
+            continue
+        results[label] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    return {
+        "environment": environment(),
+        "config": {
+            "sizes": args.sizes,
+            "scenarios": args.scenarios,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "memory_calls": args.memory_calls,
+            "seed": args.seed,
+            "requests_per_profile": args.requests_per_profile,
+            "latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="The Backroom benchmarks")
+    parser.add_argument("--sizes", default="10k,100k", help="corpus sizes, e.g. 10k,100k,1m")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--memory-calls", type=int, default=5, help="extra calls traced for allocation peaks")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests-per-profile", type=float, default=2.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated database round trip")
+    parser.add_argument("--out", help="result file (default bench/results/<time>-<commit>.json)")
+    # Internal: one size in this process against a running stand-in
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--profiles", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIOS)})")
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    args.sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    result = run(args)
+    out = args.out or os.path.join(
+        "bench", "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{result['environment']['commit'] or 'local'}.json"
+    )
+    write_json(out, result)
+
+
+if __name__ == "__main__":
+    main()
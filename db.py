@@ -0,0 +1,273 @@
+"""
+The Backroom - Async Supabase data layer
+Thin PostgREST client on a pooled, keep-alive httpx.AsyncClient.
+
+The query builder mirrors the subset of supabase-py the server uses:
+
+    db = Database(SUPABASE_URL, SUPABASE_KEY)
+    response = await db.table("profiles").select("id, name").eq("id", "snow").execute()
+    response.data  # list of rows
+
+Every query can carry its own deadline via .timeout(seconds). HTTP/2 is used
+when the `h2` package is installed (pip install "httpx[http2]"). Pass a
+resilience.Resilience to add default deadlines, retries, hedged reads and a
+circuit breaker to every request. add_listener() observes every round trip
+(for metrics and tracing).
+"""
+
+import time
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class APIError(Exception):
+    """PostgREST returned an error response."""
+
+    def __init__(self, status_code: int, message: str, code: str = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+class APIResponse:
+    def __init__(self, data, count: int = None):
+        self.data = data
+        self.count = count
+
+
+def count_from_content_range(value: str):
+    """Total row count from a PostgREST Content-Range header ("0-24/573"), if present."""
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def _quote(value) -> str:
+    """Quote a value for PostgREST list filters like in.(...)."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _filter_value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class Query:
+    """Chainable PostgREST request; nothing is sent until execute()."""
+
+    def __init__(self, db: "Database", path: str, method: str = "GET", body=None):
+        self._db = db
+        self._path = path
+        self._method = method
+        self._body = body
+        self._params = []
+        self._order = []
+        self._headers = {}
+        self._timeout = None
+
+    # ---------- operations ----------
+
+    def select(self, columns: str = "*", count: str = None, head: bool = False) -> "Query":
+        """
+        Select columns; count="exact"/"planned"/"estimated" also returns a row count.
+
+        head=True sends a HEAD request: no rows are transferred, only the count.
+        """
+        self._params.append(("select", ",".join(c.strip() for c in columns.split(","))))
+        if count:
+            self._prefer(f"count={count}")
+        if head:
+            self._method = "HEAD"
+        return self
+
+    def insert(self, row) -> "Query":
+        self._method, self._body = "POST", row
+        self._prefer("return=representation")
+        return self
+
+    def update(self, data: dict) -> "Query":
+        self._method, self._body = "PATCH", data
+        self._prefer("return=representation")
+        return self
+
+    def delete(self) -> "Query":
+        self._method = "DELETE"
+        self._prefer("return=representation")
+        return self
+
+    # ---------- filters and modifiers ----------
+
+    def _filter(self, column: str, op: str, value) -> "Query":
+        self._params.append((column, f"{op}.{value}"))
+        return self
+
+    def eq(self, column: str, value) -> "Query":
+        return self._filter(column, "eq", _filter_value(value))
+
+    def neq(self, column: str, value) -> "Query":
+        return self._filter(column, "neq", _filter_value(value))
+
+    def gt(self, column: str, value) -> "Query":
+        return self._filter(column, "gt", _filter_value(value))
+
+    def gte(self, column: str, value) -> "Query":
+        return self._filter(column, "gte", _filter_value(value))
+
+    def lt(self, column: str, value) -> "Query":
+        return self._filter(column, "lt", _filter_value(value))
+
+    def lte(self, column: str, value) -> "Query":
+        return self._filter(column, "lte", _filter_value(value))
+
+    def in_(self, column: str, values) -> "Query":
+        return self._filter(column, "in", "(" + ",".join(_quote(v) for v in values) + ")")
+
+    def order(self, column: str, desc: bool = False) -> "Query":
+        """Sort by column; repeated calls add secondary sort keys."""
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, count: int) -> "Query":
+        self._params.append(("limit", str(count)))
+        return self
+
+    def offset(self, count: int) -> "Query":
+        self._params.append(("offset", str(count)))
+        return self
+
+    def timeout(self, seconds: float) -> "Query":
+        """Per-call deadline, overriding the client default."""
+        self._timeout = seconds
+        return self
+
+    def _prefer(self, value: str):
+        current = self._headers.get("Prefer")
+        self._headers["Prefer"] = f"{current},{value}" if current else value
+
+    # ---------- execution ----------
+
+    async def execute(self) -> APIResponse:
+        params = self._params + ([("order", ",".join(self._order))] if self._order else [])
+        return await self._db.request(
+            self._method, self._path, params=params, json=self._body,
+            headers=self._headers, timeout=self._timeout
+        )
+
+
+class Database:
+    """Pooled async PostgREST client for one Supabase project."""
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        http2: bool = True,
+        transport: httpx.AsyncBaseTransport = None,
+        resilience=None
+    ):
+        self.url = url.rstrip("/")
+        self.resilience = resilience
+        self._listeners = []
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.url}/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json"
+            },
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ),
+            http2=http2 and HTTP2_AVAILABLE and transport is None,
+            transport=transport
+        )
+
+    def add_listener(self, listener):
+        """
+        Call listener(round_trip) after every HTTP round trip, failed ones
+        included. round_trip is a dict: method, path, params, status (None
+        on transport errors), seconds, bytes_sent, bytes_received, rows, error.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, started: float, method: str, path: str, params, response=None, data=None, error=None):
+        round_trip = {
+            "method": method,
+            "path": path,
+            "params": params,
+            "status": response.status_code if response is not None else None,
+            "seconds": time.perf_counter() - started,
+            "bytes_sent": len(response.request.content) if response is not None else 0,
+            "bytes_received": len(response.content) if response is not None else 0,
+            "rows": len(data) if isinstance(data, list) else None,
+            "error": error,
+        }
+        for listener in self._listeners:
+            listener(round_trip)
+
+    def table(self, name: str) -> Query:
+        return Query(self, f"/{name}")
+
+    def rpc(self, function: str, params: dict = None) -> Query:
+        """Call a Postgres function exposed by PostgREST (POST /rpc/<function>)."""
+        return Query(self, f"/rpc/{function}", method="POST", body=params or {})
+
+    async def request(self, method: str, path: str, params=None, json=None, headers=None, timeout=None) -> APIResponse:
+        if self.resilience is None:
+            return await self._send(method, path, params, json, headers, timeout)
+        return await self.resilience.call(
+            method, lambda seconds: self._send(method, path, params, json, headers, seconds), timeout
+        )
+
+    async def _send(self, method: str, path: str, params, json, headers, timeout) -> APIResponse:
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(
+                method, path, params=params, json=json, headers=headers, **kwargs
+            )
+        except BaseException as e:
+            if self._listeners:
+                self._notify(started, method, path, params, error=e)
+            raise
+
+        if response.status_code >= 400:
+            try:
+                error = response.json()
+            except ValueError:
+                error = None
+            if isinstance(error, dict):
+                api_error = APIError(response.status_code, error.get("message") or response.text, error.get("code"))
+            else:
+                # Not a PostgREST error object (proxy page, list, plain string)
+                api_error = APIError(response.status_code, response.text or response.reason_phrase)
+            if self._listeners:
+                self._notify(started, method, path, params, response, error=api_error)
+            raise api_error
+
+        count = count_from_content_range(response.headers.get("content-range"))
+        data = response.json() if response.content else []
+        if self._listeners:
+            self._notify(started, method, path, params, response, data)
+        return APIResponse(data, count)
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,72 @@
+"""
+The Backroom - Health probe
+Constant-cost database health check for db_status and the Gradio Status tab.
+
+The probe is a HEAD request with a PostgREST row count (no rows are
+transferred), timed to report the database round trip. Results, including
+failures, are cached for a few seconds so frequent health checks do not
+reach the database at all.
+"""
+
+import threading
+import time
+
+# PostgREST count modes: "estimated" is exact for small tables and falls back
+# to the planner estimate for large ones, so it stays cheap as the table grows
+COUNT_METHODS = ("exact", "planned", "estimated")
+
+
+class HealthProbe:
+    """Runs a count probe and caches its result for `ttl` seconds."""
+
+    def __init__(self, ttl: float = 5.0, count_method: str = "estimated"):
+        if count_method not in COUNT_METHODS:
+            count_method = "estimated"
+        self.ttl = ttl
+        self.count_method = count_method
+        self._lock = threading.Lock()
+        self._result = None
+        self._measured_at = None
+
+    def cached(self):
+        """Last result if it is still fresh, else None."""
+        with self._lock:
+            if self._result is None or time.monotonic() - self._measured_at > self.ttl:
+                return None
+            return dict(self._result, cached=True, age_seconds=round(time.monotonic() - self._measured_at, 3))
+
+    def _record(self, started: float, count=None, error: Exception = None) -> dict:
+        result = {
+            "ok": error is None,
+            "profiles_count": count,
+            "count_method": self.count_method,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        if error is not None:
+            result["error"] = str(error)
+        with self._lock:
+            self._result = result
+            self._measured_at = time.monotonic()
+        return dict(result, cached=False, age_seconds=0.0)
+
+    def measure(self, probe) -> dict:
+        """probe(count_method) -> row count. Returns the cached result when fresh."""
+        result = self.cached()
+        if result is not None:
+            return result
+        started = time.perf_counter()
+        try:
+            return self._record(started, count=probe(self.count_method))
+        except Exception as e:
+            return self._record(started, error=e)
+
+    async def measure_async(self, probe) -> dict:
+        """Async measure(): probe is a coroutine function."""
+        result = self.cached()
+        if result is not None:
+            return result
+        started = time.perf_counter()
+        try:
+            return self._record(started, count=await probe(self.count_method))
+        except Exception as e:
+            return self._record(started, error=e)
@@ -0,0 +1,709 @@
+"""
+The Backroom - Match scoring engine
+Shared by app.py (find_matches) and server.py (find_collaborators).
+
+The corpus is held column-wise: every searchable list element (offers,
+seeks, skills, industry) and the role become one "entry" with a term id
+(its normalized search key, see normalize.py), a reason string, an owner (profile index) and a
+score weight. Terms, owners and weights live in NumPy arrays, so a query
+resolves matching terms through the n-gram index, then scores all profiles
+in one isin + bincount pass and picks the top-k with a partial selection.
+
+rank() is the relevance-ranked alternative: multi-word queries are
+tokenized and scored with BM25 over every text field (ranking.py).
+fuzzy_search() is the typo- and diacritic-tolerant fallback for searches
+that found nothing: each query word is replaced by the similar words of
+the corpus vocabulary (TrigramIndex) before scoring. semantic_search()
+ranks by similarity of hashed profile vectors (semantic.py), and
+suggest() serves precomputed offers <-> seeks matches (recommend.py).
+
+filter_profiles() answers category filters (search_by_category) from
+per-field postings: for every (field, term) a sorted uint32 array of
+profile indexes, combined with NumPy set operations for AND/OR/NOT.
+"""
+
+import bisect
+import re
+import sys
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from normalize import field_keys, fold_key, normalize_key
+from ranking import BM25Index, field_tokens, tokenize
+from recommend import AffinityIndex, matching_items
+from search_index import NgramIndex, TrigramIndex
+from semantic import SemanticIndex, VectorStore, explain
+
+# (profile field, score weight, reason template)
+SEARCH_FIELDS = (
+    ("offers", 3, "Offers: {}"),
+    ("seeks", 2, "Seeks: {}"),
+    ("skills", 2, "Skill: {}"),
+    ("industry", 1, "Industry: {}"),
+)
+ROLE_WEIGHT = 1
+ROLE_REASON = "Role match"
+
+# Minimum trigram similarity (Dice) for a fuzzy word match
+FUZZY_THRESHOLD = 0.4
+
+# search_by_category category -> profile field
+CATEGORY_FIELDS = {
+    "industry": "industry",
+    "skills": "skills",
+    "seeking": "seeks",
+    "offering": "offers",
+}
+
+# Columns the search paths read; everything else (email, contact, ...) stays in the database
+SEARCH_COLUMNS = "id,name,role,offers,seeks,skills,industry,tags,bio,offer_free,assistant_endpoint"
+# ... plus the precomputed keys, once sql/004 added the column
+SEARCH_KEY_COLUMNS = f"{SEARCH_COLUMNS},search_keys"
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProfileRecord:
+    """
+    Compact, read-only search view of a profile row.
+
+    List fields are tuples of interned strings, so the thousands of profiles
+    listing "Python" share one string object. get() mirrors dict.get() so
+    records drop in wherever search code used profile rows.
+    """
+
+    __slots__ = (
+        "id", "name", "role", "offers", "seeks", "skills", "industry",
+        "tags", "bio", "offer_free", "assistant_endpoint", "search_keys"
+    )
+
+    def __init__(self, id, name, role, offers, seeks, skills, industry,
+                 tags=(), bio=None, offer_free=None, assistant_endpoint=None, search_keys=()):
+        self.id = id
+        self.name = name
+        self.role = role
+        self.offers = offers
+        self.seeks = seeks
+        self.skills = skills
+        self.industry = industry
+        self.tags = tags
+        self.bio = bio
+        self.offer_free = offer_free
+        self.assistant_endpoint = assistant_endpoint
+        self.search_keys = search_keys
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ProfileRecord":
+        def tags(field):
+            return tuple(_intern(v) for v in row.get(field) or ())
+
+        return cls(
+            row.get("id"),
+            row.get("name"),
+            _intern(row.get("role")),
+            tags("offers"),
+            tags("seeks"),
+            tags("skills"),
+            tags("industry"),
+            tags("tags"),
+            row.get("bio"),
+            row.get("offer_free"),
+            row.get("assistant_endpoint"),
+            tags("search_keys")
+        )
+
+    def get(self, field: str, default=None):
+        return getattr(self, field) if field in self.__slots__ else default
+
+    def __eq__(self, other):
+        if not isinstance(other, ProfileRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ProfileRecord(id={self.id!r}, name={self.name!r})"
+
+
+def _profile_entries(profile: dict):
+    """Yield (field, search key, value, weight, reason) for every searchable value, in scoring order."""
+    keys = field_keys(profile)
+    for field, weight, template in SEARCH_FIELDS:
+        for value, key in zip(profile.get(field) or [], keys[field]):
+            yield field, key, value, weight, template.format(value)
+    yield "role", (keys["role"] or [""])[0], profile.get("role") or "", ROLE_WEIGHT, ROLE_REASON
+
+
+def parse_filters(expression: str) -> list:
+    """
+    Parse "industry=e-commerce AND skills=python AND NOT seeking=co-founder".
+
+    OR separates alternatives, AND binds tighter, NOT negates one condition.
+    Operators are uppercase, so values like "research and development" stay
+    intact. Returns [[(negated, field, value), ...], ...] (OR of ANDs); raises
+    ValueError on unknown categories or malformed conditions.
+    """
+    groups = []
+    for alternative in _split_keyword(expression, "OR"):
+        group = []
+        for condition in _split_keyword(alternative, "AND"):
+            negated = condition.startswith("NOT ")
+            if negated:
+                condition = condition[4:].strip()
+            category, sep, value = condition.partition("=")
+            category, value = category.strip().lower(), value.strip()
+            if not sep or not value:
+                raise ValueError(f"Invalid condition '{condition}'. Use category=value.")
+            if category not in CATEGORY_FIELDS:
+                raise ValueError(f"Unknown category '{category}'. Use one of: {', '.join(CATEGORY_FIELDS)}")
+            group.append((negated, CATEGORY_FIELDS[category], value))
+        groups.append(group)
+    return groups
+
+
+def _split_keyword(text: str, keyword: str) -> list:
+    parts = [p.strip() for p in re.split(rf"(?:^|\s){keyword}(?:\s|$)", text.strip())]
+    if not all(parts):
+        raise ValueError(f"Empty condition around {keyword}.")
+    return parts
+
+
+def top_k(scores: np.ndarray, candidates: np.ndarray, k: int = None) -> np.ndarray:
+    """
+    Indices of the k best candidates, by score descending then index ascending.
+
+    Uses np.partition to find the k-th score, so only the selected rows are
+    sorted. Ties at the cut-off keep the lowest indices (same as a stable sort).
+    """
+    if k is not None and k <= 0:
+        return candidates[:0]
+    if k is not None and k < len(candidates):
+        s = scores[candidates]
+        kth = np.partition(s, len(s) - k)[len(s) - k]
+        above = candidates[s > kth]
+        ties = candidates[s == kth][:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+class MatchEngine:
+    """Column-oriented weighted substring search over profiles."""
+
+    def __init__(self, profiles: list = None, n: int = 3, previous: "MatchEngine" = None,
+                 vector_store: VectorStore = None):
+        """
+        Args:
+            profiles: initial corpus (dicts or ProfileRecords)
+            n: n-gram length of the substring index
+            previous: the engine this one replaces; semantic vectors of
+                profiles it holds unchanged are copied, not re-embedded
+            vector_store: persisted semantic vectors, read instead of
+                embedding and written for every newly embedded profile
+        """
+        self._lock = threading.Lock()
+        self._n = n
+        self._vector_store = vector_store
+        self.generation = None
+        self._reset()
+        self._extend(profiles or [], previous._vector_of if previous is not None else None)
+        if previous is not None:
+            self._adopt_suggestions(previous)
+
+    def __len__(self):
+        return len(self._slot)
+
+    # ---------- building ----------
+
+    def _reset(self):
+        # Distinct search keys ("terms") are n-gram indexed once, however
+        # many profiles share them; entries only reference a term id.
+        self._grams = NgramIndex(self._n)
+        self._term_ids = {}  # search key -> term id
+        self._term_texts = []  # term id -> search key
+        self._term_forms = {}  # term id -> folded spellings other than the key ("vue.js" for "vue")
+        self._profiles = []  # profile index -> profile dict (None once removed)
+        self._slot = {}  # profile_id -> profile index
+        self._ranges = []  # profile index -> (first entry, end entry)
+        self._reasons = []  # entry id -> reason string
+        # Entry columns are views of the first len(self._reasons) rows of
+        # buffers with spare capacity, so appending an upsert is amortized O(1)
+        self._buffers = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int16))
+        self._terms = self._buffers[0]  # entry id -> term id (-1 once dead)
+        self._owners = self._buffers[1]  # entry id -> profile index
+        self._weights = self._buffers[2]  # entry id -> score weight
+        self._dead = 0
+        self._ranked = BM25Index()
+        self._semantic = SemanticIndex(store=self._vector_store)
+        self._affinity = AffinityIndex()
+        self._fuzzy = TrigramIndex()  # folded words of all terms
+        self._word_terms = defaultdict(set)  # folded word -> term ids
+        # field -> term id -> sorted profile indexes (category filters)
+        self._postings = {field: {} for field in CATEGORY_FIELDS.values()}
+        self._categories = {}  # profile index -> [(field, term id), ...]
+        self._id_order = None  # (sorted profile ids, rank per profile index), rebuilt lazily
+
+    def _term(self, text: str, value: str = "") -> int:
+        term_id = self._term_ids.get(text)
+        if term_id is None:
+            term_id = len(self._term_texts)
+            self._term_ids[text] = term_id
+            self._term_texts.append(text)
+            self._grams.add(term_id, text)
+            for word in tokenize(text):
+                self._fuzzy.add(word)
+                self._word_terms[word].add(term_id)
+        form = fold_key(value)
+        if form != text:
+            forms = self._term_forms.setdefault(term_id, set())
+            if form not in forms:
+                forms.add(form)
+                self._grams.add(term_id, form)
+        return term_id
+
+    def _adopt_suggestions(self, previous: "MatchEngine"):
+        """Take over previous's cached suggestion lists (as stale) for the profiles both engines hold."""
+        with previous._lock:
+            lists = previous._affinity.cached()
+            old_profiles = list(previous._profiles)
+
+        def new_slot(old_slot):
+            profile = old_profiles[old_slot]
+            return self._slot.get(profile.get("id")) if profile is not None else None
+
+        adopted = {}
+        for slot, matches in lists.items():
+            mine = new_slot(slot)
+            if mine is None:
+                continue
+            moved = [(score, new_slot(other), helps_me, i_help) for score, other, helps_me, i_help in matches]
+            adopted[mine] = [m for m in moved if m[1] is not None]
+        self._affinity.adopt(adopted)
+
+    def _vector_of(self, profile):
+        """Semantic vector of profile if this engine holds it unchanged, else None."""
+        with self._lock:
+            slot = self._slot.get(profile.get("id"))
+            if slot is None:
+                return None
+            current = self._profiles[slot]
+            if current is not profile and current != profile:
+                return None
+            return self._semantic.vector(slot)
+
+    def _extend(self, profiles: list, vectors=None):
+        """Index profiles; vectors(profile) may return an already computed semantic vector."""
+        terms, owners, weights = [], [], []
+        postings = defaultdict(list)  # (field, term id) -> new profile indexes
+        entry_id = len(self._reasons)
+        affinity = []  # (slot, profile), indexed in one batch
+        for profile in profiles:
+            profile_id = profile.get("id")
+            slot = self._slot.get(profile_id)
+            if slot is None:
+                slot = len(self._profiles)
+                self._profiles.append(profile)
+                self._ranges.append(None)
+                self._slot[profile_id] = slot
+            else:
+                self._profiles[slot] = profile
+
+            self._ranked.add(slot, profile)
+            self._semantic.add(slot, profile, vectors(profile) if vectors is not None else None)
+            affinity.append((slot, profile))
+            first = entry_id
+            categories = set()
+            for field, text, value, weight, reason in _profile_entries(profile):
+                term_id = self._term(text, value)
+                terms.append(term_id)
+                owners.append(slot)
+                weights.append(weight)
+                self._reasons.append(reason)
+                entry_id += 1
+                if field in self._postings and (field, term_id) not in categories:
+                    categories.add((field, term_id))
+                    postings[field, term_id].append(slot)
+            self._ranges[slot] = (first, entry_id)
+            self._categories[slot] = list(categories)
+        self._affinity.add_many(affinity)
+
+        for (field, term_id), slots in postings.items():
+            current = self._postings[field].get(term_id)
+            added = np.sort(np.asarray(slots, dtype=np.uint32))
+            # Slots are added once (upsert drops a profile's postings first),
+            # so a sorted insert keeps the arrays sorted and unique
+            self._postings[field][term_id] = (
+                added if current is None else np.insert(current, np.searchsorted(current, added), added)
+            )
+        self._id_order = None
+        self._append_entries(terms, owners, weights)
+
+    def _append_entries(self, terms: list, owners: list, weights: list):
+        start, end = len(self._terms), len(self._terms) + len(terms)
+        if end > len(self._buffers[0]):
+            capacity = max(end, 2 * len(self._buffers[0]), 1024)
+            grown = []
+            for buffer in self._buffers:
+                new = np.empty(capacity, dtype=buffer.dtype)
+                new[:start] = buffer[:start]
+                grown.append(new)
+            self._buffers = tuple(grown)
+        for buffer, values in zip(self._buffers, (terms, owners, weights)):
+            buffer[start:end] = values
+        self._terms, self._owners, self._weights = (buffer[:end] for buffer in self._buffers)
+
+    def _drop_entries(self, slot: int):
+        first, end = self._ranges[slot]
+        self._terms[first:end] = -1
+        self._weights[first:end] = 0
+        self._ranges[slot] = (first, first)
+        self._dead += end - first
+        for field, term_id in self._categories.pop(slot, ()):
+            slots = self._postings[field][term_id]
+            slots = slots[slots != slot]
+            if len(slots):
+                self._postings[field][term_id] = slots
+            else:
+                del self._postings[field][term_id]
+        self._id_order = None
+
+    @property
+    def needs_compaction(self) -> bool:
+        """
+        True once dead entries (left by upserts and removals) outnumber the
+        live ones. Compaction is a rebuild from live_profiles() with this
+        engine as `previous`; the owner runs it off the request path.
+        """
+        return self._dead > 1024 and self._dead > len(self._reasons) // 2
+
+    @property
+    def stale_suggestions(self) -> int:
+        """Cached suggest() lists that writes made stale; refresh_suggestions() recomputes them."""
+        return self._affinity.stale
+
+    def refresh_suggestions(self, batch: int = 1):
+        """
+        Recompute the stale suggest() lists, `batch` lists per lock hold (a
+        few ms each at 20k profiles) so searches keep running in between.
+        Meant for a background thread.
+        """
+        while True:
+            with self._lock:
+                if not self._affinity.refresh(batch):
+                    return
+
+    def live_profiles(self) -> list:
+        """The profiles this engine currently holds, in index order."""
+        with self._lock:
+            return [p for p in self._profiles if p is not None]
+
+    def upsert(self, profile: dict):
+        """Add a new profile or replace the entries of an existing one."""
+        self.upsert_many([profile])
+
+    def upsert_many(self, profiles: list):
+        """upsert() for a batch of profiles (e.g. one sync poll), in one pass."""
+        with self._lock:
+            # Last version wins within the batch
+            latest = {profile.get("id"): profile for profile in profiles}
+            for profile_id in latest:
+                slot = self._slot.get(profile_id)
+                if slot is not None:
+                    self._drop_entries(slot)
+            self._extend(list(latest.values()))
+
+    def remove(self, profile_id: str):
+        with self._lock:
+            slot = self._slot.pop(profile_id, None)
+            if slot is None:
+                return
+            self._drop_entries(slot)
+            self._ranked.remove(slot)
+            self._semantic.remove(slot)
+            self._affinity.remove(slot)
+            self._profiles[slot] = None
+
+    # ---------- querying ----------
+
+    def _matching_terms(self, query: str):
+        """
+        Term ids whose search key or folded spelling contains the query's
+        key or folded spelling, or None when every term matches.
+        """
+        matched = set()
+        for key in dict.fromkeys((normalize_key(query), fold_key(query))):
+            candidates = self._grams.candidates(key)
+            if candidates is None:
+                return None
+            if not self._grams.exact(key):
+                texts, forms = self._term_texts, self._term_forms
+                candidates = [t for t in candidates
+                              if key in texts[t] or any(key in form for form in forms.get(t, ()))]
+            matched.update(candidates)
+        return np.fromiter(matched, dtype=np.int32, count=len(matched))
+
+    def search(self, query: str, limit: int = None):
+        """
+        Score every profile against query.
+
+        Query and values are compared as search keys (normalize_key), so
+        case, diacritics, spacing and aliases ("k8s") do not matter; their
+        folded spellings (fold_key) are compared too, so "js" still finds
+        "Vue.js".
+        Returns (matches_found, results) where results are the best `limit`
+        matches as [{"profile", "score", "reasons"}, ...]. Weights: offers=3,
+        seeks=2, skills=2, industry=1, role=1.
+        """
+        with self._lock:
+            return self._score(self._matching_terms(query), limit)
+
+    def search_many(self, queries: list, limit: int = None) -> list:
+        """
+        search() for many queries in one pass over the corpus.
+
+        Every query's matching terms are resolved through the n-gram index
+        and marked in a per-term bitmask (bit q = query q), so a single
+        gather over all entries finds the hits of up to 64 queries at once.
+        Returns one (matches_found, results) per query, in order.
+        """
+        results = []
+        for first in range(0, len(queries), 64):
+            results.extend(self._search_chunk(queries[first:first + 64], limit))
+        return results
+
+    def _search_chunk(self, queries: list, limit: int = None) -> list:
+        with self._lock:
+            matching = [self._matching_terms(query) for query in queries]
+            # One extra zero slot at the end: dead entries (term -1) index it
+            masks = np.zeros(len(self._term_texts) + 1, dtype=np.uint64)
+            for q, terms in enumerate(matching):
+                if terms is not None and len(terms):
+                    masks[terms] |= np.uint64(1 << q)
+
+            entry_masks = masks[self._terms]
+            hits = np.flatnonzero(entry_masks)
+            hit_masks = entry_masks[hits]
+
+            results = []
+            for q, terms in enumerate(matching):
+                if terms is None:
+                    results.append(self._score(None, limit))
+                elif not len(terms):
+                    results.append((0, []))
+                else:
+                    results.append(self._rank_hits(hits[(hit_masks & np.uint64(1 << q)) != 0], limit))
+            return results
+
+    def _score(self, terms, limit: int = None):
+        """Weighted scores of the entries whose term is in terms (None = every term). Call with the lock held."""
+        if terms is None:
+            hits = np.flatnonzero(self._terms >= 0)
+        elif len(terms):
+            hits = np.flatnonzero(np.isin(self._terms, terms))
+        else:
+            return 0, []
+        return self._rank_hits(hits, limit)
+
+    def _rank_hits(self, hits: np.ndarray, limit: int = None):
+        """Score profiles by the hit entries and pick the best. Call with the lock held."""
+        owners = self._owners[hits]
+        scores = np.bincount(owners, weights=self._weights[hits], minlength=len(self._profiles))
+        matched = np.flatnonzero(scores)
+        selected = top_k(scores, matched, limit)
+
+        # Reasons only for the selected profiles, in entry (= field) order
+        keep = np.isin(owners, selected)
+        reasons = defaultdict(list)
+        for entry_id, owner in zip(hits[keep].tolist(), owners[keep].tolist()):
+            reasons[owner].append(self._reasons[entry_id])
+
+        results = [
+            {
+                "profile": self._profiles[slot],
+                "score": int(scores[slot]),
+                "reasons": reasons[slot]
+            }
+            for slot in selected.tolist()
+        ]
+        return len(matched), results
+
+    def _similar_groups(self, query: str, threshold: float) -> list:
+        groups = []
+        for word in dict.fromkeys(tokenize(normalize_key(query))):
+            similar = {w for w, _ in self._fuzzy.similar(word, threshold)}
+            if not similar:
+                return []
+            groups.append(similar)
+        return groups
+
+    def _fuzzy_terms(self, query: str, threshold: float = FUZZY_THRESHOLD) -> set:
+        """Term ids with a word similar to every query word. Call with the lock held."""
+        terms = set()
+        for i, group in enumerate(self._similar_groups(query, threshold)):
+            ids = set().union(*(self._word_terms[w] for w in group))
+            terms = ids if i == 0 else terms & ids
+        return terms
+
+    def fuzzy_search(self, query: str, limit: int = None, threshold: float = FUZZY_THRESHOLD):
+        """
+        search() tolerant to typos and missing diacritics.
+
+        A value matches when each query word is similar to one of its words
+        ("pyhton" -> "Python", "automatyzacja sieci" -> "Automatyzację sieci").
+        Same return value and weights as search().
+        """
+        with self._lock:
+            terms = self._fuzzy_terms(query, threshold)
+            if not terms:
+                return 0, []
+            return self._score(np.fromiter(terms, dtype=np.int32, count=len(terms)), limit)
+
+    def rank(self, query: str, limit: int = None):
+        """
+        Relevance-ranked search: BM25 over all text fields with field boosts.
+
+        Unlike search(), the query is split into words, so "seeking
+        co-founder with tech skills" matches profiles that mention any of
+        them, best first. Returns (matches_found, results) like search(),
+        with float scores and one reason per matched field value.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            scores = self._ranked.scores(terms, len(self._profiles))
+            matched = np.flatnonzero(scores)
+            selected = top_k(scores, matched, limit)
+            profiles = [(self._profiles[slot], float(scores[slot])) for slot in selected.tolist()]
+
+        wanted = set(terms)
+        results = []
+        for profile, score in profiles:
+            reasons = []
+            for field, label, _, tokens in field_tokens(profile):
+                if not wanted.intersection(tokens):
+                    continue
+                value = profile.get(field)
+                if isinstance(value, str):
+                    # Free text (bio, role, offer): name the matched words
+                    reasons.append(f"{label}: {', '.join(dict.fromkeys(t for t in tokens if t in wanted))}")
+                else:
+                    reasons.extend(f"{label}: {v}" for v in value if wanted.intersection(tokenize(v)))
+            results.append({"profile": profile, "score": round(score, 3), "reasons": reasons})
+        return len(matched), results
+
+    def semantic_search(self, query: str, limit: int = None):
+        """
+        Rank profiles by vector similarity to the query (one matrix-vector
+        product over all profiles). Returns (matches_found, results) like
+        search(), with similarity scores and the shared concepts/words;
+        matches_found counts profiles above the similarity threshold.
+        """
+        with self._lock:
+            scores = self._semantic.scores(query, len(self._profiles))
+            matched = np.flatnonzero(scores)
+            # Headroom for candidates that only collided with the query in hash space
+            selected = top_k(scores, matched, None if limit is None else 2 * limit + 10)
+            profiles = [(self._profiles[slot], float(scores[slot])) for slot in selected.tolist()]
+
+        results = []
+        for profile, score in profiles:
+            reasons = explain(query, profile)
+            if not reasons:
+                continue
+            results.append({"profile": profile, "score": round(score, 3), "reasons": reasons})
+            if len(results) == limit:
+                break
+        return len(matched), results
+
+    def suggest(self, profile_id: str, limit: int = None):
+        """
+        Reciprocal matches for a profile: who offers what it seeks and who
+        seeks what it offers, mutual matches first.
+
+        Returns None for an unknown profile, else [{"profile", "score",
+        "mutual", "reasons"}, ...].
+        """
+        with self._lock:
+            slot = self._slot.get(profile_id)
+            if slot is None:
+                return None
+            me = self._profiles[slot]
+            matches = [
+                (self._profiles[other], score, helps_me > 0 and i_help > 0)
+                for score, other, helps_me, i_help in self._affinity.top(slot, limit)
+            ]
+            wanted, offered = self._affinity.seeks(slot), self._affinity.offers(slot)
+
+        results = []
+        for profile, score, mutual in matches:
+            their_offers = list(profile.get("offers") or ()) + list(profile.get("skills") or ())
+            reasons = [f"Offers what you seek: {v}" for v in matching_items(their_offers, wanted)]
+            reasons += [f"Seeks what you offer: {v}" for v in matching_items(profile.get("seeks"), offered)]
+            results.append({"profile": profile, "score": round(score, 3), "mutual": mutual, "reasons": reasons})
+        return results
+
+    # ---------- category filters ----------
+
+    def _live(self) -> np.ndarray:
+        return np.fromiter(sorted(self._slot.values()), dtype=np.uint32, count=len(self._slot))
+
+    def _category_slots(self, field: str, value: str, fuzzy: bool) -> np.ndarray:
+        """Sorted profile indexes with a `field` value containing `value`."""
+        postings = self._postings[field]
+        terms = self._matching_terms(value)
+        if terms is None:
+            terms = np.fromiter(postings, dtype=np.int32, count=len(postings))
+        arrays = [postings[t] for t in terms.tolist() if t in postings] if len(terms) else []
+        if not arrays and fuzzy:
+            arrays = [postings[t] for t in self._fuzzy_terms(value) if t in postings]
+        if not arrays:
+            return np.empty(0, dtype=np.uint32)
+        return np.unique(np.concatenate(arrays))
+
+    def _ranks(self):
+        if self._id_order is None:
+            ids = sorted(self._slot)
+            rank = np.zeros(len(self._profiles), dtype=np.int64)
+            rank[[self._slot[i] for i in ids]] = np.arange(len(ids))
+            self._id_order = (ids, rank)
+        return self._id_order
+
+    def filter_profiles(self, groups: list, limit: int = None, after_id: str = None, fuzzy: bool = False):
+        """
+        Profiles matching parse_filters() groups, ordered by ID.
+
+        Every (field, value) condition resolves to the union of the postings
+        of the terms containing value; AND is an intersection, NOT a
+        difference and OR a union of sorted uint32 arrays. With fuzzy=True a
+        condition that matches no term falls back to typo/diacritic-tolerant
+        term lookup. Returns (matches_found, profiles after after_id, up to limit).
+        """
+        with self._lock:
+            matched = np.empty(0, dtype=np.uint32)
+            for group in groups:
+                positive = [c for c in group if not c[0]]
+                if positive:
+                    result = self._category_slots(positive[0][1], positive[0][2], fuzzy)
+                    for _, field, value in positive[1:]:
+                        result = np.intersect1d(result, self._category_slots(field, value, fuzzy), assume_unique=True)
+                else:
+                    result = self._live()
+                for negated, field, value in group:
+                    if negated:
+                        result = np.setdiff1d(result, self._category_slots(field, value, False), assume_unique=True)
+                matched = np.union1d(matched, result)
+
+            ids, rank = self._ranks()
+            ranks = np.sort(rank[matched])
+            if after_id is not None:
+                ranks = ranks[ranks >= bisect.bisect_right(ids, after_id)]
+            if limit is not None:
+                ranks = ranks[:limit]
+            profiles = [self._profiles[self._slot[ids[r]]] for r in ranks.tolist()]
+        return len(matched), profiles
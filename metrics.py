@@ -0,0 +1,179 @@
+"""
+The Backroom - Prometheus metrics
+Per-tool call, error and latency metrics plus database round trips, served
+in the Prometheus text format at /metrics next to the MCP HTTP transport.
+
+ToolMetrics is a FastMCP middleware: every tools/call is timed and counted,
+and a per-call context variable collects the Supabase round trips and
+bytes the call caused (db.Database listeners report into it), so a tool
+that queries once per result (N+1) shows up as a high round-trip histogram.
+Cache hit ratios and other point-in-time values are gauges collected at
+scrape time. No client library needed.
+"""
+
+import contextvars
+import threading
+import time
+
+from fastmcp.server.middleware import Middleware
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Registry:
+    """Counters and histograms keyed by label values, rendered as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}  # name -> (type, help)
+        self._counters = {}  # name -> {label tuple: value}
+        self._histograms = {}  # name -> (buckets, {label tuple: [bucket counts..., sum, count]})
+        self._collectors = []  # callables -> [(name, help, labels, value), ...] gauges
+
+    def counter(self, name: str, help: str):
+        self._help[name] = ("counter", help)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help: str, buckets: tuple):
+        self._help[name] = ("histogram", help)
+        self._histograms.setdefault(name, (tuple(buckets), {}))
+
+    def collector(self, collect):
+        """Register collect() -> [(name, help, labels dict, value), ...], called per scrape."""
+        self._collectors.append(collect)
+
+    def inc(self, name: str, labels: dict = None, value: float = 1):
+        key = tuple((labels or {}).items())
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict, value: float):
+        key = tuple(labels.items())
+        buckets, series = self._histograms[name]
+        with self._lock:
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines += [f"# HELP {name} {self._help[name][1]}", f"# TYPE {name} counter"]
+                lines += [f"{name}{_labels(dict(key))} {_number(v)}" for key, v in series.items()]
+            for name, (buckets, series) in self._histograms.items():
+                lines += [f"# HELP {name} {self._help[name][1]}", f"# TYPE {name} histogram"]
+                for key, counts in series.items():
+                    labels = dict(key)
+                    for bound, count in zip(buckets, counts):
+                        lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {counts[-1]}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(counts[-2])}")
+                    lines.append(f"{name}_count{_labels(labels)} {counts[-1]}")
+
+        gauges = {}
+        for collect in self._collectors:
+            for name, help, labels, value in collect():
+                if value is not None:
+                    gauges.setdefault(name, (help, []))[1].append((labels, value))
+        for name, (help, samples) in gauges.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+def is_error_result(result) -> bool:
+    """True for a failed tools/call result (tools report most failures as {"error": ...})."""
+    structured = getattr(result, "structured_content", None)
+    return bool(getattr(result, "is_error", False)) or (isinstance(structured, dict) and "error" in structured)
+
+
+class _CallStats:
+    __slots__ = ("round_trips", "bytes")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.bytes = 0
+
+
+# The tool call the current task works for (None outside tool calls)
+_current_call = contextvars.ContextVar("backroom_tool_call", default=None)
+
+
+def _table(path: str) -> str:
+    # "/profiles" -> "profiles", "/rpc/send_connection_request" -> "rpc/send_connection_request"
+    return path.lstrip("/")
+
+
+class ToolMetrics(Middleware):
+    """FastMCP middleware recording per-tool metrics into a Registry."""
+
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        registry.counter("backroom_tool_calls_total", "MCP tool calls.")
+        registry.counter("backroom_tool_errors_total", "MCP tool calls that raised or returned an error.")
+        registry.histogram("backroom_tool_duration_seconds", "MCP tool call latency.", LATENCY_BUCKETS)
+        registry.histogram("backroom_tool_db_round_trips", "Supabase round trips per tool call.", ROUND_TRIP_BUCKETS)
+        registry.histogram("backroom_tool_db_bytes", "Supabase bytes sent and received per tool call.", BYTES_BUCKETS)
+        registry.counter("backroom_db_requests_total", "Supabase HTTP round trips.")
+        registry.counter("backroom_db_request_errors_total", "Supabase round trips that failed.")
+        registry.counter("backroom_db_bytes_total", "Supabase bytes transferred.")
+        registry.histogram("backroom_db_request_duration_seconds", "Supabase round trip latency.", LATENCY_BUCKETS)
+
+    def on_round_trip(self, round_trip: dict):
+        """db.Database listener."""
+        labels = {"table": _table(round_trip["path"]), "method": round_trip["method"]}
+        size = round_trip["bytes_sent"] + round_trip["bytes_received"]
+        self.registry.inc("backroom_db_requests_total", labels)
+        if round_trip["error"] is not None:
+            self.registry.inc("backroom_db_request_errors_total", labels)
+        self.registry.inc("backroom_db_bytes_total", {**labels, "direction": "sent"}, round_trip["bytes_sent"])
+        self.registry.inc("backroom_db_bytes_total", {**labels, "direction": "received"}, round_trip["bytes_received"])
+        self.registry.observe("backroom_db_request_duration_seconds", labels, round_trip["seconds"])
+
+        call = _current_call.get()
+        if call is not None:
+            call.round_trips += 1
+            call.bytes += size
+
+    async def on_call_tool(self, context, call_next):
+        labels = {"tool": context.message.name}
+        call = _CallStats()
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await call_next(context)
+            failed = is_error_result(result)
+            return result
+        finally:
+            _current_call.reset(token)
+            registry = self.registry
+            registry.inc("backroom_tool_calls_total", labels)
+            if failed:
+                registry.inc("backroom_tool_errors_total", labels)
+            registry.observe("backroom_tool_duration_seconds", labels, time.perf_counter() - started)
+            registry.observe("backroom_tool_db_round_trips", labels, call.round_trips)
+            registry.observe("backroom_tool_db_bytes", labels, call.bytes)
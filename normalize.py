@@ -0,0 +1,92 @@
+"""
+The Backroom - Search key normalization
+One normalization for stored profile values and for queries.
+
+normalize_key() casefolds, strips diacritics (NFKD), collapses whitespace
+and rewrites aliases to one canonical spelling, so "K8s", "kubernetes" and
+" Kubernetes " compare equal and "Łódź" matches "lodz". fold_key() is the
+same without the aliases; substring searches look up both, so a short
+query such as "js" still finds "Vue.js" (key "vue"). Writes store the
+keys of every searchable value in the search_keys column (sql/004) and
+backfill_search_keys.py covers rows written before it; readers fall back to
+computing them for rows that have none.
+"""
+
+import re
+from functools import lru_cache
+
+from search_index import fold
+
+# Searchable fields with keys, in stored order
+KEY_FIELDS = ("offers", "seeks", "skills", "industry", "tags", "role")
+
+# alias -> canonical spelling (both folded)
+ALIASES = {
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "golang": "go",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "gcp": "google cloud",
+    "ecommerce": "e-commerce",
+    "cofounder": "co-founder",
+}
+
+# Words as aliases see them: "node.js" and "c++" stay whole, a trailing "." does not
+_WORD = re.compile(r"[\w+#]+(?:\.[\w+#]+)*")
+
+
+@lru_cache(maxsize=1 << 16)
+def fold_key(text: str) -> str:
+    """Folded spelling of a value or query, aliases kept ("  K8s  Łódź" -> "k8s lodz")."""
+    if not text:
+        return ""
+    return " ".join(fold(text).split())
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize_key(text: str) -> str:
+    """Search key of a value or query ("  K8s  Łódź" -> "kubernetes lodz")."""
+    return _WORD.sub(lambda m: ALIASES.get(m.group(), m.group()), fold_key(text))
+
+
+def _values(profile, field: str) -> list:
+    value = profile.get(field)
+    if field == "role":
+        return [value] if value else []
+    return list(value or ())
+
+
+def search_keys(profile) -> list:
+    """Stored form of a profile's keys: ["offers:code review", ..., "role:python developer"]."""
+    return [f"{field}:{normalize_key(value)}" for field in KEY_FIELDS for value in _values(profile, field)]
+
+
+def field_keys(profile) -> dict:
+    """
+    field -> keys of its values, in value order.
+
+    Stored search_keys are used for every field whose key count still lines
+    up with its values; other fields (and rows without stored keys) are
+    normalized here.
+    """
+    stored = {}
+    for key in profile.get("search_keys") or ():
+        field, _, value = key.partition(":")
+        stored.setdefault(field, []).append(value)
+
+    keys = {}
+    for field in KEY_FIELDS:
+        values = _values(profile, field)
+        known = stored.get(field)
+        keys[field] = known if known is not None and len(known) == len(values) else [normalize_key(v) for v in values]
+    return keys
@@ -0,0 +1,41 @@
+"""
+The Backroom - Pagination helpers
+Opaque cursors and page-size limits shared by the paginated MCP tools.
+
+A cursor is URL-safe base64 of a small JSON value (for keyset pagination,
+the last key returned). Clients must pass it back unchanged.
+"""
+
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(value) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, expected: type = None):
+    """
+    Value encoded in cursor; None for an empty cursor. Raises ValueError if
+    malformed or, with expected (e.g. str for a keyset cursor), of another type.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if expected is not None and not isinstance(value, expected):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return value
+
+
+def clamp_page_size(page_size: int, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    if not page_size or page_size < 1:
+        return default
+    return min(page_size, maximum)
@@ -0,0 +1,199 @@
+"""
+The Backroom - Profile cache
+In-process TTL + LRU cache in front of the Supabase profiles table.
+
+The full profile list (the search corpus) and single-profile lookups share
+one bounded LRU. Writes go through put()/invalidate() so a freshly
+registered or updated profile is visible immediately, without waiting for
+the TTL to expire. Expired entries count as misses but stay until replaced
+or evicted, so stale_all()/stale() can still serve them while the database
+is unavailable.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProfileCache:
+    """Thread-safe TTL/LRU cache for profile rows."""
+
+    ALL_KEY = "__all__"
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1000, list_item=None):
+        """
+        Args:
+            ttl: seconds an entry stays fresh (0 disables caching)
+            max_entries: LRU bound (the full list counts as one entry)
+            list_item: callable(row) -> item stored in the full list, for
+                lists that hold a compact projection instead of rows
+        """
+        self.ttl = ttl
+        self._list_item = list_item or (lambda row: row)
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped whenever a (re)load from the database brought a different
+        # list, so derived structures (search indexes) know when to rebuild.
+        self.generation = 0
+        self._loaded = None  # last list from the database, for the comparison
+
+    # ---------- internals (call with self._lock held) ----------
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl <= 0 or time.monotonic() - stored_at > self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value, stored_at: float = None):
+        self._entries[key] = (stored_at or time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ---------- reads ----------
+
+    def _cached_all(self):
+        with self._lock:
+            profiles = self._lookup(self.ALL_KEY)
+            if profiles is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return profiles
+
+    def _remember_all(self, profiles: list) -> list:
+        with self._lock:
+            entry = self._entries.get(self.ALL_KEY)
+            previous = entry[1] if entry else self._loaded
+        # A TTL reload usually brings back the same rows; compared outside
+        # the lock, as the list can be large
+        changed = previous is None or previous != profiles
+        if not changed:
+            # Keep the objects the derived structures already hold
+            profiles = previous
+        with self._lock:
+            self._loaded = profiles
+            if self.ttl > 0:
+                self._store(self.ALL_KEY, profiles)
+            if changed:
+                self.generation += 1
+        return profiles
+
+    def _cached_one(self, profile_id: str):
+        with self._lock:
+            row = self._lookup(f"profile:{profile_id}")
+            if row is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return row
+
+    def _remember_one(self, profile_id: str, row):
+        if row is not None and self.ttl > 0:
+            with self._lock:
+                self._store(f"profile:{profile_id}", row)
+
+    def get_all(self, loader) -> list:
+        """Return the full profile list, calling loader() on a miss."""
+        profiles = self._cached_all()
+        if profiles is None:
+            profiles = self._remember_all(loader())
+        return profiles
+
+    async def get_all_async(self, loader) -> list:
+        """Async get_all(): loader is a coroutine function."""
+        profiles = self._cached_all()
+        if profiles is None:
+            profiles = self._remember_all(await loader())
+        return profiles
+
+    def get(self, profile_id: str, loader):
+        """Return one profile row (or None), calling loader(profile_id) on a miss."""
+        row = self._cached_one(profile_id)
+        if row is None:
+            row = loader(profile_id)
+            self._remember_one(profile_id, row)
+        return row
+
+    async def get_async(self, profile_id: str, loader):
+        """Async get(): loader is a coroutine function."""
+        row = self._cached_one(profile_id)
+        if row is None:
+            row = await loader(profile_id)
+            self._remember_one(profile_id, row)
+        return row
+
+    def stale_all(self):
+        """The last loaded full list however old, or None (degraded mode)."""
+        with self._lock:
+            entry = self._entries.get(self.ALL_KEY)
+            return entry[1] if entry else None
+
+    def stale(self, profile_id: str):
+        """The last cached row of one profile however old, or None (degraded mode)."""
+        with self._lock:
+            entry = self._entries.get(f"profile:{profile_id}")
+            return entry[1] if entry else None
+
+    # ---------- writes ----------
+
+    def put(self, row: dict):
+        """Write-through: store a fresh row and patch it into the cached full list."""
+        profile_id = row.get("id")
+        if profile_id is None or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._store(f"profile:{profile_id}", row)
+
+            entry = self._entries.get(self.ALL_KEY)
+            if entry is not None:
+                stored_at, profiles = entry
+                item = self._list_item(row)
+                # Copy-on-write so callers iterating the old list are unaffected
+                patched = [item if p.get("id") == profile_id else p for p in profiles]
+                if not any(p.get("id") == profile_id for p in profiles):
+                    patched.append(item)
+                self._entries[self.ALL_KEY] = (stored_at, patched)
+
+    def evict(self, profile_id: str):
+        """Drop one cached profile row, keeping the full list."""
+        with self._lock:
+            self._entries.pop(f"profile:{profile_id}", None)
+
+    def invalidate(self, profile_id: str = None):
+        """Drop one profile (and the full list), or everything when profile_id is None."""
+        with self._lock:
+            if profile_id is None:
+                self._entries.clear()
+                return
+            self._entries.pop(f"profile:{profile_id}", None)
+            self._entries.pop(self.ALL_KEY, None)
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            full_list = self._entries.get(self.ALL_KEY)
+            return {
+                "profiles_cached": len(full_list[1]) if full_list else 0,
+                "age_seconds": round(time.monotonic() - full_list[0], 3) if full_list else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+            }
@@ -0,0 +1,56 @@
+"""
+The Backroom - Batched profile loader
+DataLoader-style helper that resolves many profile IDs in one query.
+
+Create one ProfileLoader per tool call: prime() every ID the call will
+need, then load()/load_many() fetch all pending IDs with a single
+`id=in.(...)` query and memoize the rows (including misses) for the rest
+of the call.
+"""
+
+
+class ProfileLoader:
+    """Per-call batched and memoized profile lookup."""
+
+    def __init__(self, fetch_many, columns: str = "*", max_batch_size: int = 200):
+        """
+        Args:
+            fetch_many: async callable(ids, columns) -> list of profile rows
+            columns: columns to select; "id" is always included
+            max_batch_size: IDs per query (keeps the request URL bounded)
+        """
+        self._fetch_many = fetch_many
+        self._columns = columns if columns == "*" or "id" in [c.strip() for c in columns.split(",")] else f"id, {columns}"
+        self._max_batch_size = max_batch_size
+        self._rows = {}  # profile_id -> row or None (not found)
+        self._pending = {}  # insertion-ordered set of IDs to fetch
+        self.round_trips = 0
+
+    def prime(self, *profile_ids):
+        """Queue IDs for the next batch without fetching yet."""
+        for profile_id in profile_ids:
+            if profile_id is not None and profile_id not in self._rows and profile_id not in self._pending:
+                self._pending[profile_id] = None
+
+    async def _dispatch(self):
+        pending, self._pending = list(self._pending), {}
+        for i in range(0, len(pending), self._max_batch_size):
+            batch = pending[i:i + self._max_batch_size]
+            self.round_trips += 1
+            rows = await self._fetch_many(batch, self._columns)
+            for profile_id in batch:
+                self._rows[profile_id] = None
+            for row in rows:
+                self._rows[row.get("id")] = row
+
+    async def load_many(self, profile_ids) -> dict:
+        """Return {profile_id: row or None} for all given IDs."""
+        profile_ids = list(profile_ids)
+        self.prime(*profile_ids)
+        if self._pending:
+            await self._dispatch()
+        return {profile_id: self._rows.get(profile_id) for profile_id in profile_ids}
+
+    async def load(self, profile_id: str):
+        """Return one profile row, or None if it does not exist."""
+        return (await self.load_many([profile_id]))[profile_id]
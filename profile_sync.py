@@ -0,0 +1,251 @@
+"""
+The Backroom - Incremental profile sync
+In-memory replica of the profiles table, kept fresh by polling for rows
+changed since the last `updated_at` watermark (see sql/003).
+
+Only changed rows travel over the wire, so bandwidth scales with the rate of
+change rather than the table size. Deleted rows are removed by a periodic
+reconcile that fetches just the list of IDs.
+
+The replica itself does no I/O. Callers supply the fetch functions:
+
+    fetch_changes(since, offset, limit) -> rows with updated_at >= since
+                                           (all rows when since is None),
+                                           ordered by updated_at, id
+    fetch_ids(offset, limit)            -> [{"id": ...}, ...] ordered by id
+
+and drive it with run_async_worker() (MCP server) or start_thread_worker()
+(Gradio app, which is synchronous).
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+PAGE_SIZE = 1000
+
+
+def _rewind(watermark: str, seconds: float) -> str:
+    """Move an ISO timestamp back a little to catch rows committed out of order."""
+    try:
+        moment = datetime.fromisoformat(watermark.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return watermark
+    return (moment - timedelta(seconds=seconds)).isoformat()
+
+
+class ProfileReplica:
+    """Thread-safe in-memory copy of the profiles table."""
+
+    def __init__(self, overlap_seconds: float = 5.0, transform=None):
+        """
+        Args:
+            overlap_seconds: how far behind the watermark each poll starts
+            transform: callable(row) -> stored item (e.g. a compact record);
+                items must support .get("id") and ==
+        """
+        self._lock = threading.Lock()
+        self._transform = transform or (lambda row: row)
+        self._rows = {}  # profile_id -> item, in first-seen order
+        self._snapshot = None
+        self._listeners = []
+        self.overlap_seconds = overlap_seconds
+        self.watermark = None  # max updated_at applied from the database
+        self.ready = False  # True once the initial full load finished
+        # Bumped on the initial full load; later changes reach listeners instead
+        self.generation = 0
+        self.last_sync_at = None  # monotonic time of the last successful poll
+        self.last_reconcile_at = None
+        self.syncs = 0
+        self.sync_errors = 0
+        self.rows_applied = 0
+        self.rows_deleted = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def subscribe(self, listener):
+        """listener(upserted_items, deleted_ids) is called after every applied change."""
+        self._listeners.append(listener)
+
+    def _notify(self, rows: list, deleted: list):
+        for listener in self._listeners:
+            listener(rows, deleted)
+
+    # ---------- reads ----------
+
+    def snapshot(self) -> list:
+        """Current list of profile items (shared, do not mutate)."""
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = list(self._rows.values())
+            return self._snapshot
+
+    def get(self, profile_id: str):
+        with self._lock:
+            return self._rows.get(profile_id)
+
+    def since(self):
+        """Lower bound for the next fetch_changes() call."""
+        with self._lock:
+            if self.watermark is None:
+                return None
+            return _rewind(self.watermark, self.overlap_seconds)
+
+    # ---------- writes ----------
+
+    def apply_changes(self, rows: list, from_database: bool = True):
+        """Upsert rows. Rows written locally (from_database=False) do not move the watermark."""
+        changed = []
+        with self._lock:
+            for row in rows:
+                updated_at = row.get("updated_at")
+                if from_database and updated_at and (self.watermark is None or updated_at > self.watermark):
+                    self.watermark = updated_at
+                # The overlap window re-fetches recent rows; skip the unchanged ones
+                item = self._transform(row)
+                if self._rows.get(row.get("id")) != item:
+                    self._rows[row.get("id")] = item
+                    changed.append(item)
+            if changed:
+                self._snapshot = None
+                self.rows_applied += len(changed)
+        if changed and self.ready:
+            self._notify(changed, [])
+
+    def load(self, rows: list):
+        """Initial full load."""
+        with self._lock:
+            self._rows = {}
+        self.apply_changes(rows)
+        with self._lock:
+            self.ready = True
+            self.generation += 1
+            self.last_reconcile_at = time.monotonic()
+
+    def reconcile(self, ids: list):
+        """Drop rows whose ID no longer exists in the database (deletions)."""
+        live = set(ids)
+        with self._lock:
+            deleted = [profile_id for profile_id in self._rows if profile_id not in live]
+            for profile_id in deleted:
+                del self._rows[profile_id]
+            if deleted:
+                self._snapshot = None
+                self.rows_deleted += len(deleted)
+            self.last_reconcile_at = time.monotonic()
+        if deleted:
+            self._notify([], deleted)
+
+    def remove(self, profile_id: str):
+        with self._lock:
+            if self._rows.pop(profile_id, None) is None:
+                return
+            self._snapshot = None
+            self.rows_deleted += 1
+        self._notify([], [profile_id])
+
+    def reconcile_due(self, interval: float) -> bool:
+        return self.last_reconcile_at is None or time.monotonic() - self.last_reconcile_at >= interval
+
+    def mark_synced(self):
+        with self._lock:
+            self.syncs += 1
+            self.last_sync_at = time.monotonic()
+
+    # ---------- stats ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "ready": self.ready,
+                "profiles": len(self._rows),
+                "watermark": self.watermark,
+                # Upper bound on how stale the replica can be
+                "lag_seconds": round(now - self.last_sync_at, 3) if self.last_sync_at else None,
+                "seconds_since_reconcile": round(now - self.last_reconcile_at, 3) if self.last_reconcile_at else None,
+                "syncs": self.syncs,
+                "sync_errors": self.sync_errors,
+                "rows_applied": self.rows_applied,
+                "rows_deleted": self.rows_deleted,
+            }
+
+
+# ============== WORKERS ==============
+
+async def _collect_async(fetch, *args) -> list:
+    rows, offset = [], 0
+    while True:
+        page = await fetch(*args, offset, PAGE_SIZE)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+async def sync_once_async(replica: ProfileReplica, fetch_changes, fetch_ids, reconcile_interval: float):
+    """One poll: full load first time, then changes since the watermark (+ reconcile when due)."""
+    # Applying a poll (and the listeners re-indexing it) is CPU work: keep it off the event loop
+    if not replica.ready:
+        await asyncio.to_thread(replica.load, await _collect_async(fetch_changes, None))
+    else:
+        await asyncio.to_thread(replica.apply_changes, await _collect_async(fetch_changes, replica.since()))
+        if replica.reconcile_due(reconcile_interval):
+            ids = [row["id"] for row in await _collect_async(fetch_ids)]
+            await asyncio.to_thread(replica.reconcile, ids)
+    replica.mark_synced()
+
+
+async def run_async_worker(replica: ProfileReplica, fetch_changes, fetch_ids,
+                           poll_interval: float = 5.0, reconcile_interval: float = 300.0):
+    """Poll forever on the current event loop (start with asyncio.create_task)."""
+    while True:
+        try:
+            await sync_once_async(replica, fetch_changes, fetch_ids, reconcile_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            replica.sync_errors += 1
+            print(f"Profile sync error: {e}", file=sys.stderr)
+        await asyncio.sleep(poll_interval)
+
+
+def _collect(fetch, *args) -> list:
+    rows, offset = [], 0
+    while True:
+        page = fetch(*args, offset, PAGE_SIZE)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+def sync_once(replica: ProfileReplica, fetch_changes, fetch_ids, reconcile_interval: float):
+    """Synchronous sync_once_async()."""
+    if not replica.ready:
+        replica.load(_collect(fetch_changes, None))
+    else:
+        replica.apply_changes(_collect(fetch_changes, replica.since()))
+        if replica.reconcile_due(reconcile_interval):
+            replica.reconcile([row["id"] for row in _collect(fetch_ids)])
+    replica.mark_synced()
+
+
+def start_thread_worker(replica: ProfileReplica, fetch_changes, fetch_ids,
+                        poll_interval: float = 5.0, reconcile_interval: float = 300.0) -> threading.Thread:
+    """Poll forever on a daemon thread."""
+    def loop():
+        while True:
+            try:
+                sync_once(replica, fetch_changes, fetch_ids, reconcile_interval)
+            except Exception as e:
+                replica.sync_errors += 1
+                print(f"Profile sync error: {e}", file=sys.stderr)
+            time.sleep(poll_interval)
+
+    thread = threading.Thread(target=loop, name="profile-sync", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,217 @@
+"""
+The Backroom - Per-tool profiling
+Profiles a random fraction of MCP tool calls and Gradio handler calls and
+writes one file per tool for offline flamegraphs:
+
+    cprofile  deterministic cProfile, merged into <dir>/<tool>.pstats
+              (snakeviz, flameprof, python -m pstats)
+    sampling  a background thread samples the call's stack every few ms and
+              appends folded stacks to <dir>/<tool>.collapsed
+              (flamegraph.pl, speedscope, inferno)
+
+Calls that are not picked cost one random() draw, so sampling mode at
+PROFILER_RATE=0.01 can stay on in production. The sampler only records
+stacks in which the profiled call's own frame is running: for async tools
+that is the call's on-CPU time on the event loop, not other tasks
+interleaved with it. cProfile sees everything on the thread while it is
+enabled, and only one call is cProfiled at a time.
+
+    profiler = Profiler("sampling", rate=0.01, directory="/tmp/profiles")
+    mcp.add_middleware(ProfilingMiddleware(profiler))
+    find_matches = profiler.wrap(find_matches)
+"""
+
+import contextlib
+import cProfile
+import functools
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # the Gradio app is deployed without fastmcp
+    Middleware = object
+
+MODES = ("cprofile", "sampling")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name) or "unnamed"
+
+
+class _Sample:
+    __slots__ = ("name", "thread_id", "frame", "stacks")
+
+    def __init__(self, name: str, frame):
+        self.name = name
+        self.thread_id = threading.get_ident()
+        self.frame = frame
+        self.stacks = Counter()  # "outer;...;inner" -> samples
+
+
+class Profiler:
+    """Profiles a sampled fraction of calls and dumps the results per name."""
+
+    def __init__(self, mode: str = "", rate: float = 0.01, directory: str = "profiles", interval: float = 0.005):
+        """
+        Args:
+            mode: "cprofile", "sampling", or "" (disabled)
+            rate: fraction of calls profiled (0..1)
+            directory: where <name>.pstats / <name>.collapsed files go
+            interval: seconds between stack samples (sampling mode)
+        """
+        if mode and mode not in MODES:
+            raise ValueError(f"Unknown profiler mode {mode!r} (use one of {', '.join(MODES)})")
+        self.mode = mode
+        self.rate = rate
+        self.directory = directory
+        self.interval = interval
+        self.enabled = bool(mode) and rate > 0
+        self.profiled = 0
+        self.skipped = 0  # picked calls not profiled because cProfile was busy
+        self._lock = threading.Lock()
+        self._cprofile_busy = False
+        self._stats = {}  # name -> merged pstats.Stats
+        self._active = set()  # _Sample objects being sampled
+        self._sampler = None
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextlib.contextmanager
+    def profile(self, name: str, frame=None):
+        """
+        Profile the enclosed block if this call is picked.
+
+        frame: the caller's frame (sys._getframe()); sampling keeps only the
+        stacks running inside it, cropped to start there
+        """
+        if not self.enabled or random.random() >= self.rate:
+            yield
+            return
+        if self.mode == "cprofile":
+            with self._cprofile(name):
+                yield
+        else:
+            with self._sampling(name, frame):
+                yield
+
+    @contextlib.contextmanager
+    def _cprofile(self, name: str):
+        with self._lock:
+            busy, self._cprofile_busy = self._cprofile_busy, True
+        if busy:
+            self.skipped += 1
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+            self._dump_pstats(name, profile)
+        finally:
+            with self._lock:
+                self._cprofile_busy = False
+
+    def _dump_pstats(self, name: str, profile: cProfile.Profile):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+            stats.dump_stats(os.path.join(self.directory, f"{_file_name(name)}.pstats"))
+            self.profiled += 1
+
+    @contextlib.contextmanager
+    def _sampling(self, name: str, frame):
+        sample = _Sample(name, frame)
+        with self._lock:
+            self._active.add(sample)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active.discard(sample)
+            self._dump_collapsed(sample)
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+                active = list(self._active)
+            frames = sys._current_frames()
+            for sample in active:
+                frame = frames.get(sample.thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    if frame is sample.frame:
+                        break
+                    frame = frame.f_back
+                else:
+                    if sample.frame is not None:
+                        continue  # the thread is running something else right now
+                if stack:
+                    sample.stacks[";".join(reversed(stack))] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def _dump_collapsed(self, sample: _Sample):
+        lines = "".join(f"{stack} {count}\n" for stack, count in sample.stacks.items())
+        with self._lock:
+            if lines:
+                with open(os.path.join(self.directory, f"{_file_name(sample.name)}.collapsed"), "a", encoding="utf-8") as f:
+                    f.write(lines)
+            self.profiled += 1
+
+    def wrap(self, fn, name: str = None):
+        """fn itself when disabled, else fn profiled under name (default fn.__name__)."""
+        if not self.enabled:
+            return fn
+        name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            with self.profile(name, sys._getframe()):
+                return fn(*args, **kwargs)
+
+        return profiled
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode or None,
+            "rate": self.rate,
+            "directory": self.directory,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+        }
+
+
+class ProfilingMiddleware(Middleware):
+    """FastMCP middleware profiling a sampled fraction of tools/call requests per tool."""
+
+    def __init__(self, profiler: Profiler):
+        self.profiler = profiler
+
+    async def on_call_tool(self, context, call_next):
+        with self.profiler.profile(context.message.name, sys._getframe()):
+            return await call_next(context)
@@ -0,0 +1,131 @@
+"""
+The Backroom - Ranked search index
+BM25 inverted index over every searchable profile field.
+
+Each field is tokenized into words; a term's frequency in a profile is the
+sum of its per-field counts times the field boost (a simplified BM25F), so
+a word in `offers` counts more than the same word in `bio`. Postings keep
+the weighted frequency per profile slot, and a query only touches the
+postings of its own terms.
+"""
+
+import math
+import re
+
+import numpy as np
+
+# (field, boost, reason label) - list fields and text fields alike
+RANKED_FIELDS = (
+    ("offers", 3.0, "Offers"),
+    ("seeks", 2.0, "Seeks"),
+    ("skills", 2.0, "Skill"),
+    ("tags", 2.0, "Tag"),
+    ("role", 1.5, "Role"),
+    ("industry", 1.0, "Industry"),
+    ("offer_free", 1.0, "Free offer"),
+    ("bio", 0.5, "Bio"),
+)
+
+# Function words that carry no signal (English and Polish)
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have i in is it me my of on or
+    that the to we who with
+    a ale czy dla do i jak jest ktoś kto na o od po się w we z za ze że
+""".split())
+
+# Hyphenated words are one token ("co-founder" == "cofounder", "e-commerce" == "ecommerce")
+_TOKEN = re.compile(r"\w+(?:-\w+)*")
+
+
+def tokenize(text: str) -> list:
+    """Lowercased word tokens without stopwords."""
+    tokens = (t.replace("-", "") for t in _TOKEN.findall(text.lower()))
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def field_tokens(profile):
+    """Yield (field, label, boost, tokens) for every ranked field of a profile."""
+    for field, boost, label in RANKED_FIELDS:
+        value = profile.get(field)
+        if not value:
+            continue
+        text = value if isinstance(value, str) else " ".join(value)
+        tokens = tokenize(text)
+        if tokens:
+            yield field, label, boost, tokens
+
+
+class BM25Index:
+    """Incrementally updatable BM25 index keyed by integer slots."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> {slot: weighted term frequency}
+        self._arrays = {}  # term -> (slots, frequencies), built on first query
+        self._doc_terms = {}  # slot -> terms (for removal)
+        self._lengths = np.zeros(0, dtype=np.float64)  # slot -> weighted length
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, slot: int, profile):
+        """Index a profile under slot (replacing whatever was there)."""
+        self.remove(slot)
+        frequencies = {}
+        length = 0.0
+        for _, _, boost, tokens in field_tokens(profile):
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0.0) + boost
+            length += boost * len(tokens)
+
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[slot] = frequency
+            self._arrays.pop(term, None)
+        self._doc_terms[slot] = list(frequencies)
+        if slot >= len(self._lengths):
+            grown = np.zeros(max(slot + 1, 2 * len(self._lengths)), dtype=np.float64)
+            grown[:len(self._lengths)] = self._lengths
+            self._lengths = grown
+        self._lengths[slot] = length
+        self._total_length += length
+
+    def remove(self, slot: int):
+        terms = self._doc_terms.pop(slot, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._arrays.pop(term, None)
+            posting = self._postings[term]
+            del posting[slot]
+            if not posting:
+                del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+
+    def scores(self, terms: list, size: int) -> np.ndarray:
+        """BM25 score of every slot below size for the query terms (0 = no match)."""
+        scores = np.zeros(size, dtype=np.float64)
+        documents = len(self._doc_terms)
+        if not documents:
+            return scores
+        average = self._total_length / documents or 1.0
+        k1, b = self.k1, self.b
+
+        for term in set(terms):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+            arrays = self._arrays.get(term)
+            if arrays is None:
+                arrays = self._arrays[term] = (
+                    np.fromiter(posting.keys(), dtype=np.int64, count=df),
+                    np.fromiter(posting.values(), dtype=np.float64, count=df)
+                )
+            slots, tf = arrays
+            norm = k1 * (1 - b + b * self._lengths[slots] / average)
+            scores[slots] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
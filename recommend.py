@@ -0,0 +1,218 @@
+"""
+The Backroom - Reciprocal match recommendations
+"Who can help me and whom can I help" for suggest_matches.
+
+A profile offers terms (word stems and concepts of its offers and skills)
+and seeks terms (of its seeks). Two inverted lists - term -> profiles
+offering it, term -> profiles seeking it - are the sparse factorization of
+the offers x seeks affinity matrix: the affinity of a pair is the summed
+IDF of the terms one seeks and the other offers.
+
+Concepts ("~marketing") only strengthen a direction that already shares a
+word: two profiles that merely fall under the same concept are not a
+match, so every suggestion has a concrete offer or seek as its reason.
+
+Each profile's top-N list is computed from those lists (one bincount per
+direction) the first time it is asked for and cached. A write only marks
+stale the cached lists of the profiles that share a term with the old or
+new version of the written profile; those keep being served, minus removed
+profiles, until refresh() recomputes them off the request path. So a write
+never triggers an all-pairs recompute and never makes a read wait for one.
+(IDF drift from unrelated writes is tolerated until a list is next
+recomputed.)
+"""
+
+import math
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+from semantic import features
+
+# Affinity of a shared concept relative to a shared word of the same IDF
+CONCEPT_WEIGHT = 0.25
+
+
+@lru_cache(maxsize=1 << 16)
+def _value_terms(value: str) -> frozenset:
+    # Offers/skills/seeks values repeat across profiles: extract once
+    return frozenset(f for f in features(value) if " " not in f)
+
+
+def _terms(values) -> set:
+    """Stems and concepts of a list of offers/seeks/skills (no word pairs)."""
+    return set().union(*(_value_terms(value) for value in values or ()))
+
+
+def _is_concept(term: str) -> bool:
+    return term.startswith("~")
+
+
+def matching_items(values, terms: set) -> list:
+    """The items of an offers/skills/seeks list that share a word (not just a concept) with terms."""
+    return [
+        value for value in values or ()
+        if any(term in terms and not _is_concept(term) for term in _value_terms(value))
+    ]
+
+
+class AffinityIndex:
+    """Incrementally maintained offers <-> seeks matches, keyed by integer slots."""
+
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self._offers = {}  # slot -> offered terms
+        self._seeks = {}  # slot -> sought terms
+        self._offered_by = {}  # term -> slots offering it
+        self._sought_by = {}  # term -> slots seeking it
+        self._top = {}  # slot -> cached [(score, slot, helps_me, i_help), ...]
+        self._stale = set()  # cached slots a write may have changed
+        self._size = 0  # highest slot + 1
+
+    def __len__(self):
+        return len(self._offers)
+
+    def _invalidate(self, offers: set, seeks: set):
+        """Mark stale the cached lists that an offer or seek of these terms could change."""
+        if not self._top:
+            # Nothing cached (e.g. during the initial build): nothing to walk
+            return
+        cached = self._top
+        for terms, postings in ((offers, self._sought_by), (seeks, self._offered_by)):
+            for term in terms:
+                self._stale.update(slot for slot in postings.get(term, ()) if slot in cached)
+
+    def add(self, slot: int, profile):
+        """Index a profile under slot (replacing whatever was there)."""
+        self.add_many([(slot, profile)])
+
+    def add_many(self, items):
+        """
+        add() for many (slot, profile) pairs: the term lists are filled once
+        per term and cached lists invalidated once, so building the index
+        for N profiles is linear.
+        """
+        offered_by, sought_by = defaultdict(list), defaultdict(list)
+        for slot, profile in items:
+            # A rewritten profile keeps its list (as stale) like the lists it affects
+            kept = self._top.get(slot)
+            self.remove(slot)
+            if kept is not None:
+                self._top[slot] = kept
+                self._stale.add(slot)
+            self._size = max(self._size, slot + 1)
+            offers = _terms(profile.get("offers")) | _terms(profile.get("skills"))
+            seeks = _terms(profile.get("seeks"))
+            self._offers[slot] = offers
+            self._seeks[slot] = seeks
+            for term in offers:
+                offered_by[term].append(slot)
+            for term in seeks:
+                sought_by[term].append(slot)
+        for new, postings in ((offered_by, self._offered_by), (sought_by, self._sought_by)):
+            for term, slots in new.items():
+                postings.setdefault(term, set()).update(slots)
+        self._invalidate(offered_by.keys(), sought_by.keys())
+
+    def remove(self, slot: int):
+        offers = self._offers.pop(slot, None)
+        if offers is None:
+            return
+        seeks = self._seeks.pop(slot)
+        for terms, postings in ((offers, self._offered_by), (seeks, self._sought_by)):
+            for term in terms:
+                postings[term].discard(slot)
+                if not postings[term]:
+                    del postings[term]
+        self._top.pop(slot, None)
+        self._stale.discard(slot)
+        self._invalidate(offers, seeks)
+
+    def _weight(self, term: str) -> float:
+        df = len(self._offered_by.get(term, ())) + len(self._sought_by.get(term, ()))
+        idf = math.log(1 + len(self._offers) / df)
+        return idf * CONCEPT_WEIGHT if _is_concept(term) else idf
+
+    def _direction(self, terms: set, postings: dict) -> tuple:
+        """
+        (affinity per slot over terms, mask of the slots sharing at least one
+        word), as arrays of length self._size.
+        """
+        slots, weights, words = [], [], []
+        for term in terms:
+            others = postings.get(term)
+            if not others:
+                continue
+            others = np.fromiter(others, dtype=np.int64, count=len(others))
+            slots.append(others)
+            weights.append(np.full(len(others), self._weight(term)))
+            if not _is_concept(term):
+                words.append(others)
+        shares = np.zeros(self._size, dtype=bool)
+        if not words:
+            return np.zeros(self._size), shares
+        shares[np.concatenate(words)] = True
+        scores = np.bincount(np.concatenate(slots), weights=np.concatenate(weights), minlength=self._size)
+        return scores, shares
+
+    def _compute(self, slot: int) -> list:
+        helps_me, helps_me_shares = self._direction(self._seeks[slot], self._offered_by)
+        i_help, i_help_shares = self._direction(self._offers[slot], self._sought_by)
+        helps_me[~helps_me_shares] = 0.0
+        i_help[~i_help_shares] = 0.0
+
+        helps_me_shares[slot] = i_help_shares[slot] = False
+        others = np.flatnonzero(helps_me_shares | i_help_shares)
+        a, b = helps_me[others], i_help[others]
+        total = a + b
+        # Mutual matches (help flows both ways) first, then by total affinity
+        mutual = (a > 0) & (b > 0)
+        best = np.lexsort((others, -total, ~mutual))[:self.top_n]
+        return list(zip(total[best].tolist(), others[best].tolist(), a[best].tolist(), b[best].tolist()))
+
+    def top(self, slot: int, limit: int = None) -> list:
+        """
+        Best matches for slot as [(score, other slot, helps_me, i_help), ...],
+        mutual matches first. Served from the cache, stale or not; computed
+        only the first time a slot is asked for.
+        """
+        if slot not in self._offers:
+            return []
+        matches = self._top.get(slot)
+        if matches is None:
+            matches = self._top[slot] = self._compute(slot)
+        elif slot in self._stale:
+            # Every list holding a removed profile shared a term with it, so is stale
+            matches = [m for m in matches if m[1] in self._offers]
+        return matches[:limit]
+
+    @property
+    def stale(self) -> int:
+        """Number of cached lists waiting for refresh()."""
+        return len(self._stale)
+
+    def refresh(self, max_lists: int = None) -> int:
+        """Recompute up to max_lists stale cached lists; returns how many are still stale."""
+        refreshed = 0
+        while self._stale and (max_lists is None or refreshed < max_lists):
+            slot = self._stale.pop()
+            self._top[slot] = self._compute(slot)
+            refreshed += 1
+        return len(self._stale)
+
+    def cached(self) -> dict:
+        """slot -> cached list (stale or not)."""
+        return dict(self._top)
+
+    def adopt(self, lists: dict):
+        """Take over cached lists, e.g. of the index this one replaces; they count as stale."""
+        lists = {slot: matches for slot, matches in lists.items() if slot in self._offers}
+        self._top.update(lists)
+        self._stale.update(lists)
+
+    def seeks(self, slot: int) -> set:
+        return self._seeks.get(slot, set())
+
+    def offers(self, slot: int) -> set:
+        return self._offers.get(slot, set())
@@ -0,0 +1,236 @@
+"""
+The Backroom - Resilient database calls
+Deadlines, retries, hedged reads and a circuit breaker for db.Database.
+
+Every request gets a deadline (read or write default, or the query's own
+.timeout()) that bounds all of its attempts together. Idempotent reads
+(GET/HEAD) that fail with a timeout, a connection error or a 5xx are
+retried with full-jitter exponential backoff while the deadline allows.
+With hedging on, a read still unanswered after the recent p95 latency gets
+a duplicate request and the first answer wins.
+
+The circuit breaker opens after consecutive failures and then rejects
+calls immediately with CircuitOpenError, so callers can serve local caches
+instead of piling up on a database that is down; after reset_timeout one
+probe call is let through and closes the circuit again if it succeeds.
+
+    db = Database(url, key, resilience=Resilience(read_timeout=5))
+"""
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+
+import httpx
+
+from db import APIError
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD"))
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker is open: the call was not sent."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Database unavailable (circuit open, retrying in {math.ceil(retry_in)} s)")
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(TimeoutError):
+    """A call (including its retries) ran past its deadline."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Database call exceeded its {seconds:g} s deadline")
+
+
+def _is_failure(error: BaseException) -> bool:
+    """Errors that say the database is unhealthy (not that the request was wrong)."""
+    if isinstance(error, APIError):
+        return error.status_code >= 500
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be sent now."""
+        if self.state == "open":
+            waited = time.monotonic() - self._opened_at
+            if waited < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.reset_timeout - waited)
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(0)
+            self._probing = True
+
+    def record(self, error: BaseException = None):
+        """Outcome of a call let through by before_call() (error=None: success)."""
+        probe, self._probing = self._probing, False
+        if error is None or not _is_failure(error):
+            if probe or self._failures:
+                self.state, self._failures = "closed", 0
+            return
+        self._failures += 1
+        if probe or self._failures >= self.failure_threshold:
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self.opens += 1
+
+    def abandon(self):
+        """A call let through was cancelled before it had an outcome."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class Resilience:
+    """Call policy for db.Database.request (use from one event loop)."""
+
+    def __init__(
+        self,
+        read_timeout: float = 5.0,
+        write_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.1,
+        max_backoff: float = 1.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        """
+        Args:
+            read_timeout: default deadline of GET/HEAD calls (seconds)
+            write_timeout: default deadline of other calls
+            retries: extra attempts for failed idempotent reads
+            backoff: first retry delay cap; doubles per retry up to max_backoff
+            hedge: send a duplicate read once the p95 latency has passed
+            hedge_min_delay: never hedge earlier than this
+            failure_threshold: consecutive failures that open the circuit
+            reset_timeout: seconds the circuit stays open before a probe
+        """
+        self.read_timeout = read_timeout
+        self.write_timeout = write_timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._latencies = deque(maxlen=256)  # recent successful read latencies (s)
+        self.retried = 0
+        self.hedged = 0
+        self.deadlines_exceeded = 0
+
+    def hedge_delay(self):
+        """p95 of recent read latencies, or None until there are enough samples."""
+        if len(self._latencies) < 20:
+            return None
+        ordered = sorted(self._latencies)
+        return max(self.hedge_min_delay, ordered[int(0.95 * (len(ordered) - 1))])
+
+    async def call(self, method: str, send, timeout: float = None):
+        """
+        Run send(seconds_left) -> awaitable under the policy.
+
+        Raises CircuitOpenError without sending when the circuit is open,
+        DeadlineExceeded when the deadline passed, else send()'s own error.
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        budget = timeout or (self.read_timeout if idempotent else self.write_timeout)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget
+
+        for attempt in range(self.retries + 1 if idempotent else 1):
+            self.breaker.before_call()
+            started = loop.time()
+            try:
+                if idempotent and self.hedge:
+                    result = await self._hedged(send, deadline, budget)
+                else:
+                    result = await self._attempt(send, deadline, budget)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                self.breaker.record(e)
+                left = deadline - loop.time()
+                if not idempotent or not _is_failure(e) or attempt == self.retries or left <= 0:
+                    raise
+                # Full jitter: retries of many callers spread out instead of arriving together
+                await asyncio.sleep(min(left, random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))))
+                self.retried += 1
+                continue
+
+            self.breaker.record()
+            if idempotent:
+                self._latencies.append(loop.time() - started)
+            return result
+
+    async def _attempt(self, send, deadline: float, budget: float):
+        left = deadline - asyncio.get_running_loop().time()
+        if left <= 0:
+            self.deadlines_exceeded += 1
+            raise DeadlineExceeded(budget)
+        try:
+            return await asyncio.wait_for(send(left), left)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            self.deadlines_exceeded += 1
+            raise DeadlineExceeded(budget) from None
+
+    async def _hedged(self, send, deadline: float, budget: float):
+        delay = self.hedge_delay()
+        first = asyncio.ensure_future(self._attempt(send, deadline, budget))
+        if delay is None or delay >= deadline - asyncio.get_running_loop().time():
+            return await first
+
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedged += 1
+                pending.add(asyncio.ensure_future(self._attempt(send, deadline, budget)))
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "circuit": self.breaker.stats(),
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "hedge_delay_ms": round(delay * 1000, 1) if self.hedge and delay is not None else None,
+        }
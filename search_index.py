@@ -0,0 +1,134 @@
+"""
+The Backroom - Search index
+Character n-gram inverted index used to prune substring searches.
+
+All 1..n character grams of an entry point back to its entry id, so a
+substring query only has to verify the entries that contain all of its grams
+instead of scanning the whole corpus. For queries of length <= n the posting
+list is the exact answer.
+
+TrigramIndex is the fuzzy counterpart: words are folded (lowercase, no
+diacritics) and compared by trigram similarity, so "pyhton" finds "python"
+and "automatyzacja sieci" finds "Automatyzacja sieci" typed without ą/ł/ó.
+"""
+
+import math
+import unicodedata
+from collections import defaultdict
+
+# Letters NFKD does not decompose into base letter + combining mark
+_FOLD = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe"})
+
+
+def fold(text: str) -> str:
+    """Casefold and strip diacritics ("Łódź" -> "lodz")."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).translate(_FOLD)
+
+
+def trigrams(word: str) -> set:
+    """Padded character trigrams, as in pg_trgm ("ab" -> "  a", " ab", "ab ")."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _grams(text: str, n: int) -> set:
+    """All distinct character grams of length 1..n."""
+    grams = set()
+    for size in range(1, n + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+
+class NgramIndex:
+    """Inverted index from character grams (length 1..n) to entry ids."""
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.postings = defaultdict(set)
+
+    def add(self, entry_id: int, text: str):
+        for gram in _grams(text, self.n):
+            self.postings[gram].add(entry_id)
+
+    def remove(self, entry_id: int, text: str):
+        for gram in _grams(text, self.n):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def exact(self, query: str) -> bool:
+        """True if candidates(query) needs no further verification."""
+        return len(query) <= self.n
+
+    def candidates(self, query: str):
+        """Entry ids that may contain query, or None if every entry may (empty query)."""
+        if not query:
+            return None
+        if len(query) <= self.n:
+            return set(self.postings.get(query, ()))
+
+        grams = {query[i:i + self.n] for i in range(len(query) - self.n + 1)}
+        lists = sorted((self.postings.get(g, ()) for g in grams), key=len)
+        if not lists[0]:
+            return set()
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to words, for typo-tolerant word lookup."""
+
+    def __init__(self):
+        self.postings = defaultdict(set)  # trigram -> words
+        self._grams = {}  # word -> its trigrams
+
+    def __len__(self):
+        return len(self._grams)
+
+    def add(self, word: str):
+        if word in self._grams:
+            return
+        grams = trigrams(word)
+        self._grams[word] = grams
+        for gram in grams:
+            self.postings[gram].add(word)
+
+    def similar(self, word: str, threshold: float = 0.4) -> list:
+        """
+        Indexed words whose Dice trigram similarity to word is >= threshold,
+        as [(word, similarity), ...] best first.
+
+        A match must share at least `needed` trigrams with the query, so it
+        must appear in one of the (len(grams) - needed + 1) rarest query
+        trigrams' postings (prefix filtering); only those candidates are
+        compared instead of the whole vocabulary.
+        """
+        grams = trigrams(word)
+        size = len(grams)
+        # Dice = 2 * shared / (size + other) >= threshold, and other >= size * t / (2 - t)
+        smallest = math.ceil(size * threshold / (2 - threshold))
+        needed = max(1, math.ceil(threshold * (size + smallest) / 2))
+        rarest = sorted(grams, key=lambda g: len(self.postings.get(g, ())))
+
+        candidates = set()
+        for gram in rarest[:size - needed + 1]:
+            candidates.update(self.postings.get(gram, ()))
+
+        results = []
+        for candidate in candidates:
+            other = self._grams[candidate]
+            similarity = 2 * len(grams & other) / (size + len(other))
+            if similarity >= threshold:
+                results.append((candidate, similarity))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
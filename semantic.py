@@ -0,0 +1,329 @@
+"""
+The Backroom - Semantic search index
+Offline profile vectors for find_collaborators_semantic, no model or network.
+
+Each profile is embedded once, when it is indexed: words (prefix-stemmed,
+so Polish inflections like "automatyzacja"/"automatyzacji" agree), word
+pairs and the concepts they belong to (a small English/Polish lexicon, so
+"grow my audience" lands next to "marketing") are hashed into a fixed
+number of dimensions with log term frequency, and the vector is
+L2-normalized.
+Vectors are rows of one contiguous float32 matrix (1 KB per profile, no
+per-profile Python objects), so a query is a single matrix-vector
+product. IDF is applied on the query side from bucket document
+frequencies, so stored vectors never need recomputing: a rebuilt index
+copies the vectors of unchanged profiles instead of embedding them again.
+
+With a VectorStore (SEMANTIC_VECTORS_DIR) every vector is also written,
+when its profile is indexed, to a memory-mapped file keyed by profile id
+and the hash of the embedded text, so a restart reads the vectors back
+instead of embedding the whole corpus again.
+"""
+
+import glob
+import json
+import math
+import os
+import sys
+import threading
+import uuid
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+from ranking import tokenize
+from search_index import fold
+
+DIMENSIONS = 256
+# Words are cut to this many characters (cheap stemming for inflected Polish)
+STEM_LENGTH = 6
+# Below this, a shared hash bucket is more likely a collision than a shared topic
+MIN_SIMILARITY = 0.05
+SEMANTIC_FIELDS = ("role", "bio", "skills", "offers", "tags", "industry")
+
+# concept -> words that signal it (folded on import)
+CONCEPTS = {
+    "marketing": (
+        "marketing", "audience", "growth", "grow", "brand", "branding", "seo", "social",
+        "content", "ads", "advertising", "promotion", "campaign", "followers", "reach",
+        "odbiorcy", "zasieg", "zasiegi", "promocja", "reklama", "marka",
+    ),
+    "development": (
+        "developer", "development", "programming", "programmer", "code", "coding",
+        "software", "backend", "frontend", "python", "javascript", "api", "app",
+        "programista", "aplikacja", "kod", "oprogramowanie",
+    ),
+    "design": ("design", "designer", "ux", "ui", "figma", "graphics", "grafika", "projektowanie", "grafik"),
+    "sales": ("sales", "selling", "sell", "clients", "customers", "leads", "b2b", "sprzedaz", "klienci", "handlowiec"),
+    "funding": ("funding", "investor", "investors", "investment", "fundraising", "vc", "capital", "inwestor", "finansowanie"),
+    "automation": ("automation", "automate", "workflow", "ansible", "zapier", "n8n", "devops", "automatyzacja", "scripts"),
+    "data": ("data", "analytics", "ai", "ml", "machine", "learning", "statistics", "dane", "analiza", "llm"),
+    "founder": ("founder", "cofounder", "partner", "startup", "wspolnik", "wspolzalozyciel"),
+    "mentoring": ("mentoring", "mentor", "advice", "coaching", "consulting", "doradztwo", "porady", "konsultacje"),
+    "ecommerce": ("ecommerce", "shop", "store", "shopify", "allegro", "sklep", "woocommerce"),
+}
+_CONCEPT_OF = {fold(word)[:STEM_LENGTH]: concept for concept, words in CONCEPTS.items() for word in words}
+
+
+def _words(text: str) -> list:
+    """(stem, word) pairs of a text."""
+    return [(word[:STEM_LENGTH], word) for word in tokenize(fold(text))]
+
+
+def features(text: str) -> list:
+    """Word stems, adjacent stem pairs and "~concept" features of a text."""
+    words = [stem for stem, _ in _words(text)]
+    result = list(words)
+    result.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    result.extend(f"~{_CONCEPT_OF[w]}" for w in words if w in _CONCEPT_OF)
+    return result
+
+
+def _profile_text(profile) -> str:
+    parts = []
+    for field in SEMANTIC_FIELDS:
+        value = profile.get(field)
+        if value:
+            parts.append(value if isinstance(value, str) else ". ".join(value))
+    return ". ".join(parts)
+
+
+@lru_cache(maxsize=1 << 18)
+def _hash(feature: str) -> int:
+    # crc32 rather than hash(): stable across processes and restarts
+    return zlib.crc32(feature.encode())
+
+
+def explain(query: str, profile) -> list:
+    """Reasons a profile is similar to the query: shared concepts, then shared words."""
+    query_features = set(features(query))
+    text = _profile_text(profile)
+    concepts = [f for f in dict.fromkeys(features(text)) if f.startswith("~") and f in query_features]
+    words = dict.fromkeys(word for stem, word in _words(text) if stem in query_features)
+    return [f"Related: {c[1:]}" for c in concepts] + [f"Word: {w}" for w in words]
+
+
+def _text_hash(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+class VectorStore:
+    """
+    Profile vectors kept across restarts in a memory-mapped float32 file.
+
+    Rows are only appended (an updated profile gets a new row); an
+    append-only key log maps profile id -> (row, hash of the embedded text),
+    the last line winning, and a vector is handed out only while the text
+    still hashes the same. Opening compacts the file once most rows are
+    dead. Row numbers are handed out in memory, so one process owns a
+    directory at a time.
+    """
+
+    def __init__(self, directory: str, dimensions: int = DIMENSIONS, capacity: int = 1024):
+        self.dimensions = dimensions
+        self._directory = directory
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._owner = open(os.path.join(directory, "vectors.lock"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._owner.close()
+                raise
+        self._keys_path = os.path.join(directory, "vectors.keys")
+        self._rows = {}  # profile id -> (row, text hash)
+        self._count = 0  # rows in use
+        self._open()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _read_keys(self):
+        """(header, {profile id: (row, text hash)}) from the key log, or (None, {})."""
+        try:
+            with open(self._keys_path) as f:
+                header = json.loads(f.readline())
+                entries = {}
+                for line in f:
+                    try:
+                        row, text_hash, profile_id = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    entries[profile_id] = (row, text_hash)
+                return header, entries
+        except (OSError, ValueError):
+            return None, {}
+
+    def _open(self):
+        header, entries = self._read_keys()
+        path = os.path.join(self._directory, header["matrix"]) if header else None
+        if not header or header.get("dimensions") != self.dimensions or not os.path.exists(path):
+            self._write({}, None)
+            return
+        rows = os.path.getsize(path) // (4 * self.dimensions)
+        matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(rows, self.dimensions))
+        # Rows past the end of the file never reached it
+        entries = {profile_id: entry for profile_id, entry in entries.items() if entry[0] < rows}
+        used = max((row for row, _ in entries.values()), default=-1) + 1
+        if used > max(2 * len(entries), self._capacity):
+            self._write(entries, matrix)
+            return
+        self._path, self._matrix, self._rows, self._count = path, matrix, entries, used
+        self._keys = open(self._keys_path, "a")
+
+    def _write(self, entries: dict, old: np.ndarray):
+        """Write a new matrix file holding just entries and switch the key log to it in one rename."""
+        name = f"vectors-{uuid.uuid4().hex[:12]}.f32"
+        path = os.path.join(self._directory, name)
+        matrix = np.memmap(path, dtype=np.float32, mode="w+",
+                           shape=(max(len(entries), self._capacity), self.dimensions))
+        rows = {}
+        for row, (profile_id, (old_row, text_hash)) in enumerate(entries.items()):
+            matrix[row] = old[old_row]
+            rows[profile_id] = (row, text_hash)
+        matrix.flush()
+        with open(self._keys_path + ".tmp", "w") as f:
+            f.write(json.dumps({"matrix": name, "dimensions": self.dimensions}) + "\n")
+            for profile_id, (row, text_hash) in rows.items():
+                f.write(json.dumps([row, text_hash, profile_id]) + "\n")
+        os.replace(self._keys_path + ".tmp", self._keys_path)
+        for stale in glob.glob(os.path.join(self._directory, "vectors-*.f32")):
+            if stale != path:
+                os.remove(stale)
+        self._path, self._matrix, self._rows, self._count = path, matrix, rows, len(rows)
+        self._keys = open(self._keys_path, "a")
+
+    def get(self, profile_id: str, text: str):
+        """Stored vector of profile_id if it embedded this text, else None."""
+        with self._lock:
+            entry = self._rows.get(profile_id)
+            if entry is None or entry[1] != _text_hash(text):
+                return None
+            return np.array(self._matrix[entry[0]])
+
+    def put(self, profile_id: str, text: str, vector: np.ndarray):
+        with self._lock:
+            row = self._count
+            if row >= len(self._matrix):
+                self._grow(max(row + 1, 2 * len(self._matrix)))
+            # Vector first, then the key line that points at it
+            self._matrix[row] = vector
+            self._count += 1
+            self._rows[profile_id] = (row, _text_hash(text))
+            self._keys.write(json.dumps([row, self._rows[profile_id][1], profile_id]) + "\n")
+            self._keys.flush()
+
+    def _grow(self, rows: int):
+        self._matrix.flush()
+        del self._matrix
+        with open(self._path, "r+b") as f:
+            f.truncate(rows * 4 * self.dimensions)
+        self._matrix = np.memmap(self._path, dtype=np.float32, mode="r+", shape=(rows, self.dimensions))
+
+    def close(self):
+        with self._lock:
+            self._matrix.flush()
+            self._keys.close()
+            self._owner.close()
+
+
+def open_vector_store(directory: str):
+    """VectorStore in directory, or None (vectors in memory only) if unset or owned by another process."""
+    if not directory:
+        return None
+    try:
+        return VectorStore(directory)
+    except OSError as e:
+        print(f"Semantic vectors kept in memory only ({directory}): {e}", file=sys.stderr)
+        return None
+
+
+class SemanticIndex:
+    """Slot-keyed float32 vector matrix."""
+
+    def __init__(self, dimensions: int = DIMENSIONS, capacity: int = 1024, store: VectorStore = None):
+        self.dimensions = dimensions
+        self.store = store
+        self._df = np.zeros(dimensions, dtype=np.int64)  # bucket -> profiles using it
+        self._rows = set()  # slots holding a vector
+        self._matrix = self._allocate(capacity)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        return np.zeros((capacity, self.dimensions), dtype=np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Unit-length hashed feature vector (zero vector for empty text)."""
+        buckets = {}
+        for feature, count in Counter(features(text)).items():
+            h = _hash(feature)
+            # Signed hashing: colliding features cancel out on average instead of piling up
+            weight = 1.0 + math.log(count) if count > 1 else 1.0
+            bucket = h % self.dimensions
+            buckets[bucket] = buckets.get(bucket, 0.0) + (weight if h & 0x80000000 else -weight)
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if buckets:
+            vector[list(buckets)] = list(buckets.values())
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def vector(self, slot: int):
+        """Copy of the vector stored under slot, or None."""
+        return self._matrix[slot].copy() if slot in self._rows else None
+
+    def add(self, slot: int, profile, vector: np.ndarray = None):
+        """
+        Store a profile under slot (replacing whatever was there); vector is
+        its already computed embedding, e.g. from the index being rebuilt.
+        """
+        self.remove(slot)
+        if slot >= len(self._matrix):
+            grown = self._allocate(max(slot + 1, 2 * len(self._matrix)))
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+        if vector is None:
+            vector = self._embed_profile(profile)
+        self._matrix[slot] = vector
+        self._df += vector != 0
+        self._rows.add(slot)
+
+    def _embed_profile(self, profile) -> np.ndarray:
+        text = _profile_text(profile)
+        if self.store is None:
+            return self.embed(text)
+        vector = self.store.get(profile.get("id"), text)
+        if vector is None:
+            vector = self.embed(text)
+            self.store.put(profile.get("id"), text, vector)
+        return vector
+
+    def remove(self, slot: int):
+        if slot not in self._rows:
+            return
+        self._df -= self._matrix[slot] != 0
+        self._matrix[slot] = 0.0
+        self._rows.discard(slot)
+
+    def scores(self, query: str, size: int) -> np.ndarray:
+        """Similarity of every slot below size to the query (0 = unrelated)."""
+        query_vector = self.embed(query)
+        if not self._rows or not query_vector.any():
+            return np.zeros(size, dtype=np.float32)
+        # Rare buckets weigh more; squared because stored vectors carry no IDF
+        idf = np.log((len(self._rows) + 1) / (self._df + 1)).astype(np.float32) + 1.0
+        weighted = query_vector * idf * idf
+        weighted /= np.linalg.norm(weighted)
+        scores = self._matrix[:size] @ weighted
+        scores[scores < MIN_SIMILARITY] = 0.0
+        return scores
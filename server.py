@@ -4,12 +4,16 @@ The Backroom - MCP Server
 "Where AI assistants connect their humans"
 
 Usage:
-    pip install fastmcp supabase
+    pip install fastmcp "httpx[http2]" numpy
     python server.py
 
 Environment variables:
     SUPABASE_URL - Supabase project URL
     SUPABASE_KEY - Supabase anon/public key
+    SUPABASE_TIMEOUT - default per-call timeout in seconds (default 10)
+    SUPABASE_MAX_CONNECTIONS - HTTP connection pool size (default 100)
+    SUPABASE_RPC_WRITES - "1" to use the database functions from sql/
+    PROFILE_SYNC_INTERVAL - seconds between incremental profile syncs (0 = off, needs sql/003)
 
 For Claude Desktop/Code, add to config:
     {
@@ -27,12 +31,62 @@ For Claude Desktop/Code, add to config:
 """
 
 from fastmcp import FastMCP
+import asyncio
 import os
-from supabase import create_client, Client
+import sys
+import threading
+
+from db import APIError, Database
+from resilience import Resilience
+from health import HealthProbe
+
+from profile_cache import ProfileCache
+from profile_loader import ProfileLoader
+from profile_sync import ProfileReplica, run_async_worker
+from single_flight import SingleFlight
+from normalize import search_keys
+from matching import SEARCH_COLUMNS, SEARCH_KEY_COLUMNS, MatchEngine, ProfileRecord, parse_filters
+from semantic import open_vector_store
+from pagination import clamp_page_size, decode_cursor, encode_cursor
+from metrics import CONTENT_TYPE, Registry, ToolMetrics
+from tracing import JsonlExporter, OtlpExporter, Tracer, TracingMiddleware
+from profiling import Profiler, ProfilingMiddleware
+from starlette.responses import Response
 
 # Initialize MCP server
 mcp = FastMCP("The Backroom")
 
+# Per-tool calls, errors, latency and Supabase round trips, scraped at /metrics
+_metrics = Registry()
+_tool_metrics = ToolMetrics(_metrics)
+mcp.add_middleware(_tool_metrics)
+
+# One span tree per tool call (Supabase round trips as children): TRACE_FILE
+# appends them as JSONL, TRACE_OTLP_URL posts them to an OTLP/HTTP collector,
+# TRACE_SLOW_MS prints the tree of every call at least that slow to stderr
+_trace_exporters = []
+if os.environ.get("TRACE_FILE"):
+    _trace_exporters.append(JsonlExporter(os.environ["TRACE_FILE"]))
+if os.environ.get("TRACE_OTLP_URL"):
+    _trace_exporters.append(OtlpExporter(os.environ["TRACE_OTLP_URL"]))
+_tracer = Tracer(
+    _trace_exporters,
+    slow_ms=float(os.environ["TRACE_SLOW_MS"]) if os.environ.get("TRACE_SLOW_MS") else None
+)
+if _tracer.enabled:
+    mcp.add_middleware(TracingMiddleware(_tracer))
+
+# PROFILER=cprofile|sampling (or --profile=MODE) profiles PROFILER_RATE of the
+# tool calls and writes <tool>.pstats / <tool>.collapsed files to PROFILER_DIR
+_profiler = Profiler(
+    mode=next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--profile=")), os.environ.get("PROFILER", "")),
+    rate=float(os.environ.get("PROFILER_RATE", 0.01)),
+    directory=os.environ.get("PROFILER_DIR", "profiles"),
+    interval=float(os.environ.get("PROFILER_INTERVAL_MS", 5)) / 1000
+)
+if _profiler.enabled:
+    mcp.add_middleware(ProfilingMiddleware(_profiler))
+
 
 # ============== PROMPTS (Menu dla użytkownika) ==============
 
@@ -210,7 +264,9 @@ def szukaj_wspolpracownikow() -> str:
 
 Zapytaj mnie: czego szukam? (np. "ktoś kto zna marketing", "Python developer", "osoba z doświadczeniem w e-commerce")
 
-Potem użyj narzędzia find_collaborators aby wyszukać dopasowane profile."""
+Potem użyj narzędzia find_collaborators aby wyszukać dopasowane profile.
+Jeśli masz kilka zapytań naraz (np. "python", "ansible", "marketing"), użyj jednego wywołania find_collaborators_batch.
+Dla zapytań z wieloma słowami użyj mode="ranked" (ranking BM25 po wszystkich polach profilu)."""
 
 
 @mcp.prompt()
@@ -280,39 +336,297 @@ Która opcja Cię interesuje?"""
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")
 
-_supabase: Client = None
-
-def get_supabase() -> Client:
-    """Get or create Supabase client."""
+# SUPABASE_RPC_WRITES=1 routes writes through the Postgres functions in sql/
+RPC_WRITES = os.environ.get("SUPABASE_RPC_WRITES", "") == "1"
+
+# PROFILE_SEARCH_KEYS=1 once sql/004 added profiles.search_keys: writes store
+# the normalized keys and searches read them instead of normalizing again
+SEARCH_KEYS = os.environ.get("PROFILE_SEARCH_KEYS", "") == "1"
+PROFILE_COLUMNS = SEARCH_KEY_COLUMNS if SEARCH_KEYS else SEARCH_COLUMNS
+
+# Every call has a deadline (reads, writes, full profile loads); failed reads
+# are retried with jitter, slow ones optionally hedged (SUPABASE_HEDGE=1), and
+# after SUPABASE_BREAKER_FAILURES consecutive failures calls fail fast for
+# SUPABASE_BREAKER_RESET seconds while reads are served from local caches
+SUPABASE_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", 10))
+PROFILE_LOAD_TIMEOUT = float(os.environ.get("SUPABASE_LOAD_TIMEOUT", 30))
+_resilience = Resilience(
+    read_timeout=float(os.environ.get("SUPABASE_READ_TIMEOUT", 5)),
+    write_timeout=SUPABASE_TIMEOUT,
+    retries=int(os.environ.get("SUPABASE_RETRIES", 2)),
+    hedge=os.environ.get("SUPABASE_HEDGE", "") == "1",
+    failure_threshold=int(os.environ.get("SUPABASE_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.environ.get("SUPABASE_BREAKER_RESET", 30))
+)
+
+_supabase: Database = None
+
+def get_supabase() -> Database:
+    """Get or create the pooled async Supabase (PostgREST) client."""
     global _supabase
     if _supabase is None and SUPABASE_URL and SUPABASE_KEY:
-        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase = Database(
+            SUPABASE_URL,
+            SUPABASE_KEY,
+            timeout=SUPABASE_TIMEOUT,
+            max_connections=int(os.environ.get("SUPABASE_MAX_CONNECTIONS", 100)),
+            resilience=_resilience
+        )
+        _supabase.add_listener(_tool_metrics.on_round_trip)
+        if _tracer.enabled:
+            _supabase.add_listener(_tracer.on_round_trip)
     return _supabase
 
 
-def load_profiles() -> list:
-    """Load all profiles from Supabase."""
+# ============== PROFILE CACHE ==============
+
+# PROFILE_CACHE_TTL=0 disables caching (every read goes to Supabase)
+# The full list is the search corpus: compact ProfileRecords with only the
+# PROFILE_COLUMNS. Single-profile entries keep the full row for get_profile.
+_profile_cache = ProfileCache(
+    ttl=float(os.environ.get("PROFILE_CACHE_TTL", 30)),
+    max_entries=int(os.environ.get("PROFILE_CACHE_SIZE", 1000)),
+    list_item=ProfileRecord.from_row
+)
+
+
+# Concurrent identical reads (full loads, engine builds, get_profile for one
+# id, one user's inbox) share one in-flight call; writes forget their keys
+_flights = SingleFlight()
+
+
+async def _fetch_profiles() -> list:
+    response = await get_supabase().table("profiles").select(PROFILE_COLUMNS).timeout(PROFILE_LOAD_TIMEOUT).execute()
+    return [ProfileRecord.from_row(row) for row in response.data or []]
+
+
+async def _fetch_profile(profile_id: str):
+    response = await get_supabase().table("profiles").select("*").eq("id", profile_id).execute()
+    return response.data[0] if response.data else None
+
+
+async def _fetch_profiles_by_id(profile_ids: list, columns: str) -> list:
+    response = await get_supabase().table("profiles").select(columns).in_("id", profile_ids).execute()
+    return response.data or []
+
+
+def profile_loader(columns: str = "*") -> ProfileLoader:
+    """New per-call batched profile loader (one query per batch of IDs)."""
+    return ProfileLoader(_fetch_profiles_by_id, columns)
+
+
+# ============== PROFILE SYNC ==============
+
+# PROFILE_SYNC_INTERVAL>0 serves reads from an in-memory replica that polls
+# for rows changed since the last updated_at watermark (sql/003)
+PROFILE_SYNC_INTERVAL = float(os.environ.get("PROFILE_SYNC_INTERVAL", 0))
+PROFILE_SYNC_RECONCILE = float(os.environ.get("PROFILE_SYNC_RECONCILE", 300))
+
+_replica = ProfileReplica(transform=ProfileRecord.from_row)
+_replica_task: asyncio.Task = None
+
+
+async def _fetch_profile_changes(since, offset: int, limit: int) -> list:
+    query = get_supabase().table("profiles").select(f"{PROFILE_COLUMNS},updated_at")
+    if since is not None:
+        query = query.gte("updated_at", since)
+    response = await query.order("updated_at").order("id").limit(limit).offset(offset).execute()
+    return response.data or []
+
+
+async def _fetch_profile_ids(offset: int, limit: int) -> list:
+    response = await get_supabase().table("profiles").select("id").order("id").limit(limit).offset(offset).execute()
+    return response.data or []
+
+
+def _ensure_profile_sync():
+    """Start the sync worker on the running event loop (once)."""
+    global _replica_task
+    if PROFILE_SYNC_INTERVAL > 0 and _replica_task is None and get_supabase():
+        _replica_task = asyncio.get_running_loop().create_task(run_async_worker(
+            _replica, _fetch_profile_changes, _fetch_profile_ids,
+            poll_interval=PROFILE_SYNC_INTERVAL,
+            reconcile_interval=PROFILE_SYNC_RECONCILE
+        ))
+
+
+async def load_profiles() -> list:
+    """
+    Load all profiles as ProfileRecords (search columns only).
+
+    Served from the replica when PROFILE_SYNC_INTERVAL is set, else cached.
+    """
     client = get_supabase()
     if not client:
         return []
 
+    _ensure_profile_sync()
+    if _replica.ready:
+        return _replica.snapshot()
+
     try:
-        response = client.table("profiles").select("*").execute()
-        return response.data or []
+        return await _flights.do_async("profiles", lambda: _profile_cache.get_all_async(_fetch_profiles))
     except Exception as e:
-        print(f"Error loading profiles: {e}")
-        return []
+        print(f"Error loading profiles: {e}", file=sys.stderr)
+        # Degraded database: keep searching the last loaded list, however old
+        return _profile_cache.stale_all() or []
+
+
+# ============== MATCH ENGINE ==============
+
+_match_engine: MatchEngine = None
+# Rebuild for a newer corpus generation, and the changes to replay onto it
+_engine_rebuild: asyncio.Task = None
+_rebuild_changes = []
+# Recomputes the suggest_matches lists that writes made stale
+_suggestions_refresh: asyncio.Task = None
+# Replica changes arrive from the sync worker's thread
+_engine_lock = threading.Lock()
+# Semantic vectors kept across restarts; embedded again on every start when unset
+_vector_store = open_vector_store(os.environ.get("SEMANTIC_VECTORS_DIR", ""))
+
+
+def _corpus_generation():
+    """Changes whenever load_profiles() switched to a different profile list."""
+    if _replica.ready:
+        return ("replica", _replica.generation)
+    return ("cache", _profile_cache.generation)
+
+
+async def _build_match_engine(profiles: list, generation, previous: MatchEngine = None) -> MatchEngine:
+    with _tracer.span("match_engine.build", profiles=len(profiles)):
+        engine = await asyncio.to_thread(MatchEngine, profiles, previous=previous, vector_store=_vector_store)
+    engine.generation = generation
+    return engine
+
+
+async def _rebuild_match_engine(profiles: list, generation):
+    """Build the engine for a newer list and swap it in once it is complete."""
+    global _match_engine
+    try:
+        engine = await _build_match_engine(profiles, generation, _match_engine)
+    except Exception as e:
+        print(f"Error rebuilding the match engine: {e}", file=sys.stderr)
+        engine = None
+    with _engine_lock:
+        if engine is not None:
+            # Writes that reached the old engine during the build
+            for records, deleted_ids in _rebuild_changes:
+                _update_engine(engine, records, deleted_ids)
+            _match_engine = engine
+
+
+async def get_match_engine() -> MatchEngine:
+    """
+    Get the match engine. Only the first call waits for a build; after a
+    reload brought a different profile list, or once writes left the engine
+    mostly dead entries, the current engine keeps serving while the new one
+    is built in the background. Suggestion lists that writes made stale are
+    recomputed in the background too.
+    """
+    global _match_engine, _engine_rebuild, _suggestions_refresh
+    profiles = await load_profiles()
+    generation = _corpus_generation()
+    if _match_engine is None:
+        # CPU-bound build runs off the event loop so other sessions keep
+        # going; sessions arriving meanwhile wait for the same build
+        _match_engine = await _flights.do_async(("engine", generation), lambda: _build_match_engine(profiles, generation))
+    elif _engine_rebuild is None or _engine_rebuild.done():
+        with _engine_lock:
+            if _match_engine.generation != generation:
+                _rebuild_changes.clear()
+                _engine_rebuild = asyncio.create_task(_rebuild_match_engine(profiles, generation))
+            elif _match_engine.needs_compaction:
+                # Same list, compacted: writes since the snapshot are replayed
+                _rebuild_changes.clear()
+                _engine_rebuild = asyncio.create_task(
+                    _rebuild_match_engine(_match_engine.live_profiles(), generation)
+                )
+    if _match_engine.stale_suggestions and (_suggestions_refresh is None or _suggestions_refresh.done()):
+        # Stale lists keep being served until this replaces them
+        _suggestions_refresh = asyncio.create_task(asyncio.to_thread(_match_engine.refresh_suggestions))
+    return _match_engine
+
+
+def _update_engine(engine: MatchEngine, records: list, deleted_ids: list = ()):
+    if records:
+        engine.upsert_many(records)
+    for profile_id in deleted_ids:
+        engine.remove(profile_id)
+
+
+def _engine_changed(records: list, deleted_ids: list = ()):
+    """Apply profile changes to the serving engine and queue them for a rebuild in progress."""
+    with _engine_lock:
+        if _match_engine is not None:
+            _update_engine(_match_engine, records, deleted_ids)
+        if _engine_rebuild is not None and not _engine_rebuild.done():
+            _rebuild_changes.append((records, deleted_ids))
+
+
+def _apply_profile_changes(records: list, deleted_ids: list = ()):
+    """Propagate replica changes to the match engine and the single-profile cache."""
+    for record in records:
+        # The replica only carries search columns; the full row is refetched on demand
+        _profile_cache.evict(record.id)
+        _flights.forget(("profile", record.id))
+    for profile_id in deleted_ids:
+        _profile_cache.invalidate(profile_id)
+        _flights.forget(("profile", profile_id))
+    _engine_changed(records, deleted_ids)
+
+
+_replica.subscribe(_apply_profile_changes)
+
+
+def _profile_written(row: dict):
+    """Propagate a freshly written profile row to every in-memory copy."""
+    if _replica.ready:
+        # The replica notifies _apply_profile_changes
+        _replica.apply_changes([row], from_database=False)
+    else:
+        _engine_changed([ProfileRecord.from_row(row)])
+    _profile_cache.put(row)
+    # Reads already in flight may predate the write
+    _flights.forget("profiles")
+    _flights.forget(("profile", row.get("id")))
 
 
 @mcp.tool
-def list_profiles() -> dict:
-    """List all profiles in The Backroom network."""
+async def list_profiles(page_size: int = 50, cursor: str = "") -> dict:
+    """
+    List profiles in The Backroom network, one page at a time (ordered by ID).
+
+    Args:
+        page_size: Profiles per page (max 200)
+        cursor: next_cursor from the previous page; empty for the first page
+
+    Returns:
+        One page of profiles and next_cursor (null on the last page)
+    """
     if not get_supabase():
         return {"error": "Database not connected. Set SUPABASE_URL and SUPABASE_KEY."}
 
-    profiles = load_profiles()
+    page_size = clamp_page_size(page_size)
+    try:
+        after_id = decode_cursor(cursor, str)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    try:
+        # Keyset pagination: WHERE id > cursor ORDER BY id LIMIT page_size + 1
+        query = get_supabase().table("profiles").select("id, name, role, industry")
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        response = await query.order("id").limit(page_size + 1).execute()
+    except Exception as e:
+        return {"error": str(e)}
+
+    rows = response.data or []
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
     return {
-        "count": len(profiles),
+        "count": len(rows),
         "profiles": [
             {
                 "id": p.get("id"),
@@ -320,24 +634,31 @@ def list_profiles() -> dict:
                 "role": p.get("role"),
                 "industry": p.get("industry") or []
             }
-            for p in profiles
-        ]
+            for p in rows
+        ],
+        "next_cursor": encode_cursor(rows[-1]["id"]) if has_more else None
     }
 
 
 @mcp.tool
-def get_profile(profile_id: str) -> dict:
+async def get_profile(profile_id: str) -> dict:
     """Get detailed profile by ID with formatted display."""
     if not get_supabase():
         return {"error": "Database not connected."}
 
+    stale = False
     try:
-        response = get_supabase().table("profiles").select("*").eq("id", profile_id).execute()
-        if response.data:
-            p = response.data[0]
+        p = await _flights.do_async(("profile", profile_id), lambda: _profile_cache.get_async(profile_id, _fetch_profile))
+    except Exception as e:
+        # Degraded database: an old copy beats an error
+        p, stale = _profile_cache.stale(profile_id), True
+        if p is None:
+            return {"error": str(e)}
 
-            # Build formatted display
-            profile_display = f"""
+    if p:
+
+        # Build formatted display
+        profile_display = f"""
 ╔══════════════════════════════════════════════╗
 ║ 👤 {p.get('name', 'Unknown')}
 ║ 📍 {p.get('location') or 'Nie podano'}
@@ -358,143 +679,295 @@ def get_profile(profile_id: str) -> dict:
 ║ 📧 Kontakt: {p.get('preferred_contact') or 'Nie podano'}
 ╚══════════════════════════════════════════════╝"""
 
-            return {
-                "found": True,
-                "profile": p,
-                "profile_display": profile_display
-            }
-        return {"found": False, "error": f"Profile '{profile_id}' not found"}
-    except Exception as e:
-        return {"error": str(e)}
+        result = {
+            "found": True,
+            "profile": p,
+            "profile_display": profile_display
+        }
+        if stale:
+            result["stale"] = True
+        return result
+    return {"found": False, "error": f"Profile '{profile_id}' not found"}
+
+
+SEARCH_MODES = ("keyword", "ranked")
+
+
+def _collaborators(engine: MatchEngine, query: str, max_results: int, mode: str, found: tuple = None) -> dict:
+    """find_collaborators result for one query; found is a precomputed keyword search."""
+    fuzzy = False
+    if mode == "ranked":
+        matches_found, matches = engine.rank(query, max_results)
+    else:
+        # Weighted scoring: offers=3, seeks=2, skills=2, industry=1, role=1
+        matches_found, matches = found or engine.search(query, max_results)
+        if not matches_found:
+            fuzzy = True
+            matches_found, matches = engine.fuzzy_search(query, max_results)
+
+    return {
+        "query": query,
+        "mode": mode,
+        "fuzzy": fuzzy,
+        "matches_found": matches_found,
+        "results": _match_results(matches)
+    }
+
+
+def _match_results(matches: list) -> list:
+    return [
+        {
+            "id": m["profile"].get("id"),
+            "name": m["profile"].get("name"),
+            "role": m["profile"].get("role"),
+            "score": m["score"],
+            "reasons": m["reasons"],
+            "assistant_endpoint": m["profile"].get("assistant_endpoint")
+        }
+        for m in matches
+    ]
 
 
 @mcp.tool
-def find_collaborators(query: str, max_results: int = 5) -> dict:
+async def find_collaborators(query: str, max_results: int = 5, mode: str = "keyword") -> dict:
     """
     Search for collaborators matching the query.
 
+    Args:
+        query: What you are looking for
+        max_results: Number of results to return
+        mode: "keyword" - the whole query as one phrase in offers/seeks/skills/industry/role
+                  (falls back to typo/diacritic-tolerant matching when nothing matches);
+              "ranked" - every word scored with BM25 across all fields, incl. bio, tags and free offer
+
     Examples:
     - "looking for someone who knows Python"
     - "need marketing advice"
-    - "seeking co-founder with tech skills"
+    - mode="ranked", "seeking co-founder with tech skills"
     """
     if not get_supabase():
         return {"error": "Database not connected. Set SUPABASE_URL and SUPABASE_KEY."}
+    if mode not in SEARCH_MODES:
+        return {"error": f"Unknown mode '{mode}'. Use one of: {', '.join(SEARCH_MODES)}"}
 
-    profiles = load_profiles()
-    query_lower = query.lower()
-
-    matches = []
-
-    for profile in profiles:
-        score = 0
-        reasons = []
-
-        # Check offers
-        for offer in profile.get("offers") or []:
-            if query_lower in offer.lower():
-                score += 3
-                reasons.append(f"Offers: {offer}")
-
-        # Check seeks (reciprocal matching)
-        for seek in profile.get("seeks") or []:
-            if query_lower in seek.lower():
-                score += 2
-                reasons.append(f"Seeks: {seek}")
-
-        # Check skills
-        for skill in profile.get("skills") or []:
-            if query_lower in skill.lower():
-                score += 2
-                reasons.append(f"Skill: {skill}")
-
-        # Check industry
-        for industry in profile.get("industry") or []:
-            if query_lower in industry.lower():
-                score += 1
-                reasons.append(f"Industry: {industry}")
-
-        # Check role
-        if query_lower in (profile.get("role") or "").lower():
-            score += 1
-            reasons.append("Role match")
-
-        if score > 0:
-            matches.append({
-                "id": profile.get("id"),
-                "name": profile.get("name"),
-                "role": profile.get("role"),
-                "score": score,
-                "reasons": reasons,
-                "assistant_endpoint": profile.get("assistant_endpoint")
-            })
+    return _collaborators(await get_match_engine(), query, max_results, mode)
+
+
+# Upper bound on queries per find_collaborators_batch call
+MAX_BATCH_QUERIES = 50
 
-    # Sort by score descending
-    matches.sort(key=lambda x: x["score"], reverse=True)
 
+@mcp.tool
+async def find_collaborators_batch(queries: list[str], max_results: int = 5, mode: str = "keyword") -> dict:
+    """
+    Run several find_collaborators searches at once (one call instead of many).
+
+    Args:
+        queries: Search queries, e.g. ["python", "ansible", "marketing"] (max 50)
+        max_results: Number of results per query
+        mode: "keyword" or "ranked", as in find_collaborators
+
+    Returns:
+        One find_collaborators result per query, in the same order
+    """
+    if not get_supabase():
+        return {"error": "Database not connected. Set SUPABASE_URL and SUPABASE_KEY."}
+    if mode not in SEARCH_MODES:
+        return {"error": f"Unknown mode '{mode}'. Use one of: {', '.join(SEARCH_MODES)}"}
+    if len(queries) > MAX_BATCH_QUERIES:
+        return {"error": f"Too many queries ({len(queries)}). The limit is {MAX_BATCH_QUERIES} per call."}
+
+    engine = await get_match_engine()
+    # Keyword queries share one pass over the corpus
+    found = engine.search_many(queries, max_results) if mode == "keyword" else [None] * len(queries)
+    return {
+        "queries": len(queries),
+        "results": [
+            _collaborators(engine, query, max_results, mode, keyword)
+            for query, keyword in zip(queries, found)
+        ]
+    }
+
+
+@mcp.tool
+async def find_collaborators_semantic(query: str, max_results: int = 5) -> dict:
+    """
+    Search for collaborators by meaning rather than exact words.
+
+    Works offline on precomputed profile vectors (role, bio, skills, offers,
+    tags, industry), so related wording still matches.
+
+    Examples:
+    - "need someone to grow my audience" (finds marketing profiles)
+    - "szukam kogoś do automatyzacji" (finds automation/devops profiles)
+    """
+    if not get_supabase():
+        return {"error": "Database not connected. Set SUPABASE_URL and SUPABASE_KEY."}
+
+    matches_found, matches = (await get_match_engine()).semantic_search(query, max_results)
     return {
         "query": query,
-        "matches_found": len(matches),
-        "results": matches[:max_results]
+        "matches_found": matches_found,
+        "results": _match_results(matches)
     }
 
 
 @mcp.tool
-def search_by_category(category: str, value: str) -> dict:
+async def suggest_matches(profile_id: str, max_results: int = 5) -> dict:
     """
-    Search profiles by specific category.
+    Suggest people for a profile: who offers what you seek and who seeks
+    what you offer. Mutual matches (help flows both ways) come first.
+
+    Args:
+        profile_id: Your profile ID (e.g., "snow")
+        max_results: Number of suggestions (max 20)
+
+    Returns:
+        Suggested profiles with the offers/seeks that connect you
+    """
+    if not get_supabase():
+        return {"error": "Database not connected. Set SUPABASE_URL and SUPABASE_KEY."}
+
+    suggestions = (await get_match_engine()).suggest(profile_id, clamp_page_size(max_results, 5, 20))
+    if suggestions is None:
+        return {"error": f"Profile '{profile_id}' not found."}
+
+    return {
+        "profile_id": profile_id,
+        "matches_found": len(suggestions),
+        "results": [
+            {
+                "id": m["profile"].get("id"),
+                "name": m["profile"].get("name"),
+                "role": m["profile"].get("role"),
+                "score": m["score"],
+                "mutual": m["mutual"],
+                "reasons": m["reasons"],
+                "assistant_endpoint": m["profile"].get("assistant_endpoint")
+            }
+            for m in suggestions
+        ]
+    }
+
+
+@mcp.tool
+async def search_by_category(category: str = "", value: str = "", filters: str = "",
+                             limit: int = 50, cursor: str = "") -> dict:
+    """
+    Search profiles by specific category, or by a combination of categories.
 
     Categories: industry, skills, seeking, offering
 
+    Args:
+        category, value: One condition, e.g. category="skills", value="python"
+        filters: Conditions combined with AND / OR / NOT, e.g.
+                 "industry=e-commerce AND skills=python AND NOT seeking=co-founder"
+        limit: Profiles per page (max 200)
+        cursor: next_cursor from the previous page; empty for the first page
+
     Examples:
     - category="industry", value="e-commerce"
     - category="skills", value="python"
-    - category="seeking", value="co-founder"
+    - filters="skills=python OR skills=go"
     """
     if not get_supabase():
         return {"error": "Database not connected."}
 
-    profiles = load_profiles()
-    value_lower = value.lower()
-    matches = []
-
-    for profile in profiles:
-        matched = False
-
-        if category == "industry":
-            if any(value_lower in i.lower() for i in profile.get("industry") or []):
-                matched = True
+    expression = f"{category}={value}" if category or value else ""
+    if filters:
+        # The single condition applies to every OR alternative of the filters
+        expression = " OR ".join(
+            f"{expression} AND {alternative}" if expression else alternative
+            for alternative in filters.split(" OR ")
+        )
+    if not expression:
+        return {"error": "Give category and value, or filters."}
 
-        elif category == "skills":
-            if any(value_lower in s.lower() for s in profile.get("skills") or []):
-                matched = True
+    try:
+        groups = parse_filters(expression)
+        after_id = decode_cursor(cursor, str)
+    except ValueError as e:
+        return {"error": str(e)}
+    limit = clamp_page_size(limit)
 
-        elif category == "seeking":
-            if any(value_lower in s.lower() for s in profile.get("seeks") or []):
-                matched = True
+    engine = await get_match_engine()
+    matches_found, profiles = engine.filter_profiles(groups, limit + 1, after_id)
 
-        elif category == "offering":
-            if any(value_lower in o.lower() for o in profile.get("offers") or []):
-                matched = True
+    # Nothing matched exactly: retry tolerating typos and missing diacritics
+    fuzzy = False
+    if not matches_found:
+        fuzzy = True
+        matches_found, profiles = engine.filter_profiles(groups, limit + 1, after_id, fuzzy=True)
 
-        if matched:
-            matches.append({
+    has_more = len(profiles) > limit
+    profiles = profiles[:limit]
+    return {
+        "category": category,
+        "value": value,
+        "filters": filters,
+        "fuzzy": fuzzy,
+        "matches_found": matches_found,
+        "count": len(profiles),
+        "results": [
+            {
                 "id": profile.get("id"),
                 "name": profile.get("name"),
                 "role": profile.get("role"),
                 "assistant_endpoint": profile.get("assistant_endpoint")
-            })
+            }
+            for profile in profiles
+        ],
+        "next_cursor": encode_cursor(profiles[-1].get("id")) if has_more else None
+    }
+
+
+DUPLICATE_REQUEST_ERROR = "You already have a pending request to this user. Wait for their response."
+
+
+def _requests_changed(from_user: str, to_user: str = None):
+    """A request was written: inbox reads already in flight may predate it."""
+    _flights.forget(("sent", from_user))
+    _flights.forget(("incoming", to_user))
+
 
+def _request_sent(request_id, to_user: dict) -> dict:
     return {
-        "category": category,
-        "value": value,
-        "matches_found": len(matches),
-        "results": matches
+        "success": True,
+        "message": f"Connection request sent to {to_user['name']}!",
+        "request_id": request_id,
+        "to_user": {
+            "id": to_user["id"],
+            "name": to_user["name"],
+            "role": to_user.get("role")
+        },
+        "status": "pending",
+        "next_step": f"Wait for {to_user['name']} to accept or decline your request."
     }
 
 
+async def _send_connection_request_rpc(from_user_id: str, to_user_id: str, message: str, reason: str) -> dict:
+    """Single round trip: checks, duplicate guard and insert run in Postgres (sql/001)."""
+    result = (await get_supabase().rpc("send_connection_request", {
+        "p_from_user": from_user_id,
+        "p_to_user": to_user_id,
+        "p_message": message,
+        "p_reason": reason
+    }).execute()).data
+
+    status = result.get("status")
+    if status == "from_not_found":
+        return {"error": f"Your profile '{from_user_id}' not found. Register first with register_profile."}
+    if status == "to_not_found":
+        return {"error": f"User '{to_user_id}' not found."}
+    if status == "duplicate":
+        return {"error": DUPLICATE_REQUEST_ERROR}
+    if status == "sent":
+        return _request_sent(result["request_id"], result["to_user"])
+    return {"error": "Failed to send request."}
+
+
 @mcp.tool
-def send_connection_request(from_user_id: str, to_user_id: str, message: str, reason: str = "") -> dict:
+async def send_connection_request(from_user_id: str, to_user_id: str, message: str, reason: str = "") -> dict:
     """
     Send a connection request to another user in The Backroom.
 
@@ -511,19 +984,26 @@ def send_connection_request(from_user_id: str, to_user_id: str, message: str, re
         return {"error": "Database not connected."}
 
     try:
-        # Verify both users exist
-        from_user = get_supabase().table("profiles").select("id, name").eq("id", from_user_id).execute()
+        if RPC_WRITES:
+            result = await _send_connection_request_rpc(from_user_id, to_user_id, message, reason)
+            _requests_changed(from_user_id, to_user_id)
+            return result
+
+        # Verify both users exist and look for a pending request, concurrently
+        from_user, to_user, existing = await asyncio.gather(
+            get_supabase().table("profiles").select("id, name").eq("id", from_user_id).execute(),
+            get_supabase().table("profiles").select("id, name, role").eq("id", to_user_id).execute(),
+            get_supabase().table("connection_requests").select("id, status").eq("from_user", from_user_id).eq("to_user", to_user_id).eq("status", "pending").execute()
+        )
         if not from_user.data:
             return {"error": f"Your profile '{from_user_id}' not found. Register first with register_profile."}
 
-        to_user = get_supabase().table("profiles").select("id, name, role").eq("id", to_user_id).execute()
         if not to_user.data:
             return {"error": f"User '{to_user_id}' not found."}
 
         # Check if request already exists
-        existing = get_supabase().table("connection_requests").select("id, status").eq("from_user", from_user_id).eq("to_user", to_user_id).eq("status", "pending").execute()
         if existing.data:
-            return {"error": "You already have a pending request to this user. Wait for their response."}
+            return {"error": DUPLICATE_REQUEST_ERROR}
 
         # Create connection request
         request_data = {
@@ -534,21 +1014,17 @@ def send_connection_request(from_user_id: str, to_user_id: str, message: str, re
             "status": "pending"
         }
 
-        result = get_supabase().table("connection_requests").insert(request_data).execute()
+        try:
+            result = await get_supabase().table("connection_requests").insert(request_data).execute()
+        except APIError as e:
+            # Lost a race against a concurrent request (unique pending index, sql/001)
+            if e.code == "23505":
+                return {"error": DUPLICATE_REQUEST_ERROR}
+            raise
+        _requests_changed(from_user_id, to_user_id)
 
         if result.data:
-            return {
-                "success": True,
-                "message": f"Connection request sent to {to_user.data[0]['name']}!",
-                "request_id": result.data[0]["id"],
-                "to_user": {
-                    "id": to_user.data[0]["id"],
-                    "name": to_user.data[0]["name"],
-                    "role": to_user.data[0].get("role")
-                },
-                "status": "pending",
-                "next_step": f"Wait for {to_user.data[0]['name']} to accept or decline your request."
-            }
+            return _request_sent(result.data[0]["id"], to_user.data[0])
         else:
             return {"error": "Failed to send request."}
 
@@ -556,8 +1032,51 @@ def send_connection_request(from_user_id: str, to_user_id: str, message: str, re
         return {"error": str(e)}
 
 
+async def _incoming_requests(user_id: str) -> dict:
+    # Get pending requests
+    requests = await get_supabase().table("connection_requests").select(
+        "id, from_user, message, reason, created_at"
+    ).eq("to_user", user_id).eq("status", "pending").execute()
+
+    if not requests.data:
+        return {
+            "pending_requests": 0,
+            "message": "No pending connection requests."
+        }
+
+    # Get from_user details (one batched query for all senders)
+    senders = await profile_loader("id, name, role, offers, seeks").load_many(
+        req["from_user"] for req in requests.data
+    )
+
+    enriched_requests = []
+    for req in requests.data:
+        from_profile = senders[req["from_user"]]
+
+        if from_profile:
+            enriched_requests.append({
+                "request_id": req["id"],
+                "from_user": {
+                    "id": req["from_user"],
+                    "name": from_profile.get("name"),
+                    "role": from_profile.get("role"),
+                    "offers": from_profile.get("offers"),
+                    "seeks": from_profile.get("seeks")
+                },
+                "message": req["message"],
+                "reason": req["reason"],
+                "created_at": req["created_at"]
+            })
+
+    return {
+        "pending_requests": len(enriched_requests),
+        "requests": enriched_requests,
+        "action_needed": "Use respond_to_request to accept or decline each request."
+    }
+
+
 @mcp.tool
-def check_incoming_requests(user_id: str) -> dict:
+async def check_incoming_requests(user_id: str) -> dict:
     """
     Check for incoming connection requests (people who want to connect with you).
 
@@ -571,51 +1090,49 @@ def check_incoming_requests(user_id: str) -> dict:
         return {"error": "Database not connected."}
 
     try:
-        # Get pending requests
-        requests = get_supabase().table("connection_requests").select(
-            "id, from_user, message, reason, created_at"
-        ).eq("to_user", user_id).eq("status", "pending").execute()
-
-        if not requests.data:
-            return {
-                "pending_requests": 0,
-                "message": "No pending connection requests."
-            }
+        # Assistants polling the same inbox at once share one set of queries
+        return await _flights.do_async(("incoming", user_id), lambda: _incoming_requests(user_id))
+    except Exception as e:
+        return {"error": str(e)}
 
-        # Get from_user details
-        enriched_requests = []
-        for req in requests.data:
-            from_profile = get_supabase().table("profiles").select(
-                "name, role, offers, seeks"
-            ).eq("id", req["from_user"]).execute()
-
-            if from_profile.data:
-                enriched_requests.append({
-                    "request_id": req["id"],
-                    "from_user": {
-                        "id": req["from_user"],
-                        "name": from_profile.data[0].get("name"),
-                        "role": from_profile.data[0].get("role"),
-                        "offers": from_profile.data[0].get("offers"),
-                        "seeks": from_profile.data[0].get("seeks")
-                    },
-                    "message": req["message"],
-                    "reason": req["reason"],
-                    "created_at": req["created_at"]
-                })
 
+def _request_answered(accept: bool, from_name: str, contact_shared: dict) -> dict:
+    if accept:
         return {
-            "pending_requests": len(enriched_requests),
-            "requests": enriched_requests,
-            "action_needed": "Use respond_to_request to accept or decline each request."
+            "success": True,
+            "message": f"You accepted the connection request from {from_name}!",
+            "contact_shared": contact_shared if contact_shared else "No contact info shared",
+            "next_step": f"{from_name} will be notified and can now see your shared contact info."
         }
+    return {
+        "success": True,
+        "message": f"You declined the connection request from {from_name}.",
+        "next_step": "They will be notified of your decision."
+    }
 
-    except Exception as e:
-        return {"error": str(e)}
+
+async def _respond_to_request_rpc(request_id: str, accept: bool, response_message: str, share_email: bool) -> dict:
+    """Single conditional UPDATE ... WHERE status = 'pending' in Postgres (sql/002)."""
+    result = (await get_supabase().rpc("respond_to_connection_request", {
+        "p_request_id": request_id,
+        "p_accept": accept,
+        "p_response_message": response_message,
+        "p_share_email": share_email
+    }).execute()).data
+
+    status = result.get("status")
+    if status == "not_found":
+        return {"error": f"Request '{request_id}' not found."}
+    if status == "already_responded":
+        return {"error": f"Request already {result.get('request_status')}."}
+    if status == "ok":
+        _requests_changed(result.get("from_user"), result.get("to_user"))
+        return _request_answered(accept, result["from_name"], result.get("contact_shared") or {})
+    return {"error": "Failed to update request."}
 
 
 @mcp.tool
-def respond_to_request(request_id: str, accept: bool, response_message: str = "", share_email: bool = False) -> dict:
+async def respond_to_request(request_id: str, accept: bool, response_message: str = "", share_email: bool = False) -> dict:
     """
     Respond to a connection request (accept or decline).
 
@@ -632,61 +1149,108 @@ def respond_to_request(request_id: str, accept: bool, response_message: str = ""
         return {"error": "Database not connected."}
 
     try:
-        # Get the request
-        request = get_supabase().table("connection_requests").select("*").eq("id", request_id).execute()
-        if not request.data:
-            return {"error": f"Request '{request_id}' not found."}
-
-        req = request.data[0]
-        if req["status"] != "pending":
-            return {"error": f"Request already {req['status']}."}
+        if RPC_WRITES:
+            return await _respond_to_request_rpc(request_id, accept, response_message, share_email)
 
-        # Get your profile for contact info
-        my_profile = get_supabase().table("profiles").select("*").eq("id", req["to_user"]).execute()
         contact_shared = {}
-
-        if accept and my_profile.data:
-            profile = my_profile.data[0]
-            if share_email and profile.get("email"):
-                contact_shared["email"] = profile["email"]
-
-        # Update the request
-        update_data = {
+        if accept and share_email:
+            # The responder's email is read first so that the one conditional
+            # update below also records it; sql/002 does both in one statement
+            responder = await get_supabase().table("connection_requests").select(
+                "to:profiles!to_user(email)"
+            ).eq("id", request_id).execute()
+            email = (responder.data[0].get("to") or {}).get("email") if responder.data else None
+            if email:
+                contact_shared = {"email": email}
+
+        # One conditional UPDATE ... WHERE status = 'pending' RETURNING; the
+        # sender's name comes embedded in the result
+        result = await get_supabase().table("connection_requests").update({
             "status": "accepted" if accept else "declined",
             "response_message": response_message,
             "contact_shared": contact_shared,
             "responded_at": "now()"
+        }).eq("id", request_id).eq("status", "pending").select(
+            "from_user, to_user, from:profiles!from_user(name)"
+        ).execute()
+
+        if not result.data:
+            # Unknown request, or answered already (possibly just now by a concurrent call)
+            request = await get_supabase().table("connection_requests").select("status").eq(
+                "id", request_id
+            ).execute()
+            if not request.data:
+                return {"error": f"Request '{request_id}' not found."}
+            return {"error": f"Request already {request.data[0]['status']}."}
+
+        req = result.data[0]
+        _requests_changed(req["from_user"], req["to_user"])
+        from_name = (req.get("from") or {}).get("name") or req["from_user"]
+        return _request_answered(accept, from_name, contact_shared)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def _sent_requests(user_id: str) -> dict:
+    requests = await get_supabase().table("connection_requests").select(
+        "id, to_user, status, message, response_message, contact_shared, created_at, responded_at"
+    ).eq("from_user", user_id).execute()
+
+    if not requests.data:
+        return {
+            "sent_requests": 0,
+            "message": "You haven't sent any connection requests yet."
         }
 
-        result = get_supabase().table("connection_requests").update(update_data).eq("id", request_id).execute()
+    # Enrich with to_user details (one batched query for all recipients)
+    recipients = await profile_loader("id, name, role").load_many(
+        req["to_user"] for req in requests.data
+    )
+
+    enriched = []
+    for req in requests.data:
+        to_profile = recipients[req["to_user"]]
+
+        entry = {
+            "request_id": req["id"],
+            "to_user": {
+                "id": req["to_user"],
+                "name": to_profile["name"] if to_profile else req["to_user"],
+                "role": to_profile.get("role") if to_profile else None
+            },
+            "status": req["status"],
+            "your_message": req["message"],
+            "created_at": req["created_at"]
+        }
 
-        if result.data:
-            # Get from_user name
-            from_profile = get_supabase().table("profiles").select("name").eq("id", req["from_user"]).execute()
-            from_name = from_profile.data[0]["name"] if from_profile.data else req["from_user"]
-
-            if accept:
-                return {
-                    "success": True,
-                    "message": f"You accepted the connection request from {from_name}!",
-                    "contact_shared": contact_shared if contact_shared else "No contact info shared",
-                    "next_step": f"{from_name} will be notified and can now see your shared contact info."
-                }
-            else:
-                return {
-                    "success": True,
-                    "message": f"You declined the connection request from {from_name}.",
-                    "next_step": "They will be notified of your decision."
-                }
-        else:
-            return {"error": "Failed to update request."}
+        if req["status"] == "accepted":
+            entry["response_message"] = req.get("response_message")
+            entry["contact_shared"] = req.get("contact_shared", {})
+        elif req["status"] == "declined":
+            entry["response_message"] = req.get("response_message")
+            entry["responded_at"] = req.get("responded_at")
 
-    except Exception as e:
-        return {"error": str(e)}
+        enriched.append(entry)
+
+    # Count by status
+    pending = sum(1 for r in enriched if r["status"] == "pending")
+    accepted = sum(1 for r in enriched if r["status"] == "accepted")
+    declined = sum(1 for r in enriched if r["status"] == "declined")
+
+    return {
+        "sent_requests": len(enriched),
+        "summary": {
+            "pending": pending,
+            "accepted": accepted,
+            "declined": declined
+        },
+        "requests": enriched
+    }
 
 
 @mcp.tool
-def check_my_sent_requests(user_id: str) -> dict:
+async def check_my_sent_requests(user_id: str) -> dict:
     """
     Check the status of connection requests you've sent.
 
@@ -700,63 +1264,38 @@ def check_my_sent_requests(user_id: str) -> dict:
         return {"error": "Database not connected."}
 
     try:
-        requests = get_supabase().table("connection_requests").select(
-            "id, to_user, status, message, response_message, contact_shared, created_at, responded_at"
-        ).eq("from_user", user_id).execute()
-
-        if not requests.data:
-            return {
-                "sent_requests": 0,
-                "message": "You haven't sent any connection requests yet."
-            }
+        return await _flights.do_async(("sent", user_id), lambda: _sent_requests(user_id))
+    except Exception as e:
+        return {"error": str(e)}
 
-        # Enrich with to_user details
-        enriched = []
-        for req in requests.data:
-            to_profile = get_supabase().table("profiles").select("name, role").eq("id", req["to_user"]).execute()
 
-            entry = {
-                "request_id": req["id"],
-                "to_user": {
-                    "id": req["to_user"],
-                    "name": to_profile.data[0]["name"] if to_profile.data else req["to_user"],
-                    "role": to_profile.data[0].get("role") if to_profile.data else None
-                },
-                "status": req["status"],
-                "your_message": req["message"],
-                "created_at": req["created_at"]
-            }
+# HEALTH_COUNT: exact | planned | estimated (PostgREST count mode)
+_health_probe = HealthProbe(
+    ttl=float(os.environ.get("HEALTH_CACHE_TTL", 5)),
+    count_method=os.environ.get("HEALTH_COUNT", "estimated")
+)
 
-            if req["status"] == "accepted":
-                entry["response_message"] = req.get("response_message")
-                entry["contact_shared"] = req.get("contact_shared", {})
-            elif req["status"] == "declined":
-                entry["response_message"] = req.get("response_message")
-                entry["responded_at"] = req.get("responded_at")
 
-            enriched.append(entry)
+async def _count_profiles(count_method: str) -> int:
+    """HEAD request with a row count - no profile rows are transferred."""
+    response = await get_supabase().table("profiles").select("id", count=count_method, head=True).timeout(5).execute()
+    return response.count
 
-        # Count by status
-        pending = sum(1 for r in enriched if r["status"] == "pending")
-        accepted = sum(1 for r in enriched if r["status"] == "accepted")
-        declined = sum(1 for r in enriched if r["status"] == "declined")
 
-        return {
-            "sent_requests": len(enriched),
-            "summary": {
-                "pending": pending,
-                "accepted": accepted,
-                "declined": declined
-            },
-            "requests": enriched
-        }
-
-    except Exception as e:
-        return {"error": str(e)}
+def _cache_state() -> dict:
+    state = {
+        "profiles": _profile_cache.stats(),
+        "single_flight": _flights.stats(),
+        "database": _resilience.stats(),
+        "match_engine": {"profiles": len(_match_engine) if _match_engine is not None else 0}
+    }
+    if PROFILE_SYNC_INTERVAL > 0:
+        state["replica"] = _replica.stats()
+    return state
 
 
 @mcp.tool
-def db_status() -> dict:
+async def db_status() -> dict:
     """Check database connection status."""
     if not SUPABASE_URL or not SUPABASE_KEY:
         return {
@@ -764,19 +1303,63 @@ def db_status() -> dict:
             "error": "SUPABASE_URL and SUPABASE_KEY not configured"
         }
 
-    try:
-        profiles = load_profiles()
-        return {
-            "connected": True,
-            "profiles_count": len(profiles),
-            "url": SUPABASE_URL[:30] + "..."
-        }
-    except Exception as e:
-        return {"connected": False, "error": str(e)}
+    health = await _health_probe.measure_async(_count_profiles)
+    status = {
+        "connected": health["ok"],
+        "profiles_count": health["profiles_count"],
+        "count_method": health["count_method"],
+        "latency_ms": health["latency_ms"],
+        "cached": health["cached"],
+        "url": SUPABASE_URL[:30] + "...",
+        "caches": _cache_state()
+    }
+    if not health["ok"]:
+        status["error"] = health["error"]
+    return status
+
+
+# ============== METRICS ==============
+
+# METRICS_TOKEN set: /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+
+def _collect_gauges() -> list:
+    """Point-in-time values for /metrics (cache hit ratios, breaker, replica)."""
+    profiles = _profile_cache.stats()
+    flights = _flights.stats()
+    circuit = _resilience.breaker.stats()
+    gauges = [
+        ("backroom_cache_hit_ratio", "Hit ratio of in-process caches.", {"cache": "profiles"}, profiles["hit_ratio"]),
+        ("backroom_cache_hit_ratio", "Hit ratio of in-process caches.", {"cache": "single_flight"}, flights["shared_ratio"]),
+        ("backroom_cache_entries", "Entries held by in-process caches.", {"cache": "profiles"}, profiles["entries"]),
+        ("backroom_profiles_cached", "Profiles in the cached full list.", {}, profiles["profiles_cached"]),
+        ("backroom_match_engine_profiles", "Profiles indexed by the match engine.", {}, len(_match_engine) if _match_engine is not None else 0),
+        ("backroom_db_circuit_open", "1 while the Supabase circuit breaker rejects calls.", {}, int(circuit["state"] != "closed")),
+        ("backroom_db_circuit_opens", "Times the Supabase circuit breaker opened.", {}, circuit["opens"]),
+        ("backroom_db_retries", "Supabase reads retried.", {}, _resilience.retried),
+        ("backroom_db_hedged", "Supabase reads hedged.", {}, _resilience.hedged),
+    ]
+    if PROFILE_SYNC_INTERVAL > 0:
+        replica = _replica.stats()
+        gauges.append(("backroom_replica_lag_seconds", "Seconds since the replica last synced.", {}, replica["lag_seconds"]))
+        gauges.append(("backroom_replica_profiles", "Profiles held by the replica.", {}, replica["profiles"]))
+    return gauges
+
+
+_metrics.collector(_collect_gauges)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request) -> Response:
+    """Prometheus scrape endpoint (HTTP/SSE transports only)."""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        return Response("Unauthorized", status_code=401)
+    return Response(_metrics.render(), media_type=CONTENT_TYPE)
 
 
 @mcp.tool
-def register_profile(
+async def register_profile(
     name: str,
     role: str,
     skills: str,
@@ -831,7 +1414,7 @@ def register_profile(
 
     # Check if profile already exists
     try:
-        existing = get_supabase().table("profiles").select("id").eq("id", profile_id).execute()
+        existing = await get_supabase().table("profiles").select("id").eq("id", profile_id).execute()
         if existing.data:
             return {
                 "error": f"Profile with ID '{profile_id}' already exists. Choose a different name or use update_my_profile to modify."
@@ -869,10 +1452,14 @@ def register_profile(
             profile_data["preferred_contact"] = preferred_contact
         if industry_list:
             profile_data["industry"] = industry_list
+        if SEARCH_KEYS:
+            profile_data["search_keys"] = search_keys(profile_data)
 
-        response = get_supabase().table("profiles").insert(profile_data).execute()
+        response = await get_supabase().table("profiles").insert(profile_data).execute()
 
         if response.data:
+            _profile_written(response.data[0])
+
             # Build profile display
             profile_display = f"""
 ╔══════════════════════════════════════════════╗
@@ -930,7 +1517,7 @@ def register_profile(
 
 
 @mcp.tool
-def update_my_profile(
+async def update_my_profile(
     profile_id: str,
     role: str = None,
     skills: str = None,
@@ -973,7 +1560,7 @@ def update_my_profile(
 
     # Check if profile exists
     try:
-        existing = get_supabase().table("profiles").select("*").eq("id", profile_id).execute()
+        existing = await get_supabase().table("profiles").select("*").eq("id", profile_id).execute()
         if not existing.data:
             return {"error": f"Profile '{profile_id}' not found. Use register_profile to create one."}
     except Exception as e:
@@ -1011,15 +1598,20 @@ def update_my_profile(
 
     if not update_data:
         return {"error": "No fields to update. Provide at least one field."}
+    updated_fields = list(update_data)
+    if SEARCH_KEYS:
+        update_data["search_keys"] = search_keys({**existing.data[0], **update_data})
 
     try:
-        response = get_supabase().table("profiles").update(update_data).eq("id", profile_id).execute()
+        response = await get_supabase().table("profiles").update(update_data).eq("id", profile_id).execute()
 
         if response.data:
+            _profile_written(response.data[0])
+
             return {
                 "success": True,
                 "message": f"Profile '{profile_id}' updated successfully!",
-                "updated_fields": list(update_data.keys())
+                "updated_fields": updated_fields
             }
         else:
             return {"error": "Failed to update profile."}
@@ -1029,8 +1621,6 @@ def update_my_profile(
 
 
 if __name__ == "__main__":
-    import sys
-
     # Check for transport mode
     if "--http" in sys.argv or os.environ.get("MCP_TRANSPORT") == "http":
         # HTTP transport for remote deployment
@@ -0,0 +1,108 @@
+"""
+The Backroom - Single-flight request coalescing
+Concurrent identical reads share one in-flight database call.
+
+The first caller for a key runs the call; everyone asking for the same key
+while it is in flight waits for and gets the same result (or exception)
+instead of sending a duplicate query. Nothing is cached: once the call
+finishes the next caller starts a new one, so results are never older than
+the calls callers would have made themselves.
+
+    flights = SingleFlight()
+    rows = flights.do("profiles", fetch_all)                    # threads
+    rows = await flights.do_async("profiles", fetch_all_async)  # coroutines
+
+Writes call forget(key) so readers arriving after the write do not join a
+read that started before it.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Per-key coalescing of concurrent calls, for threads and coroutines."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call (threads)
+        self._tasks = {}  # key -> asyncio.Task (coroutines)
+        self.calls = 0  # calls actually made
+        self.shared = 0  # callers served by another caller's call
+
+    def do(self, key, fn):
+        """Return fn(), or the result of the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """
+        Return await fn(), or the result of the identical call in flight.
+
+        The call runs as its own task, so a caller that is cancelled (or
+        times out) does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is loop:
+            self.shared += 1
+        else:
+            task = loop.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+            self.calls += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def forget(self, key):
+        """Let the next caller for key start a fresh call."""
+        with self._lock:
+            self._calls.pop(key, None)
+        self._tasks.pop(key, None)
+
+    def stats(self) -> dict:
+        callers = self.calls + self.shared
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "shared_ratio": round(self.shared / callers, 3) if callers else None,
+            "in_flight": len(self._calls) + len(self._tasks),
+        }
@@ -0,0 +1,49 @@
+-- The Backroom - atomic send_connection_request
+--
+-- One round trip instead of four (check sender, check recipient, check for a
+-- pending duplicate, insert), and no duplicates under concurrent calls.
+-- Apply in the Supabase SQL editor, then run the MCP server with
+-- SUPABASE_RPC_WRITES=1.
+
+-- At most one pending request per (from_user, to_user) pair
+create unique index if not exists connection_requests_one_pending
+    on connection_requests (from_user, to_user)
+    where status = 'pending';
+
+create or replace function send_connection_request(
+    p_from_user text,
+    p_to_user text,
+    p_message text,
+    p_reason text default ''
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_to record;
+    v_request_id connection_requests.id%type;
+begin
+    if not exists (select 1 from profiles where id = p_from_user) then
+        return jsonb_build_object('status', 'from_not_found');
+    end if;
+
+    select id, name, role into v_to from profiles where id = p_to_user;
+    if not found then
+        return jsonb_build_object('status', 'to_not_found');
+    end if;
+
+    insert into connection_requests (from_user, to_user, message, reason, status)
+    values (p_from_user, p_to_user, p_message, p_reason, 'pending')
+    on conflict (from_user, to_user) where status = 'pending' do nothing
+    returning id into v_request_id;
+
+    if v_request_id is null then
+        return jsonb_build_object('status', 'duplicate');
+    end if;
+
+    return jsonb_build_object(
+        'status', 'sent',
+        'request_id', v_request_id,
+        'to_user', jsonb_build_object('id', v_to.id, 'name', v_to.name, 'role', v_to.role)
+    );
+end;
+$$;
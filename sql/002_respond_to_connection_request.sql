@@ -0,0 +1,57 @@
+-- The Backroom - conditional respond_to_connection_request
+--
+-- One conditional UPDATE ... WHERE status = 'pending' RETURNING, with the
+-- responder's email and the requester's name read in the same statement.
+-- Two concurrent responses can no longer both succeed: the loser gets
+-- 'already_responded'. Apply in the Supabase SQL editor, then run the MCP
+-- server with SUPABASE_RPC_WRITES=1.
+
+create or replace function respond_to_connection_request(
+    p_request_id connection_requests.id%type,
+    p_accept boolean,
+    p_response_message text default '',
+    p_share_email boolean default false
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_result record;
+    v_status text;
+begin
+    update connection_requests r
+    set status = case when p_accept then 'accepted' else 'declined' end,
+        response_message = p_response_message,
+        contact_shared = case
+            when p_accept and p_share_email then coalesce(
+                (select jsonb_build_object('email', p.email)
+                 from profiles p
+                 where p.id = r.to_user and coalesce(p.email, '') <> ''),
+                '{}'::jsonb)
+            else '{}'::jsonb
+        end,
+        responded_at = now()
+    where r.id = p_request_id and r.status = 'pending'
+    returning
+        r.from_user,
+        r.to_user,
+        r.contact_shared,
+        (select p.name from profiles p where p.id = r.from_user) as from_name
+    into v_result;
+
+    if found then
+        return jsonb_build_object(
+            'status', 'ok',
+            'from_user', v_result.from_user,
+            'to_user', v_result.to_user,
+            'from_name', coalesce(v_result.from_name, v_result.from_user),
+            'contact_shared', v_result.contact_shared
+        );
+    end if;
+
+    select status into v_status from connection_requests where id = p_request_id;
+    if not found then
+        return jsonb_build_object('status', 'not_found');
+    end if;
+    return jsonb_build_object('status', 'already_responded', 'request_status', v_status);
+end;
+$$;
@@ -0,0 +1,26 @@
+-- The Backroom - updated_at watermark for incremental profile sync
+--
+-- The MCP server and the web UI can keep an in-memory replica of profiles
+-- (PROFILE_SYNC_INTERVAL > 0) by polling for rows with
+-- updated_at >= last watermark. This keeps the column current on every write.
+
+alter table profiles
+    add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists profiles_updated_at_idx
+    on profiles (updated_at, id);
+
+create or replace function profiles_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists profiles_touch_updated_at on profiles;
+create trigger profiles_touch_updated_at
+    before update on profiles
+    for each row execute function profiles_touch_updated_at();
@@ -0,0 +1,14 @@
+-- The Backroom - precomputed search keys on profiles
+--
+-- search_keys holds "field:key" for every offers/seeks/skills/industry/tags
+-- value and the role, normalized by normalize.py (casefolded, no diacritics,
+-- collapsed whitespace, aliases like k8s -> kubernetes). The MCP server
+-- writes them when PROFILE_SEARCH_KEYS=1; fill existing rows once with
+-- `python backfill_search_keys.py` after running this.
+
+alter table profiles
+    add column if not exists search_keys text[] not null default '{}';
+
+-- Exact key lookups, e.g. search_keys @> '{skills:kubernetes}'
+create index if not exists profiles_search_keys_idx
+    on profiles using gin (search_keys);
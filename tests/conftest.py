@@ -0,0 +1,176 @@
+"""
+Shared fixtures: server.py talking to the in-memory PostgREST stand-in
+(bench/fake_postgrest.py) through an in-process ASGI transport, so the
+tools run their real queries without a network or a Supabase project.
+
+Tests marked `postgres` run the functions in sql/ against a real database
+instead; they need psycopg and POSTGRES_TEST_DSN and are skipped otherwise.
+"""
+
+import copy
+import os
+import sys
+import uuid
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+from bench.fake_postgrest import Store, create_app  # noqa: E402
+from db import Database  # noqa: E402
+from matching import ProfileRecord  # noqa: E402
+from profile_cache import ProfileCache  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+
+
+def profile(profile_id: str, **fields) -> dict:
+    """A profiles row with the list columns defaulted to empty."""
+    row = {"id": profile_id, "name": profile_id.title(), "role": None, "bio": None}
+    for field in ("skills", "offers", "seeks", "tags", "industry"):
+        row[field] = []
+    row.update(fields)
+    return row
+
+
+def connection_request(request_id: str, from_user: str, to_user: str, status: str = "pending", **fields) -> dict:
+    """A connection_requests row."""
+    row = {"id": request_id, "from_user": from_user, "to_user": to_user, "status": status, "message": "Hi",
+           "reason": "", "response_message": None, "contact_shared": {},
+           "created_at": "2025-06-01T00:00:00+00:00", "responded_at": None}
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    """
+    connect(profiles, requests) -> Store: points server.py at a fresh
+    stand-in holding those rows, with empty caches and no match engine.
+    """
+    def connect(profiles=(), requests=(), **database_options):
+        # Copies: tests mutate the store's rows in place
+        store = Store(copy.deepcopy(list(profiles)), copy.deepcopy(list(requests)))
+        database = Database(
+            "http://postgrest.test", "test-key",
+            transport=httpx.ASGITransport(create_app(store)), **database_options
+        )
+        monkeypatch.setattr(server, "_supabase", database)
+        monkeypatch.setattr(server, "_profile_cache", ProfileCache(ttl=30, list_item=ProfileRecord.from_row))
+        monkeypatch.setattr(server, "_flights", SingleFlight())
+        monkeypatch.setattr(server, "_match_engine", None)
+        monkeypatch.setattr(server, "_engine_rebuild", None)
+        monkeypatch.setattr(server, "_rebuild_changes", [])
+        monkeypatch.setattr(server, "_suggestions_refresh", None)
+        return store
+
+    return connect
+
+
+# Only the columns sql/ touches
+POSTGRES_SCHEMA = """
+create table profiles (
+    id text primary key,
+    name text not null,
+    role text,
+    email text
+);
+create table connection_requests (
+    id text primary key default gen_random_uuid()::text,
+    from_user text not null references profiles (id),
+    to_user text not null references profiles (id),
+    status text not null default 'pending',
+    message text,
+    reason text default '',
+    response_message text,
+    contact_shared jsonb not null default '{}'::jsonb,
+    created_at timestamptz not null default now(),
+    responded_at timestamptz
+);
+"""
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: runs sql/ against POSTGRES_TEST_DSN (skipped when unset)")
+
+
+@pytest.fixture
+def postgres():
+    """
+    connect(*sql_files) -> autocommit psycopg connection to a throwaway
+    schema with profiles and connection_requests and the given sql/ files
+    applied. Later calls open more connections to the same schema.
+    """
+    dsn = os.environ.get("POSTGRES_TEST_DSN")
+    if not dsn:
+        pytest.skip("POSTGRES_TEST_DSN is not set")
+    psycopg = pytest.importorskip("psycopg")
+    schema = f"backroom_test_{uuid.uuid4().hex[:12]}"
+    connections = []
+
+    def connect(*sql_files):
+        conn = psycopg.connect(dsn, autocommit=True, options=f"-c search_path={schema}")
+        if not connections:
+            conn.execute(f"create schema {schema}")
+            conn.execute(POSTGRES_SCHEMA)
+        connections.append(conn)
+        for name in sql_files:
+            with open(os.path.join(SQL_DIR, name)) as f:
+                conn.execute(f.read())
+        return conn
+
+    yield connect
+    for conn in connections[1:]:
+        conn.close()
+    if connections:
+        connections[0].execute(f"drop schema {schema} cascade")
+        connections[0].close()
+
+
+def record_round_trips() -> list:
+    """(method, path) of every request server.py sends from now on."""
+    calls = []
+    server.get_supabase().add_listener(lambda trip: calls.append((trip["method"], trip["path"])))
+    return calls
+
+
+def baseline_search(profiles: list, query: str) -> list:
+    """The original find_collaborators scan: (id, score, reasons) best first."""
+    query_lower = query.lower()
+    matches = []
+    for p in profiles:
+        score, reasons = 0, []
+        for field, weight, template in (("offers", 3, "Offers: {}"), ("seeks", 2, "Seeks: {}"),
+                                        ("skills", 2, "Skill: {}"), ("industry", 1, "Industry: {}")):
+            for value in p.get(field) or []:
+                if query_lower in value.lower():
+                    score += weight
+                    reasons.append(template.format(value))
+        if query_lower in (p.get("role") or "").lower():
+            score += 1
+            reasons.append("Role match")
+        if score > 0:
+            matches.append((p["id"], score, reasons))
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches
+
+
+# Hand-written corpus without alias spellings or diacritics, where the
+# normalized search has to agree with baseline_search exactly
+PEOPLE = [
+    profile("anna", role="Python Developer", skills=["Python", "Django"], offers=["Python consulting", "Code reviews"],
+            seeks=["Marketing advice"], industry=["SaaS"]),
+    profile("bob", role="Marketing Manager", skills=["SEO", "Content marketing"], offers=["Marketing audits"],
+            seeks=["Python developer", "Beta testers"], industry=["E-commerce"]),
+    profile("cara", role="DevOps Engineer", skills=["Ansible", "Terraform", "Python"], offers=["Network automation"],
+            seeks=["Co-founder"], industry=["Telecom"]),
+    profile("dan", role="Founder", skills=["Sales"], offers=["Introductions to investors"],
+            seeks=["Technical partner", "Code reviews"], industry=["Fintech", "SaaS"]),
+    profile("ewa", role="UX Designer", skills=["Figma", "User research"], offers=["Design feedback"],
+            seeks=["Clients"], industry=["Media"]),
+    profile("filip", role="Data Scientist", skills=["Python", "Machine learning"], offers=["Data analysis"],
+            seeks=["Datasets", "Mentoring"], industry=["Healthtech"]),
+]
@@ -0,0 +1,127 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+import server
+from bench.compare import compare
+from bench.corpus import Corpus
+from bench.report import percentile, summarize
+from bench.run import calls, parse_size, size_label
+from conftest import connection_request, profile
+from db import APIError
+
+
+def test_corpus_is_a_function_of_the_seed():
+    assert list(Corpus(7).profiles(50)) == list(Corpus(7).profiles(50))
+    assert Corpus(7).queries(20) == Corpus(7).queries(20)
+    assert Corpus(7).queries(20) != Corpus(8).queries(20)
+    assert [p["id"] for p in Corpus(7).profiles(3)] == ["user_0000000", "user_0000001", "user_0000002"]
+
+
+def test_corpus_requests_keep_one_pending_request_per_pair():
+    requests = list(Corpus(1).connection_requests(200, 2000))
+    pending = Counter((r["from_user"], r["to_user"]) for r in requests if r["status"] == "pending")
+
+    assert max(pending.values()) == 1
+    assert all(r["from_user"] != r["to_user"] for r in requests)
+    # Recipients are skewed towards the first users
+    recipients = Counter(r["to_user"] for r in requests)
+    assert recipients["user_0000000"] > len(requests) / 200
+
+
+def test_common_skills_dominate_the_corpus():
+    skills = Counter(s for p in Corpus(3).profiles(2000) for s in p["skills"])
+
+    assert skills.most_common(1)[0][0] == "python"
+    assert len(skills) > 500
+
+
+@pytest.fixture
+def database(backend):
+    backend(
+        [profile("a", role="Dev", score=3), profile("b", role=None, score=7), profile("c", role="Ops", score=5)],
+        [connection_request("r1", "a", "b"), connection_request("r2", "c", "b", "accepted")],
+    )
+    return server.get_supabase()
+
+
+def _ids(query):
+    return [row["id"] for row in asyncio.run(query.execute()).data]
+
+
+def test_stand_in_filters_orders_and_pages(database):
+    profiles = database.table("profiles")
+
+    assert _ids(database.table("profiles").select("id").gt("score", 4).order("score", desc=True)) == ["b", "c"]
+    assert _ids(profiles.select("id").in_("id", ["c", "a", "zz"]).order("id")) == ["a", "c"]
+    assert _ids(database.table("profiles").select("id").gt("id", "a").limit(1)) == ["b"]
+    assert _ids(database.table("profiles").select("id").order("id").offset(2)) == ["c"]
+    nulls = asyncio.run(database.request("GET", "/profiles", params=[("select", "id"), ("role", "is.null")]))
+    assert [row["id"] for row in nulls.data] == ["b"]
+
+
+def test_stand_in_counts_and_embeds(database):
+    head = asyncio.run(database.table("connection_requests").select("id", count="exact", head=True)
+                       .eq("to_user", "b").execute())
+    assert (head.count, head.data) == (2, [])
+
+    rows = asyncio.run(database.table("connection_requests").select("id, sender:profiles!from_user(name, role)")
+                       .eq("id", "r2").execute()).data
+    assert rows == [{"id": "r2", "sender": {"name": "C", "role": "Ops"}}]
+
+
+def test_stand_in_enforces_the_unique_indexes(database):
+    with pytest.raises(APIError) as raised:
+        asyncio.run(database.table("connection_requests").insert({"from_user": "a", "to_user": "b"}).execute())
+    assert (raised.value.status_code, raised.value.code) == (409, "23505")
+
+    with pytest.raises(APIError) as raised:
+        asyncio.run(database.table("profiles").insert(profile("a")).execute())
+    assert raised.value.code == "23505"
+
+
+def test_percentile_is_nearest_rank():
+    ordered = list(range(1, 101))
+
+    assert [percentile(ordered, q) for q in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_summarize_reports_milliseconds():
+    summary = summarize([0.003, 0.001, 0.002])
+
+    assert summary == {"count": 3, "mean_ms": 2.0, "min_ms": 1.0, "p50_ms": 2.0, "p95_ms": 3.0, "p99_ms": 3.0,
+                       "max_ms": 3.0}
+    assert summarize([])["p50_ms"] is None
+
+
+def test_compare_lists_common_scenarios_with_their_change():
+    baseline = {"results": {"10k": {"find_collaborators": {"p50_ms": 10, "p95_ms": 20, "p99_ms": 40},
+                                    "cold_start": {"seconds": 2.0}}}}
+    candidate = {"results": {"10k": {"find_collaborators": {"p50_ms": 5, "p95_ms": 20, "p99_ms": None},
+                                     "cold_start": {"seconds": 3.0},
+                                     "app_find_matches": {"skipped": "no gradio"}}}}
+
+    lines = compare(baseline, candidate)
+    assert len(lines) == 2
+    assert "p50_ms 10 -> 5 (-50.0%)" in lines[0] and "p99_ms 40 -> None (n/a)" in lines[0]
+    assert "seconds 2.0 -> 3.0 (+50.0%)" in lines[1]
+
+
+@pytest.mark.parametrize("text, profiles, label", [("10k", 10_000, "10k"), ("1m", 1_000_000, "1m"),
+                                                   ("2.5k", 2_500, "2500"), ("750", 750, "750")])
+def test_sizes(text, profiles, label):
+    assert parse_size(text) == profiles
+    assert size_label(profiles) == label
+
+
+def test_planned_calls_are_deterministic_per_scenario():
+    corpus = Corpus(42)
+
+    pages = calls(corpus, "list_profiles", 1000, 8)
+    assert [arguments["cursor"] == "" for _, arguments in pages] == [True, False, False, False] * 2
+    assert calls(Corpus(42), "send_connection_request", 1000, 5) == calls(corpus, "send_connection_request", 1000, 5)
+    with pytest.raises(ValueError, match="Unknown scenario"):
+        calls(corpus, "nope", 1000, 1)
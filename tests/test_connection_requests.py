@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+import server
+from conftest import connection_request, profile, record_round_trips
+
+USERS = [profile("anna", role="Developer"), profile("bob", role="Designer")]
+
+
+@pytest.fixture(params=[False, True], ids=["rest", "rpc"])
+def rpc_writes(request, monkeypatch):
+    monkeypatch.setattr(server, "RPC_WRITES", request.param)
+    return request.param
+
+
+def test_send_creates_a_pending_request(backend, rpc_writes):
+    store = backend(USERS)
+
+    result = asyncio.run(server.send_connection_request("anna", "bob", "Hello"))
+
+    assert result["success"] and result["status"] == "pending"
+    assert result["to_user"] == {"id": "bob", "name": "Bob", "role": "Designer"}
+    row = store.tables["connection_requests"].rows[result["request_id"]]
+    assert (row["from_user"], row["to_user"], row["status"]) == ("anna", "bob", "pending")
+
+
+def test_duplicate_send_returns_already_pending(backend, rpc_writes):
+    store = backend(USERS)
+
+    async def scenario():
+        await server.send_connection_request("anna", "bob", "Hello")
+        return await server.send_connection_request("anna", "bob", "Hello again")
+
+    assert asyncio.run(scenario()) == {"error": server.DUPLICATE_REQUEST_ERROR}
+    assert len(store.tables["connection_requests"].rows) == 1
+
+
+def test_concurrent_sends_create_one_request(backend, rpc_writes):
+    store = backend(USERS)
+
+    async def scenario():
+        return await asyncio.gather(*(server.send_connection_request("anna", "bob", "Hello") for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert sum(bool(r.get("success")) for r in results) == 1
+    assert [r for r in results if "error" in r] == [{"error": server.DUPLICATE_REQUEST_ERROR}] * 2
+    assert len(store.tables["connection_requests"].rows) == 1
+
+
+def test_answered_request_does_not_block_a_new_one(backend, rpc_writes):
+    backend(USERS, [connection_request("r1", "anna", "bob", "declined")])
+
+    assert asyncio.run(server.send_connection_request("anna", "bob", "Second try"))["success"]
+
+
+@pytest.mark.parametrize("sender, recipient, error", [
+    ("ghost", "bob", "Your profile 'ghost' not found. Register first with register_profile."),
+    ("anna", "ghost", "User 'ghost' not found."),
+])
+def test_unknown_users_are_rejected(backend, rpc_writes, sender, recipient, error):
+    backend(USERS)
+
+    assert asyncio.run(server.send_connection_request(sender, recipient, "Hello")) == {"error": error}
+
+
+def test_rpc_send_is_one_round_trip(backend, monkeypatch):
+    monkeypatch.setattr(server, "RPC_WRITES", True)
+    backend(USERS)
+    calls = record_round_trips()
+
+    asyncio.run(server.send_connection_request("anna", "bob", "Hello"))
+
+    assert calls == [("POST", "/rpc/send_connection_request")]
+
+
+def test_accept_shares_the_responders_email(backend, rpc_writes):
+    store = backend([USERS[0], profile("bob", email="bob@example.com")], [connection_request("r1", "anna", "bob")])
+
+    result = asyncio.run(server.respond_to_request("r1", True, "Sure", share_email=True))
+
+    assert result["message"] == "You accepted the connection request from Anna!"
+    assert result["contact_shared"] == {"email": "bob@example.com"}
+    row = store.tables["connection_requests"].rows["r1"]
+    assert (row["status"], row["response_message"], row["contact_shared"]) == (
+        "accepted", "Sure", {"email": "bob@example.com"}
+    )
+    assert row["responded_at"]
+
+
+def test_decline_shares_nothing(backend, rpc_writes):
+    store = backend([USERS[0], profile("bob", email="bob@example.com")], [connection_request("r1", "anna", "bob")])
+
+    result = asyncio.run(server.respond_to_request("r1", False, share_email=True))
+
+    assert result["message"] == "You declined the connection request from Anna."
+    assert store.tables["connection_requests"].rows["r1"]["contact_shared"] == {}
+
+
+def test_second_respond_returns_already_accepted(backend, rpc_writes):
+    store = backend(USERS, [connection_request("r1", "anna", "bob")])
+
+    async def scenario():
+        await server.respond_to_request("r1", True)
+        return await server.respond_to_request("r1", False)
+
+    assert asyncio.run(scenario()) == {"error": "Request already accepted."}
+    assert store.tables["connection_requests"].rows["r1"]["status"] == "accepted"
+
+
+def test_concurrent_responds_answer_once(backend, rpc_writes):
+    store = backend(USERS, [connection_request("r1", "anna", "bob")])
+
+    async def scenario():
+        return await asyncio.gather(server.respond_to_request("r1", True), server.respond_to_request("r1", False))
+
+    accepted, declined = asyncio.run(scenario())
+    assert accepted["success"]
+    assert declined == {"error": "Request already accepted."}
+    assert store.tables["connection_requests"].rows["r1"]["status"] == "accepted"
+
+
+def test_respond_to_unknown_request(backend, rpc_writes):
+    backend(USERS)
+
+    assert asyncio.run(server.respond_to_request("nope", True)) == {"error": "Request 'nope' not found."}
+
+
+def test_respond_is_one_conditional_update(backend, monkeypatch):
+    monkeypatch.setattr(server, "RPC_WRITES", False)
+    backend(USERS, [connection_request("r1", "anna", "bob")])
+    calls = record_round_trips()
+
+    asyncio.run(server.respond_to_request("r1", True))
+
+    assert calls == [("PATCH", "/connection_requests")]
+
+
+def test_shared_email_is_written_by_the_conditional_update(backend, rpc_writes):
+    store = backend([USERS[0], profile("bob", email="bob@example.com")], [connection_request("r1", "anna", "bob")])
+    calls = record_round_trips()
+
+    result = asyncio.run(server.respond_to_request("r1", True, share_email=True))
+
+    assert result["contact_shared"] == {"email": "bob@example.com"}
+    assert store.tables["connection_requests"].rows["r1"]["contact_shared"] == {"email": "bob@example.com"}
+    # At most a read of the email before it; never a second write
+    assert [call for call in calls if call[0] == "PATCH"] == ([] if rpc_writes else [("PATCH", "/connection_requests")])
+
+
+def test_answered_request_leaves_the_inbox(backend, rpc_writes):
+    backend(USERS, [connection_request("r1", "anna", "bob")])
+
+    async def scenario():
+        before = await server.check_incoming_requests("bob")
+        await server.respond_to_request("r1", True)
+        return before, await server.check_incoming_requests("bob")
+
+    before, after = asyncio.run(scenario())
+    assert before["pending_requests"] == 1
+    assert after.get("pending_requests", 0) == 0
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from db import APIError, Database, count_from_content_range
+
+
+def _database(handler) -> Database:
+    return Database("http://postgrest.test", "test-key", transport=httpx.MockTransport(handler))
+
+
+def test_query_builds_postgrest_params():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json=[{"id": "a"}], headers={"content-range": "0-0/7"})
+
+    query = (_database(handler).table("profiles").select("id, name", count="exact")
+             .eq("active", True).in_("id", ["a", 'b"c']).order("name").order("id", desc=True).limit(5))
+    response = asyncio.run(query.execute())
+
+    assert response.data == [{"id": "a"}] and response.count == 7
+    request = seen[0]
+    assert request.url.path == "/rest/v1/profiles"
+    assert list(request.url.params.multi_items()) == [
+        ("select", "id,name"), ("active", "eq.true"), ("id", 'in.("a","b\\"c")'),
+        ("limit", "5"), ("order", "name.asc,id.desc"),
+    ]
+    assert request.headers["Prefer"] == "count=exact"
+
+
+@pytest.mark.parametrize("response, message, code", [
+    (httpx.Response(409, json={"message": "duplicate key", "code": "23505"}), "duplicate key", "23505"),
+    (httpx.Response(400, json=["not", "an", "object"]), '["not","an","object"]', None),
+    (httpx.Response(500, json="boom"), '"boom"', None),
+    (httpx.Response(502, text="<html>Bad gateway</html>"), "<html>Bad gateway</html>", None),
+    (httpx.Response(503), "Service Unavailable", None),
+])
+def test_error_bodies_become_api_errors(response, message, code):
+    with pytest.raises(APIError) as raised:
+        asyncio.run(_database(lambda request: response).table("profiles").select().execute())
+
+    assert raised.value.status_code == response.status_code
+    assert str(raised.value) == message
+    assert raised.value.code == code
+
+
+def test_listeners_see_failed_round_trips():
+    trips = []
+    database = _database(lambda request: httpx.Response(404, json={"message": "missing"}))
+    database.add_listener(trips.append)
+
+    with pytest.raises(APIError):
+        asyncio.run(database.rpc("send_connection_request", {"p_from": "a"}).execute())
+
+    assert [(t["method"], t["path"], t["status"]) for t in trips] == [("POST", "/rpc/send_connection_request", 404)]
+    assert isinstance(trips[0]["error"], APIError)
+
+
+@pytest.mark.parametrize("value, count", [
+    ("0-24/573", 573), ("*/0", 0), ("0-24/*", None), ("", None), (None, None),
+])
+def test_count_from_content_range(value, count):
+    assert count_from_content_range(value) == count
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+import server
+from conftest import PEOPLE, profile
+from matching import MatchEngine, parse_filters
+from pagination import encode_cursor
+
+
+def _holds(p, negated, field, value):
+    return any(value.lower() in v.lower() for v in p.get(field) or []) != negated
+
+
+def _brute_force(profiles, groups):
+    return sorted(p["id"] for p in profiles if any(all(_holds(p, *c) for c in group) for group in groups))
+
+
+def test_and_binds_tighter_than_or():
+    assert parse_filters("skills=python AND industry=saas OR NOT seeking=co-founder") == [
+        [(False, "skills", "python"), (False, "industry", "saas")],
+        [(True, "seeks", "co-founder")],
+    ]
+
+
+def test_lowercase_keywords_are_part_of_the_value():
+    assert parse_filters("offering=research and development") == [[(False, "offers", "research and development")]]
+
+
+@pytest.mark.parametrize("expression, error", [
+    ("skills python", "Invalid condition 'skills python'. Use category=value."),
+    ("skills=", "Invalid condition 'skills='. Use category=value."),
+    ("colour=blue", "Unknown category 'colour'. Use one of: industry, skills, seeking, offering"),
+    ("skills=python AND", "Empty condition around AND."),
+    ("OR skills=python", "Empty condition around OR."),
+])
+def test_malformed_filters_are_rejected(expression, error):
+    with pytest.raises(ValueError) as raised:
+        parse_filters(expression)
+    assert str(raised.value) == error
+
+
+@pytest.mark.parametrize("expression", [
+    "skills=python",
+    "skills=python AND industry=saas OR NOT seeking=co-founder",
+    "skills=python AND NOT offering=consulting",
+    "NOT skills=python",
+    "industry=saas OR industry=telecom OR skills=figma",
+    "skills=python AND seeking=code OR offering=design AND NOT industry=media",
+    "skills=cobol",
+])
+def test_filter_profiles_agrees_with_brute_force(expression):
+    groups = parse_filters(expression)
+    found, profiles = MatchEngine(PEOPLE).filter_profiles(groups)
+
+    expected = _brute_force(PEOPLE, groups)
+    assert [p["id"] for p in profiles] == expected
+    assert found == len(expected)
+
+
+def test_filter_pages_continue_after_the_cursor_id():
+    engine = MatchEngine([profile(f"p{i:02d}", skills=["Python"]) for i in range(10)])
+    groups = parse_filters("skills=python")
+
+    found, page = engine.filter_profiles(groups, limit=3, after_id="p04")
+    assert found == 10
+    assert [p["id"] for p in page] == ["p05", "p06", "p07"]
+
+
+def test_search_by_category_pages_through_every_match(backend):
+    backend([profile(f"p{i:02d}", skills=["Python"] if i % 3 else ["Go"]) for i in range(12)])
+
+    async def walk():
+        ids, cursor = [], ""
+        while cursor is not None:
+            page = await server.search_by_category(filters="skills=python", limit=3, cursor=cursor)
+            ids.extend(r["id"] for r in page["results"])
+            cursor = page["next_cursor"]
+        return ids
+
+    assert asyncio.run(walk()) == [f"p{i:02d}" for i in range(12) if i % 3]
+
+
+def test_search_by_category_applies_the_single_condition_to_every_alternative(backend):
+    backend(PEOPLE)
+
+    result = asyncio.run(server.search_by_category("skills", "python", filters="industry=saas OR industry=telecom"))
+
+    assert [r["id"] for r in result["results"]] == ["anna", "cara"]
+
+
+def test_search_by_category_falls_back_to_fuzzy(backend):
+    backend(PEOPLE)
+
+    result = asyncio.run(server.search_by_category("skills", "pyhton"))
+    assert result["fuzzy"] and [r["id"] for r in result["results"]] == ["anna", "cara", "filip"]
+
+
+@pytest.mark.parametrize("arguments", [
+    {"category": "skills", "value": "python", "cursor": encode_cursor(3)},
+    {"category": "skills", "value": "python", "cursor": "%%%"},
+    {"filters": "colour=blue"},
+    {},
+])
+def test_search_by_category_reports_bad_input(backend, arguments):
+    backend(PEOPLE)
+
+    assert "error" in asyncio.run(server.search_by_category(**arguments))
@@ -0,0 +1,62 @@
+import asyncio
+import random
+
+import pytest
+
+import server
+from conftest import PEOPLE, baseline_search, profile
+from matching import MatchEngine
+from search_index import TrigramIndex, fold, trigrams
+
+
+@pytest.mark.parametrize("text, folded", [
+    ("Łódź", "lodz"), ("Automatyzację SIECI", "automatyzacje sieci"), ("Straße", "strasse"), ("Python", "python"),
+])
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.4, 0.6])
+def test_similar_finds_exactly_the_words_above_the_threshold(threshold):
+    rng = random.Random(threshold)
+    words = {"".join(rng.choice("abcdef") for _ in range(rng.randint(2, 10))) for _ in range(400)}
+    index = TrigramIndex()
+    for word in words:
+        index.add(word)
+
+    for query in ("abcab", "fed", "aaaaaaa", "bcdefab"):
+        grams = trigrams(query)
+        expected = {
+            word for word in words
+            if 2 * len(grams & trigrams(word)) / (len(grams) + len(trigrams(word))) >= threshold
+        }
+        found = index.similar(query, threshold)
+        assert {word for word, _ in found} == expected
+        assert [s for _, s in found] == sorted((s for _, s in found), reverse=True)
+
+
+def test_fuzzy_search_tolerates_typos_and_missing_diacritics():
+    engine = MatchEngine(PEOPLE + [profile("ola", offers=["Automatyzację sieci"])])
+
+    # Same weights and order as the exact search
+    assert [(m["profile"]["id"], m["score"]) for m in engine.fuzzy_search("pyhton")[1]] == [
+        (i, score) for i, score, _ in baseline_search(PEOPLE, "python")
+    ]
+    assert [m["reasons"] for m in engine.fuzzy_search("automatyzacja sieci")[1]] == [["Offers: Automatyzację sieci"]]
+    assert engine.fuzzy_search("kubernetes") == (0, [])
+
+
+def test_find_collaborators_falls_back_to_fuzzy_only_without_exact_hits(backend):
+    backend(PEOPLE)
+
+    async def scenario():
+        return await server.find_collaborators("python"), await server.find_collaborators("pyhton")
+
+    exact, typo = asyncio.run(scenario())
+    assert exact["fuzzy"] is False
+    assert typo["fuzzy"] is True
+    assert [r["id"] for r in typo["results"]] == [r["id"] for r in exact["results"]]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import health
+import server
+from conftest import profile, record_round_trips
+from health import HealthProbe
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(health.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_results_are_cached_for_the_ttl(clock):
+    probe = HealthProbe(ttl=5)
+    counts = iter([10, 11])
+
+    first = probe.measure(lambda method: next(counts))
+    clock[0] += 4
+    second = probe.measure(lambda method: pytest.fail("should be cached"))
+    clock[0] += 2
+    third = probe.measure(lambda method: next(counts))
+
+    assert (first["profiles_count"], first["cached"]) == (10, False)
+    assert (second["profiles_count"], second["cached"], second["age_seconds"]) == (10, True, 4)
+    assert (third["profiles_count"], third["cached"]) == (11, False)
+
+
+def test_failures_are_cached_too(clock):
+    probe = HealthProbe(ttl=5)
+
+    def down(method):
+        raise ConnectionError("database unreachable")
+
+    failed = probe.measure(down)
+    again = asyncio.run(probe.measure_async(lambda method: pytest.fail("should be cached")))
+
+    assert failed["ok"] is False and failed["error"] == "database unreachable"
+    assert again["ok"] is False and again["cached"]
+
+
+def test_unknown_count_method_falls_back_to_estimated():
+    assert HealthProbe(count_method="everything").count_method == "estimated"
+
+
+def test_db_status_counts_without_fetching_rows(backend, monkeypatch):
+    backend([profile(f"p{i}") for i in range(3)])
+    monkeypatch.setattr(server, "SUPABASE_URL", "http://postgrest.test")
+    monkeypatch.setattr(server, "SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(server, "_health_probe", HealthProbe(ttl=60, count_method="exact"))
+    calls = record_round_trips()
+
+    async def scenario():
+        return await server.db_status(), await server.db_status()
+
+    first, second = asyncio.run(scenario())
+
+    assert first["connected"] and first["profiles_count"] == 3 and not first["cached"]
+    assert second["cached"]
+    assert calls == [("HEAD", "/profiles")]
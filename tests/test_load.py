@@ -0,0 +1,94 @@
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+
+import server
+from bench.corpus import Corpus
+from bench.load import MIX, McpError, McpSession, Recorder, Workload, _action, parse_mix
+from conftest import PEOPLE
+
+
+def test_recorder_separates_tool_errors_from_failures():
+    recorder = Recorder()
+    recorder.record("find_collaborators", 0.01)
+    recorder.record("send_connection_request", 0.02, ok=False)
+    recorder.record("get_profile", 5.0, failure="HTTP 502")
+
+    assert recorder.latencies == {"find_collaborators": [0.01], "send_connection_request": [0.02]}
+    assert recorder.errors == {"send_connection_request": 1}
+    assert recorder.failures == {"get_profile": 1} and recorder.failure_kinds == {"HTTP 502": 1}
+    assert recorder.tick() == ([0.01, 0.02], 2)
+    assert recorder.tick() == ([], 0)
+
+
+def test_parse_mix():
+    assert parse_mix("find_collaborators=60, register_profile=5") == {"find_collaborators": 60.0,
+                                                                      "register_profile": 5.0}
+    with pytest.raises(ValueError, match="unknown action 'delete_everything'"):
+        parse_mix("delete_everything=1")
+
+
+def _session(handler) -> McpSession:
+    return McpSession(httpx.AsyncClient(transport=httpx.MockTransport(handler)), "http://mcp.test/mcp")
+
+
+def test_session_reads_event_stream_replies_and_keeps_the_session_id():
+    seen = []
+
+    def handler(request):
+        message = json.loads(request.content)
+        seen.append((message.get("method"), request.headers.get("mcp-session-id")))
+        if "id" not in message:
+            return httpx.Response(202)
+        result = {"structuredContent": {"error": "already pending"}} if message["method"] == "tools/call" else {}
+        events = [{"jsonrpc": "2.0", "method": "notifications/message", "params": {}},
+                  {"jsonrpc": "2.0", "id": message["id"], "result": result}]
+        body = "".join(f"event: message\ndata: {json.dumps(e)}\n\n" for e in events)
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream", "mcp-session-id": "s1"})
+
+    async def scenario():
+        session = _session(handler)
+        await session.open()
+        return await session.call_tool("send_connection_request", {})
+
+    assert asyncio.run(scenario()) == (False, {"error": "already pending"})
+    assert seen == [("initialize", None), ("notifications/initialized", "s1"), ("tools/call", "s1")]
+
+
+@pytest.mark.parametrize("response, message", [
+    (httpx.Response(503), "HTTP 503"),
+    (httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "bad params"}}),
+     "bad params"),
+    (httpx.Response(200, json={"jsonrpc": "2.0", "id": 99, "result": {}}), "no response"),
+])
+def test_protocol_failures_raise_mcp_error(response, message):
+    with pytest.raises(McpError, match=message):
+        asyncio.run(_session(lambda request: response).call_tool("find_collaborators", {}))
+
+
+def test_every_action_runs_against_the_real_server(backend):
+    backend(PEOPLE)
+    app = server.mcp.http_app()
+    workload = Workload(Corpus(1), 6, MIX, run_id="t")
+    # The corpus IDs do not exist in the test database; act as its people instead
+    ids = [p["id"] for p in PEOPLE]
+    workload.user = lambda rng: rng.choice(ids)
+    workload.recipients = ids
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            http = httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://mcp.test")
+            session, recorder = McpSession(http, "http://mcp.test/mcp"), Recorder()
+            await session.open()
+            rng = random.Random(0)
+            for step, action in enumerate(MIX):
+                await _action(action, session, recorder, workload, rng, "anna", step)
+            await session.close()
+            return recorder
+
+    recorder = asyncio.run(scenario())
+    assert recorder.failures == {}
+    assert set(MIX) - {"respond_to_request"} <= set(recorder.latencies)
@@ -0,0 +1,111 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+from conftest import PEOPLE, baseline_search, profile
+from matching import MatchEngine, ProfileRecord, top_k
+from profile_cache import ProfileCache
+
+QUERIES = ["python", "Python consulting", "marketing", "code", "saas", "dev", "co-founder", "er"]
+
+
+def _summary(matches):
+    return [(m["profile"]["id"], m["score"], m["reasons"]) for m in matches]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_scores_like_the_original_scan(query):
+    engine = MatchEngine(PEOPLE)
+    expected = baseline_search(PEOPLE, query)
+
+    found, matches = engine.search(query)
+    assert found == len(expected)
+    assert _summary(matches) == expected
+    assert _summary(engine.search(query, 2)[1]) == expected[:2]
+
+
+def test_search_folds_case_and_diacritics_both_ways():
+    engine = MatchEngine([profile("ola", skills=["Automatyzacja sieci"], industry=["Łódź startups"])])
+
+    assert _summary(engine.search("LODZ")[1]) == [("ola", 1, ["Industry: Łódź startups"])]
+    assert engine.search("automatyzacja")[0] == 1
+    assert MatchEngine([profile("jan", skills=["lodz"])]).search("Łódź")[0] == 1
+
+
+def test_top_k_orders_by_score_then_index():
+    scores = np.array([1.0, 3.0, 3.0, 2.0, 3.0])
+    candidates = np.arange(5)
+
+    assert top_k(scores, candidates, 2).tolist() == [1, 2]
+    assert top_k(scores, candidates).tolist() == [1, 2, 4, 3, 0]
+    assert top_k(scores, candidates, 0).tolist() == []
+
+
+def test_upsert_replaces_and_remove_drops_a_profile():
+    engine = MatchEngine(PEOPLE)
+    engine.upsert(profile("anna", skills=["Rust"]))
+    engine.remove("bob")
+
+    assert [m["profile"]["id"] for m in engine.search("rust")[1]] == ["anna"]
+    assert "anna" not in [m["profile"]["id"] for m in engine.search("django")[1]]
+    assert "bob" not in [m["profile"]["id"] for m in engine.search("marketing")[1]]
+    assert len(engine) == len(PEOPLE) - 1
+
+
+def test_engine_is_kept_while_reloads_bring_the_same_rows(backend, monkeypatch):
+    store = backend(PEOPLE)
+    # TTL 0: every call reloads the list from the database
+    monkeypatch.setattr(server, "_profile_cache", ProfileCache(ttl=0, list_item=ProfileRecord.from_row))
+
+    async def scenario():
+        first = await server.get_match_engine()
+        again = await server.get_match_engine()
+        assert again is first and server._engine_rebuild is None
+
+        store.tables["profiles"].rows["ewa"]["skills"] = ["Rust"]
+        # The current engine keeps serving while the new one is built
+        assert await server.get_match_engine() is first
+        await server._engine_rebuild
+        rebuilt = await server.get_match_engine()
+        assert rebuilt is not first
+        return rebuilt.search("rust")[0], first.search("rust")[0]
+
+    assert asyncio.run(scenario()) == (1, 0)
+
+
+def test_writes_during_a_rebuild_reach_the_new_engine(backend, monkeypatch):
+    store = backend(PEOPLE)
+    monkeypatch.setattr(server, "_profile_cache", ProfileCache(ttl=0, list_item=ProfileRecord.from_row))
+
+    async def scenario():
+        await server.get_match_engine()
+        store.tables["profiles"].rows["ewa"]["skills"] = ["Rust"]
+        await server.get_match_engine()
+        server._profile_written(profile("zoe", skills=["Elixir"]))
+        await server._engine_rebuild
+        return (await server.get_match_engine()).search("elixir")[0]
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_writes_leave_compaction_to_a_background_rebuild(backend):
+    backend(PEOPLE)
+
+    async def scenario():
+        engine = await server.get_match_engine()
+        for version in range(600):
+            server._profile_written(profile("anna", skills=[f"Python {version}", "Django"]))
+        # The writes did not rebuild inline; the next read schedules it
+        assert server._match_engine is engine and engine.needs_compaction
+        assert await server.get_match_engine() is engine
+        server._profile_written(profile("zoe", skills=["Elixir"]))
+        await server._engine_rebuild
+        return engine, await server.get_match_engine()
+
+    engine, compacted = asyncio.run(scenario())
+    assert compacted is not engine and not compacted.needs_compaction
+    assert [m["profile"].id for m in compacted.search("python 599")[1]] == ["anna"]
+    assert compacted.search("python 598")[0] == 0
+    assert compacted.search("elixir")[0] == 1
@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import Client
+
+import server
+from conftest import PEOPLE
+from metrics import Registry, ToolMetrics
+
+
+def test_counters_and_histograms_render_as_prometheus_text():
+    registry = Registry()
+    registry.counter("calls_total", "Calls.")
+    registry.histogram("latency_seconds", "Latency.", (0.1, 1.0))
+    registry.inc("calls_total", {"tool": 'say "hi"\n'})
+    registry.inc("calls_total", {"tool": 'say "hi"\n'}, 2)
+    for value in (0.05, 0.5, 5):
+        registry.observe("latency_seconds", {"tool": "a"}, value)
+    registry.collector(lambda: [("up", "Up.", {}, 1), ("lag", "Lag.", {}, None)])
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{tool="say \\"hi\\"\\n"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{tool="a",le="0.1"} 1',
+        'latency_seconds_bucket{tool="a",le="1"} 2',
+        'latency_seconds_bucket{tool="a",le="+Inf"} 3',
+        'latency_seconds_sum{tool="a"} 5.55',
+        'latency_seconds_count{tool="a"} 3',
+        "# HELP up Up.",
+        "# TYPE up gauge",
+        "up 1",
+    ]
+
+
+@pytest.fixture
+def registry(backend, monkeypatch):
+    """Fresh metrics for server.py, fed by the test database's round trips."""
+    backend(PEOPLE)
+    fresh = ToolMetrics(Registry()).registry
+    monkeypatch.setattr(server._tool_metrics, "registry", fresh)
+    server.get_supabase().add_listener(server._tool_metrics.on_round_trip)
+    return fresh
+
+
+def _samples(text: str) -> dict:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if line and not line.startswith("#"))
+
+
+def test_tool_calls_record_latency_errors_and_round_trips(registry):
+    async def scenario():
+        async with Client(server.mcp) as client:
+            await client.call_tool("find_collaborators", {"query": "python"})
+            await client.call_tool("get_profile", {"profile_id": "anna"})
+            await client.call_tool("find_collaborators", {"query": "python", "mode": "exact"})
+
+    asyncio.run(scenario())
+    samples = _samples(registry.render())
+
+    assert samples['backroom_tool_calls_total{tool="find_collaborators"}'] == "2"
+    assert samples['backroom_tool_errors_total{tool="find_collaborators"}'] == "1"
+    assert samples['backroom_tool_db_round_trips_count{tool="get_profile"}'] == "1"
+    assert samples['backroom_tool_db_round_trips_sum{tool="get_profile"}'] == "1"
+    assert samples['backroom_db_requests_total{table="profiles",method="GET"}'] == "2"
+
+
+def _scrape(headers=None) -> httpx.Response:
+    async def get():
+        transport = httpx.ASGITransport(server.mcp.http_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp.test") as client:
+            return await client.get("/metrics", headers=headers)
+
+    return asyncio.run(get())
+
+
+def test_metrics_endpoint_serves_gauges(registry):
+    response = _scrape()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "backroom_db_circuit_open 0" in response.text.splitlines()
+
+
+def test_metrics_endpoint_checks_the_token(registry, monkeypatch):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "secret")
+
+    assert _scrape().status_code == 401
+    assert _scrape({"Authorization": "Bearer secret"}).status_code == 200
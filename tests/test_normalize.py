@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+import server
+from backfill_search_keys import backfill
+from conftest import profile
+from matching import MatchEngine
+from normalize import field_keys, normalize_key, search_keys
+
+
+@pytest.mark.parametrize("text, key", [
+    ("  K8s  ", "kubernetes"),
+    ("Kubernetes", "kubernetes"),
+    ("Łódź   startups", "lodz startups"),
+    ("Node.js and ReactJS", "node.js and react"),
+    ("C++ / C#", "c++ / c#"),
+    ("py.", "python."),
+    ("Cofounder", "co-founder"),
+    ("", ""),
+])
+def test_normalize_key(text, key):
+    assert normalize_key(text) == key
+
+
+def test_search_keys_are_prefixed_by_field_in_stored_order():
+    row = profile("a", role="ML Engineer", skills=["Py", "K8s"], offers=["Code review"])
+
+    assert search_keys(row) == ["offers:code review", "skills:python", "skills:kubernetes",
+                                "role:machine learning engineer"]
+
+
+def test_field_keys_trust_stored_keys_only_while_they_line_up():
+    row = profile("a", skills=["Python", "Go"], offers=["Audits"],
+                  search_keys=["skills:stored python", "skills:stored go", "offers:a:b"])
+    keys = field_keys(row)
+
+    assert keys["skills"] == ["stored python", "stored go"]
+    assert keys["offers"] == ["a:b"]
+    # A value added outside the server: recompute that field
+    keys = field_keys({**row, "skills": ["Python", "Go", "Rust"]})
+    assert keys["skills"] == ["python", "go", "rust"]
+
+
+def test_aliases_and_diacritics_match_both_ways():
+    engine = MatchEngine([profile("a", skills=["Kubernetes"]), profile("b", skills=["k8s"]),
+                          profile("c", industry=["Łódź"])])
+
+    assert {m["profile"]["id"] for m in engine.search("K8S")[1]} == {"a", "b"}
+    assert {m["profile"]["id"] for m in engine.search("kubernetes")[1]} == {"a", "b"}
+    assert [m["profile"]["id"] for m in engine.search("lodz")[1]] == ["c"]
+
+
+def test_short_queries_keep_their_substring_matches():
+    engine = MatchEngine([profile("a", skills=["Node.js", "Vue.js"]), profile("b", skills=["NumPy"]),
+                          profile("c", skills=["JavaScript"])])
+
+    # "js" is also an alias of javascript; both readings are searched
+    assert [(m["profile"]["id"], m["score"], m["reasons"]) for m in engine.search("js")[1]] == [
+        ("a", 4, ["Skill: Node.js", "Skill: Vue.js"]), ("c", 2, ["Skill: JavaScript"])]
+    assert [m["profile"]["id"] for m in engine.search("py")[1]] == ["b"]
+    assert [m["profile"]["id"] for m in engine.search("vue.js")[1]] == ["a"]
+
+
+def test_writes_store_search_keys(backend, monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_KEYS", True)
+    store = backend()
+
+    async def scenario():
+        await server.register_profile(name="Ola", role="Developer", skills="Py, K8s", offers="Audits", seeks="")
+        await server.update_my_profile("ola", skills="Go")
+
+    asyncio.run(scenario())
+    assert store.tables["profiles"].rows["ola"]["search_keys"] == ["offers:audits", "skills:go", "role:developer"]
+
+
+def test_backfill_updates_only_stale_rows(backend):
+    store = backend([
+        profile("a", skills=["K8s"]),
+        profile("b", skills=["Go"], search_keys=["skills:go"]),
+        profile("c", skills=["Py"], search_keys=["skills:py"]),
+    ])
+    rows = store.tables["profiles"].rows
+
+    dry = asyncio.run(backfill(server.get_supabase(), dry_run=True))
+    assert dry == {"scanned": 3, "updated": 2} and "search_keys" not in rows["a"]
+
+    assert asyncio.run(backfill(server.get_supabase())) == {"scanned": 3, "updated": 2}
+    assert rows["a"]["search_keys"] == ["skills:kubernetes"]
+    assert rows["c"]["search_keys"] == ["skills:python"]
+    assert asyncio.run(backfill(server.get_supabase()))["updated"] == 0
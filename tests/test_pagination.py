@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+import server
+from conftest import profile
+from pagination import MAX_PAGE_SIZE, clamp_page_size, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("value", ["anna", "żółw/ü+?", 42, ["a", 1], {"after": "x"}, None])
+def test_cursor_round_trips(value):
+    cursor = encode_cursor(value)
+
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == value
+
+
+def test_empty_cursor_means_first_page():
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", encode_cursor(7)])
+def test_bad_keyset_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, str)
+
+
+@pytest.mark.parametrize("requested, size", [(0, 50), (-3, 50), (None, 50), (10, 10), (10_000, MAX_PAGE_SIZE)])
+def test_page_sizes_are_clamped(requested, size):
+    assert clamp_page_size(requested) == size
+
+
+def test_list_profiles_walks_every_profile_once(backend):
+    ids = [f"user{i:02d}" for i in range(7)]
+    backend([profile(i) for i in reversed(ids)])
+
+    async def walk():
+        pages, cursor = [], ""
+        while cursor is not None:
+            page = await server.list_profiles(page_size=3, cursor=cursor)
+            pages.append([p["id"] for p in page["profiles"]])
+            cursor = page["next_cursor"]
+        return pages
+
+    assert asyncio.run(walk()) == [ids[0:3], ids[3:6], ids[6:7]]
+
+
+def test_exactly_full_last_page_has_no_next_cursor(backend):
+    backend([profile("a"), profile("b")])
+
+    page = asyncio.run(server.list_profiles(page_size=2))
+    assert page["count"] == 2 and page["next_cursor"] is None
+
+
+def test_list_profiles_reports_invalid_cursors(backend):
+    backend([profile("a")])
+
+    result = asyncio.run(server.list_profiles(cursor=encode_cursor(5)))
+    assert result["error"].startswith("Invalid cursor")
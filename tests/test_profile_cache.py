@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+import profile_cache
+import server
+from conftest import profile
+from profile_cache import ProfileCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the cache."""
+    now = [1000.0]
+    monkeypatch.setattr(profile_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_full_list_is_loaded_once_per_ttl(clock):
+    cache = ProfileCache(ttl=30)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [{"id": "a"}]
+
+    assert cache.get_all(loader) == [{"id": "a"}]
+    clock[0] += 29
+    cache.get_all(loader)
+    assert len(loads) == 1
+    clock[0] += 2
+    cache.get_all(loader)
+    assert len(loads) == 2
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = ProfileCache(ttl=30, max_entries=2)
+    cache.get("a", lambda i: {"id": i})
+    cache.get("b", lambda i: {"id": i})
+    cache.get("a", lambda i: pytest.fail("a should be cached"))
+    cache.get("c", lambda i: {"id": i})
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stale("b") is None
+    assert cache.stale("a") == {"id": "a"}
+
+
+def test_put_patches_the_cached_list_copy_on_write(clock):
+    cache = ProfileCache(ttl=30)
+    before = cache.get_all(lambda: [{"id": "a", "name": "Old"}])
+    cache.put({"id": "a", "name": "New"})
+    cache.put({"id": "b", "name": "Added"})
+
+    assert before == [{"id": "a", "name": "Old"}]
+    assert cache.get_all(lambda: pytest.fail("list should be cached")) == [
+        {"id": "a", "name": "New"}, {"id": "b", "name": "Added"}
+    ]
+    assert cache.get("a", lambda i: pytest.fail("row should be cached")) == {"id": "a", "name": "New"}
+
+
+def test_invalidate_drops_the_profile_and_the_list(clock):
+    cache = ProfileCache(ttl=30)
+    cache.get_all(lambda: [{"id": "a"}])
+    cache.get("a", lambda i: {"id": i})
+    cache.invalidate("a")
+
+    assert cache.get("a", lambda i: None) is None
+    assert cache.get_all(lambda: []) == []
+
+
+def test_expired_entries_remain_available_as_stale(clock):
+    cache = ProfileCache(ttl=30)
+    cache.get_all(lambda: [{"id": "a"}])
+    clock[0] += 60
+
+    assert cache.stale_all() == [{"id": "a"}]
+
+
+def test_generation_changes_only_when_a_reload_brings_different_rows(clock):
+    cache = ProfileCache(ttl=30)
+    rows = [{"id": "a", "name": "A"}]
+    first = cache.get_all(lambda: rows)
+    assert cache.generation == 1
+
+    clock[0] += 31
+    reloaded = cache.get_all(lambda: [{"id": "a", "name": "A"}])
+    assert cache.generation == 1
+    assert reloaded is first
+
+    clock[0] += 31
+    cache.get_all(lambda: [{"id": "a", "name": "Renamed"}])
+    assert cache.generation == 2
+
+
+def test_get_profile_is_served_from_the_cache(backend):
+    store = backend([profile("anna", name="Anna")])
+
+    first = asyncio.run(server.get_profile("anna"))
+    requests = store.requests
+    second = asyncio.run(server.get_profile("anna"))
+
+    assert first["found"] and second["profile"]["name"] == "Anna"
+    assert store.requests == requests
+
+
+def test_registered_profile_is_searchable_without_waiting_for_the_ttl(backend):
+    backend([profile("anna", skills=["Python"])])
+
+    async def scenario():
+        await server.find_collaborators("python")
+        await server.register_profile(name="Bob", role="Designer", skills="Figma", offers="UX audits", seeks="Clients")
+        return await server.find_collaborators("figma")
+
+    result = asyncio.run(scenario())
+    assert [r["id"] for r in result["results"]] == ["bob"]
@@ -0,0 +1,65 @@
+import asyncio
+
+import server
+from conftest import connection_request, profile, record_round_trips
+from profile_loader import ProfileLoader
+
+
+class _Fetcher:
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.batches = []
+
+    async def __call__(self, ids, columns):
+        self.batches.append((list(ids), columns))
+        return [self.rows[i] for i in ids if i in self.rows]
+
+
+def test_pending_ids_are_fetched_in_one_batch_and_memoized():
+    fetch = _Fetcher([{"id": "a"}, {"id": "b"}])
+    loader = ProfileLoader(fetch, "name")
+
+    async def scenario():
+        loader.prime("a", "b", "missing")
+        first = await loader.load_many(["a", "b", "missing"])
+        await loader.load("a")
+        await loader.load("missing")
+        return first
+
+    assert asyncio.run(scenario()) == {"a": {"id": "a"}, "b": {"id": "b"}, "missing": None}
+    assert fetch.batches == [(["a", "b", "missing"], "id, name")]
+
+
+def test_batches_are_capped():
+    fetch = _Fetcher([])
+    loader = ProfileLoader(fetch, max_batch_size=2)
+    asyncio.run(loader.load_many(["a", "b", "c", "a"]))
+
+    assert [ids for ids, _ in fetch.batches] == [["a", "b"], ["c"]]
+    assert loader.round_trips == 2
+
+
+def test_incoming_requests_resolve_all_senders_in_one_query(backend):
+    senders = [profile(f"s{i}", name=f"Sender {i}", role="Dev") for i in range(5)]
+    backend([profile("me"), *senders], [connection_request(f"r{i}", f"s{i}", "me") for i in range(5)])
+    calls = record_round_trips()
+
+    result = asyncio.run(server.check_incoming_requests("me"))
+
+    assert result["pending_requests"] == 5
+    assert [r["from_user"]["name"] for r in result["requests"]] == [f"Sender {i}" for i in range(5)]
+    assert calls == [("GET", "/connection_requests"), ("GET", "/profiles")]
+
+
+def test_sent_requests_resolve_all_recipients_in_one_query(backend):
+    recipients = [profile(f"t{i}", name=f"To {i}") for i in range(4)]
+    requests = [connection_request("r0", "me", "t0"), connection_request("r1", "me", "t1", "accepted"),
+                connection_request("r2", "me", "t2", "declined"), connection_request("r3", "me", "gone")]
+    backend([profile("me"), *recipients], requests)
+    calls = record_round_trips()
+
+    result = asyncio.run(server.check_my_sent_requests("me"))
+
+    assert result["summary"] == {"pending": 2, "accepted": 1, "declined": 1}
+    assert [r["to_user"]["name"] for r in result["requests"]] == ["To 0", "To 1", "To 2", "gone"]
+    assert calls == [("GET", "/connection_requests"), ("GET", "/profiles")]
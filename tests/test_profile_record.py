@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+
+import server
+from conftest import PEOPLE, baseline_search, profile
+from matching import SEARCH_COLUMNS, MatchEngine, ProfileRecord
+
+
+def test_records_mirror_the_row_they_came_from():
+    row = profile("anna", role="Developer", skills=["Python"], email="anna@example.com", bio="Hi")
+    record = ProfileRecord.from_row(row)
+
+    assert record.get("skills") == ("Python",)
+    assert record.get("role") == "Developer" and record.get("bio") == "Hi"
+    # Only search columns are kept
+    assert record.get("email") is None and record.get("email", "-") == "-"
+    assert record == ProfileRecord.from_row(dict(row))
+    assert record != ProfileRecord.from_row({**row, "skills": ["Rust"]})
+
+
+def test_repeated_values_share_one_string():
+    first = ProfileRecord.from_row(profile("a", skills=["".join(["Pyth", "on"])]))
+    second = ProfileRecord.from_row(profile("b", skills=["".join(["Py", "thon"])]))
+
+    assert first.skills[0] is second.skills[0]
+
+
+def test_profile_list_loads_only_search_columns(backend):
+    backend(PEOPLE)
+    params = []
+    server.get_supabase().add_listener(lambda trip: params.append(dict(trip["params"] or [])))
+
+    asyncio.run(server.find_collaborators("python"))
+
+    assert params[0]["select"] == SEARCH_COLUMNS
+    assert isinstance(server._match_engine._profiles[0], ProfileRecord)
+
+
+def test_upsert_many_keeps_the_last_version_of_each_profile():
+    engine = MatchEngine(PEOPLE)
+    engine.upsert_many([profile("anna", skills=["Go"]), profile("zoe", skills=["Go"]), profile("anna", skills=["Rust"])])
+
+    assert [m["profile"]["id"] for m in engine.search("rust")[1]] == ["anna"]
+    assert [m["profile"]["id"] for m in engine.search("go")[1]] == ["zoe"]
+    assert len(engine) == len(PEOPLE) + 1
+
+
+def test_growing_past_the_entry_buffers_keeps_every_entry():
+    engine = MatchEngine(PEOPLE)
+    extra = [profile(f"dev{i:04d}", skills=["Python", f"Skill {i}"]) for i in range(1500)]
+    for p in extra[:10]:
+        engine.upsert(p)
+    engine.upsert_many(extra[10:])
+
+    corpus = PEOPLE + extra
+    assert len(engine._buffers[0]) >= len(engine._reasons)
+    found, matches = engine.search("python")
+    assert found == len(baseline_search(corpus, "python"))
+    assert [m["profile"]["id"] for m in engine.search("skill 1499")[1]] == ["dev1499"]
+
+
+def test_category_postings_stay_sorted_and_unique_across_updates():
+    engine = MatchEngine([profile(f"p{i}", industry=["SaaS"]) for i in range(0, 20, 2)])
+    engine.upsert_many([profile(f"p{i}", industry=["SaaS"]) for i in range(19, 0, -2)])
+    engine.upsert(profile("p4", industry=["SaaS"]))
+
+    for slots in engine._postings["industry"].values():
+        assert np.all(np.diff(slots.astype(np.int64)) > 0)
+    assert engine.filter_profiles([[(False, "industry", "saas")]])[0] == 20
+
+
+def test_compaction_after_many_rewrites_keeps_results():
+    engine = MatchEngine(PEOPLE)
+    for version in range(600):
+        # Three entries per batch
+        engine.upsert_many([profile("anna", skills=[f"Python {version}", "Django"]),
+                            profile("bob", offers=["Marketing audits"])])
+
+    # Writes only mark entries dead; the owner rebuilds off the request path
+    assert engine.needs_compaction
+    assert [m["profile"]["id"] for m in engine.search("python 599")[1]] == ["anna"]
+
+    compacted = MatchEngine(engine.live_profiles(), previous=engine)
+    assert not compacted.needs_compaction
+    assert len(compacted._reasons) < 600 * 3
+    assert [m["profile"]["id"] for m in compacted.search("python 599")[1]] == ["anna"]
+    assert compacted.search("python 598")[0] == 0
+    assert {m["profile"]["id"] for m in compacted.search("marketing")[1]} == {"bob"}
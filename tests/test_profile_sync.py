@@ -0,0 +1,122 @@
+import asyncio
+
+import profile_sync
+import server
+from conftest import profile
+from matching import ProfileRecord
+from profile_sync import ProfileReplica, sync_once, sync_once_async
+
+
+class _Table:
+    """Rows plus the two paged fetchers profile_sync expects."""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.since = []
+
+    def fetch_changes(self, since, offset, limit):
+        self.since.append(since)
+        rows = sorted((r for r in self.rows.values() if since is None or r["updated_at"] >= since),
+                      key=lambda r: (r["updated_at"], r["id"]))
+        return rows[offset:offset + limit]
+
+    def fetch_ids(self, offset, limit):
+        return [{"id": i} for i in sorted(self.rows)][offset:offset + limit]
+
+
+def _row(profile_id, updated_at, **fields):
+    return {"id": profile_id, "updated_at": updated_at, **fields}
+
+
+def test_first_sync_loads_everything_then_polls_from_the_watermark():
+    table = _Table([_row("a", "2025-06-01T10:00:00+00:00"), _row("b", "2025-06-01T11:00:00+00:00")])
+    replica = ProfileReplica(overlap_seconds=5)
+
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+    assert replica.ready and replica.generation == 1 and len(replica) == 2
+    assert replica.watermark == "2025-06-01T11:00:00+00:00"
+
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+    assert table.since == [None, "2025-06-01T10:59:55+00:00"]
+
+
+def test_listeners_get_only_rows_that_changed():
+    table = _Table([_row("a", "2025-06-01T10:00:00+00:00", name="A"), _row("b", "2025-06-01T10:00:00+00:00")])
+    replica = ProfileReplica()
+    changes = []
+    replica.subscribe(lambda rows, deleted: changes.append(([r["id"] for r in rows], deleted)))
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+
+    table.rows["a"] = _row("a", "2025-06-01T10:00:01+00:00", name="Renamed")
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+
+    # The initial load bumps the generation instead; the overlap re-fetch of b is a no-op
+    assert changes == [(["a"], [])]
+    assert replica.get("a")["name"] == "Renamed"
+    assert replica.generation == 1
+
+
+def test_reconcile_drops_deleted_rows():
+    table = _Table([_row("a", "2025-06-01T10:00:00+00:00"), _row("b", "2025-06-01T10:00:00+00:00")])
+    replica = ProfileReplica()
+    changes = []
+    replica.subscribe(lambda rows, deleted: changes.append(deleted))
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+
+    del table.rows["b"]
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=300)
+    assert len(replica) == 2  # reconcile not due yet
+
+    sync_once(replica, table.fetch_changes, table.fetch_ids, reconcile_interval=0)
+    assert [r["id"] for r in replica.snapshot()] == ["a"]
+    assert changes == [["b"]]
+    assert replica.stats()["rows_deleted"] == 1
+
+
+def test_local_writes_do_not_move_the_watermark():
+    replica = ProfileReplica()
+    replica.load([_row("a", "2025-06-01T10:00:00+00:00")])
+
+    replica.apply_changes([_row("b", "2025-06-02T00:00:00+00:00")], from_database=False)
+
+    assert replica.watermark == "2025-06-01T10:00:00+00:00"
+    assert len(replica) == 2
+
+
+def test_async_sync_pages_through_large_results(monkeypatch):
+    monkeypatch.setattr(profile_sync, "PAGE_SIZE", 2)
+    table = _Table([_row(f"p{i}", f"2025-06-01T10:00:0{i}+00:00") for i in range(5)])
+
+    async def fetch_changes(since, offset, limit):
+        return table.fetch_changes(since, offset, limit)
+
+    async def fetch_ids(offset, limit):
+        return table.fetch_ids(offset, limit)
+
+    replica = ProfileReplica()
+    asyncio.run(sync_once_async(replica, fetch_changes, fetch_ids, reconcile_interval=300))
+
+    assert [r["id"] for r in replica.snapshot()] == [f"p{i}" for i in range(5)]
+    assert table.since == [None, None, None]
+
+
+def test_server_searches_follow_the_replica(backend, monkeypatch):
+    store = backend([profile("anna", skills=["Python"], updated_at="2025-06-01T10:00:00+00:00")])
+    replica = ProfileReplica(transform=ProfileRecord.from_row)
+    replica.subscribe(server._apply_profile_changes)
+    monkeypatch.setattr(server, "_replica", replica)
+
+    async def sync():
+        await sync_once_async(replica, server._fetch_profile_changes, server._fetch_profile_ids, 300)
+
+    async def scenario():
+        await sync()
+        before = await server.find_collaborators("rust")
+        profiles = store.tables["profiles"]
+        store.update(profiles, [profiles.rows["anna"]], {"skills": ["Rust"]})
+        await sync()
+        return before, await server.find_collaborators("rust")
+
+    before, after = asyncio.run(scenario())
+    assert before["results"] == []
+    assert [r["id"] for r in after["results"]] == ["anna"]
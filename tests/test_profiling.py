@@ -0,0 +1,78 @@
+import asyncio
+import pstats
+import time
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from profiling import Profiler, ProfilingMiddleware
+
+
+def _busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_disabled_profiler_leaves_functions_alone(tmp_path):
+    assert Profiler("", directory=str(tmp_path / "off")).wrap(_busy) is _busy
+    assert Profiler("cprofile", rate=0, directory=str(tmp_path / "off")).wrap(_busy) is _busy
+    assert not (tmp_path / "off").exists()
+
+
+def test_unknown_modes_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown profiler mode 'perf'"):
+        Profiler("perf", directory=str(tmp_path))
+
+
+def test_cprofile_merges_calls_into_one_pstats_file_per_name(tmp_path):
+    profiler = Profiler("cprofile", rate=1, directory=str(tmp_path))
+    find = profiler.wrap(_busy, "find matches")
+
+    find(0.001)
+    find(0.001)
+
+    stats = pstats.Stats(str(tmp_path / "find_matches.pstats"))
+    calls = {func[2]: counts[1] for func, counts in stats.stats.items()}
+    assert calls["_busy"] == 2
+    assert profiler.stats()["profiled"] == 2
+
+
+def test_only_one_call_is_cprofiled_at_a_time(tmp_path):
+    profiler = Profiler("cprofile", rate=1, directory=str(tmp_path))
+
+    with profiler.profile("outer"), profiler.profile("inner"):
+        pass
+
+    assert (profiler.profiled, profiler.skipped) == (1, 1)
+    assert [p.name for p in tmp_path.iterdir()] == ["outer.pstats"]
+
+
+def test_sampling_writes_stacks_cropped_to_the_profiled_call(tmp_path):
+    profiler = Profiler("sampling", rate=1, directory=str(tmp_path), interval=0.001)
+
+    profiler.wrap(_busy)(0.05)
+
+    lines = (tmp_path / "_busy.collapsed").read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("Profiler.wrap.<locals>.profiled (profiling.py:") and int(count) > 0
+    assert any(";_busy (test_profiling.py:" in line for line in lines)
+
+
+def test_middleware_profiles_tool_calls(tmp_path):
+    profiler = Profiler("cprofile", rate=1, directory=str(tmp_path))
+    app = FastMCP("test")
+    app.add_middleware(ProfilingMiddleware(profiler))
+
+    @app.tool
+    def search(query: str) -> str:
+        return query.upper()
+
+    async def scenario():
+        async with Client(app) as client:
+            await client.call_tool("search", {"query": "python"})
+
+    asyncio.run(scenario())
+    assert (tmp_path / "search.pstats").exists()
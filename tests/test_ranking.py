@@ -0,0 +1,79 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+from conftest import PEOPLE, profile
+from matching import MatchEngine
+from ranking import BM25Index, tokenize
+
+
+def test_tokenize_drops_stopwords_and_joins_hyphens():
+    assert tokenize("Seeking a Co-Founder for the e-commerce shop") == ["seeking", "cofounder", "ecommerce", "shop"]
+    assert tokenize("szukam kogoś do automatyzacji") == ["szukam", "kogoś", "automatyzacji"]
+
+
+def test_field_boosts_rank_offers_above_bio():
+    index = BM25Index()
+    index.add(0, profile("bio", bio="I once tried python"))
+    index.add(1, profile("offers", offers=["Python"]))
+
+    scores = index.scores(["python"], 2)
+    assert scores[1] > scores[0] > 0
+
+
+def test_rare_terms_weigh_more_than_common_ones():
+    index = BM25Index()
+    for slot in range(5):
+        index.add(slot, profile(f"p{slot}", skills=["Python"]))
+    index.add(5, profile("p5", skills=["Haskell"]))
+
+    scores = index.scores(["python", "haskell"], 6)
+    assert scores[5] > scores[0] > 0
+
+
+def test_re_adding_and_removing_a_slot_updates_its_postings():
+    index = BM25Index()
+    index.add(0, profile("a", skills=["Python"]))
+    index.add(1, profile("b", skills=["Python"]))
+    index.scores(["python"], 2)  # builds the cached posting arrays
+    index.add(0, profile("a", skills=["Rust"]))
+    index.remove(1)
+
+    assert index.scores(["python"], 2).tolist() == [0.0, 0.0]
+    assert np.flatnonzero(index.scores(["rust"], 2)).tolist() == [0]
+    assert len(index) == 1
+
+
+def test_rank_matches_any_query_word_best_first():
+    engine = MatchEngine(PEOPLE)
+
+    found, results = engine.rank("seeking python code reviews")
+
+    ids = [r["profile"]["id"] for r in results]
+    assert found == len(ids) and ids[0] == "anna"
+    assert {"bob", "cara", "dan", "filip"} <= set(ids) and "ewa" not in ids
+    assert "Offers: Code reviews" in results[0]["reasons"]
+    assert results == sorted(results, key=lambda r: -r["score"])
+
+
+def test_rank_ignores_stopword_only_queries():
+    assert MatchEngine(PEOPLE).rank("the and of") == (0, [])
+
+
+def test_ranked_mode_of_find_collaborators(backend):
+    backend(PEOPLE)
+
+    result = asyncio.run(server.find_collaborators("datasets mentoring", max_results=1, mode="ranked"))
+
+    assert result["mode"] == "ranked" and result["matches_found"] == 1
+    assert result["results"][0]["id"] == "filip"
+
+
+@pytest.mark.parametrize("tool", [server.find_collaborators, server.find_collaborators_batch])
+def test_unknown_modes_are_rejected(backend, tool):
+    backend(PEOPLE)
+
+    result = asyncio.run(tool(["python"] if tool is server.find_collaborators_batch else "python", mode="exact"))
+    assert result == {"error": "Unknown mode 'exact'. Use one of: keyword, ranked"}
@@ -0,0 +1,130 @@
+import asyncio
+
+import server
+from conftest import PEOPLE, profile
+from matching import MatchEngine
+from recommend import AffinityIndex, matching_items
+
+
+def _ids(suggestions):
+    return [m["profile"]["id"] for m in suggestions]
+
+
+def test_mutual_matches_come_first():
+    suggestions = MatchEngine(PEOPLE).suggest("anna")
+
+    # dan scores higher, but only bob's help flows both ways
+    assert _ids(suggestions) == ["bob", "dan"]
+    assert suggestions[1]["score"] > suggestions[0]["score"]
+    assert [m["mutual"] for m in suggestions] == [True, False]
+    assert suggestions[0]["reasons"] == [
+        "Offers what you seek: Marketing audits",
+        "Offers what you seek: Content marketing",
+        "Seeks what you offer: Python developer",
+    ]
+    assert suggestions[1]["reasons"] == ["Seeks what you offer: Code reviews"]
+
+
+def test_a_shared_concept_alone_is_not_a_match():
+    engine = MatchEngine([
+        profile("shop", seeks=["Grow my audience"]),
+        profile("seo", offers=["SEO audits"]),
+        profile("brand", offers=["Audience research", "SEO"]),
+    ])
+
+    # "audience" and "SEO" are both ~marketing, but only brand shares a word
+    assert _ids(engine.suggest("shop")) == ["brand"]
+    assert engine.suggest("shop")[0]["reasons"] == ["Offers what you seek: Audience research"]
+
+
+def test_writes_mark_only_the_affected_cached_lists_stale():
+    engine = MatchEngine(PEOPLE)
+    engine.suggest("anna")
+    engine.suggest("ewa")
+
+    engine.upsert(profile("gosia", seeks=["Django mentoring"]))
+
+    # anna offers Django; ewa shares no term with gosia
+    assert engine._affinity._stale == {engine._slot["anna"]}
+    # The stale list is served as it was until it is refreshed
+    assert "gosia" not in _ids(engine.suggest("anna"))
+    engine.refresh_suggestions()
+    assert engine.stale_suggestions == 0
+    assert "gosia" in _ids(engine.suggest("anna"))
+
+
+def test_refreshed_lists_equal_fresh_ones():
+    engine = MatchEngine(PEOPLE)
+    for p in PEOPLE:
+        engine.suggest(p["id"])
+    engine.upsert_many([profile("anna", offers=["Marketing strategy"], seeks=["Python developer"]),
+                        profile("gosia", offers=["Code reviews"], seeks=["Investors"])])
+    engine.refresh_suggestions()
+
+    fresh = MatchEngine(engine.live_profiles())
+    for p in PEOPLE:
+        assert engine.suggest(p["id"]) == fresh.suggest(p["id"])
+
+
+def test_a_rebuild_takes_over_the_cached_lists():
+    engine = MatchEngine(PEOPLE)
+    before = engine.suggest("anna")
+    engine.remove("dan")
+
+    rebuilt = MatchEngine(engine.live_profiles(), previous=engine)
+    assert rebuilt.stale_suggestions == 1
+    assert _ids(rebuilt.suggest("anna")) == _ids(before)[:1]
+    rebuilt.refresh_suggestions()
+    assert rebuilt.suggest("anna") == MatchEngine(engine.live_profiles()).suggest("anna")
+
+
+def test_removed_profiles_are_no_longer_suggested():
+    engine = MatchEngine(PEOPLE)
+    engine.suggest("anna")
+    engine.remove("bob")
+
+    assert _ids(engine.suggest("anna")) == ["dan"]
+    assert engine.suggest("bob") is None
+
+
+def test_bulk_build_equals_one_by_one():
+    bulk, single = AffinityIndex(), AffinityIndex()
+    bulk.add_many(enumerate(PEOPLE))
+    for slot, p in enumerate(PEOPLE):
+        single.add(slot, p)
+
+    assert all(bulk.top(slot) == single.top(slot) for slot in range(len(PEOPLE)))
+
+
+def test_matching_items_needs_a_word_not_just_a_concept():
+    terms = {"market", "~marketing"}
+
+    assert matching_items(["Marketing audits", "SEO", "Brand strategy"], terms) == ["Marketing audits"]
+
+
+def test_suggest_matches_tool(backend):
+    backend(PEOPLE)
+
+    async def scenario():
+        return await server.suggest_matches("anna"), await server.suggest_matches("ghost")
+
+    found, missing = asyncio.run(scenario())
+    assert [r["id"] for r in found["results"]] == ["bob", "dan"] and found["results"][0]["mutual"]
+    assert missing == {"error": "Profile 'ghost' not found."}
+
+
+def test_writes_are_refreshed_in_the_background(backend):
+    backend(PEOPLE)
+
+    async def scenario():
+        await server.suggest_matches("anna")
+        server._profile_written(profile("gosia", seeks=["Django mentoring"]))
+        # Served from the stale list while the refresh runs off the loop
+        stale = await server.suggest_matches("anna")
+        await server._suggestions_refresh
+        return stale, await server.suggest_matches("anna", max_results=20)
+
+    stale, fresh = asyncio.run(scenario())
+    assert "gosia" not in [r["id"] for r in stale["results"]]
+    assert "gosia" in [r["id"] for r in fresh["results"]]
+    assert server._match_engine.stale_suggestions == 0
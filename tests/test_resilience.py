@@ -0,0 +1,166 @@
+import asyncio
+
+import httpx
+import pytest
+
+import resilience
+import server
+from conftest import profile
+from db import APIError
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, Resilience
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _down():
+    return httpx.ConnectError("connection refused")
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record(_down())
+    breaker.before_call()
+    breaker.record()  # a success resets the count
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record(_down())
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert raised.value.retry_in == 30
+    assert breaker.stats() == {"state": "open", "consecutive_failures": 3, "opens": 1, "rejected": 1}
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.before_call()
+    breaker.record(_down())
+    clock[0] += 30
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.before_call()
+        breaker.record(TimeoutError())
+    clock[0] += 31
+    breaker.before_call()
+    breaker.record(APIError(503, "unavailable"))
+
+    assert breaker.state == "open" and breaker.opens == 2
+    clock[0] += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_cancelled_probe_frees_the_half_open_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.before_call()
+    breaker.record(_down())
+    clock[0] += 30
+    breaker.before_call()
+    breaker.abandon()
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+def test_client_errors_do_not_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.before_call()
+    breaker.record(APIError(409, "duplicate key", "23505"))
+
+    assert breaker.state == "closed" and breaker.stats()["consecutive_failures"] == 0
+
+
+def _flaky(*outcomes):
+    """send() failing or answering per outcome, recording each attempt."""
+    attempts = []
+
+    async def send(seconds):
+        outcome = outcomes[len(attempts)]
+        attempts.append(seconds)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return send, attempts
+
+
+def test_reads_are_retried_on_failures():
+    policy = Resilience(retries=2, backoff=0)
+    send, attempts = _flaky(_down(), APIError(502, "bad gateway"), "rows")
+
+    assert asyncio.run(policy.call("GET", send)) == "rows"
+    assert len(attempts) == 3 and policy.retried == 2
+
+
+@pytest.mark.parametrize("method, error", [("POST", _down()), ("GET", APIError(400, "bad filter"))])
+def test_writes_and_client_errors_are_not_retried(method, error):
+    policy = Resilience(retries=2, backoff=0)
+    send, attempts = _flaky(error, "rows")
+
+    with pytest.raises(type(error)):
+        asyncio.run(policy.call(method, send))
+    assert len(attempts) == 1
+
+
+def test_the_deadline_bounds_all_attempts():
+    policy = Resilience(retries=5, backoff=0)
+
+    async def slow(seconds):
+        await asyncio.sleep(1)
+
+    with pytest.raises(DeadlineExceeded, match="0.05 s deadline"):
+        asyncio.run(policy.call("GET", slow, timeout=0.05))
+    assert policy.deadlines_exceeded == 1
+
+
+def test_hedged_read_takes_the_first_answer():
+    policy = Resilience(hedge=True, hedge_min_delay=0.01)
+    policy._latencies.extend([0.01] * 20)
+    calls = []
+
+    async def send(seconds):
+        calls.append(1)
+        await asyncio.sleep(1 if len(calls) == 1 else 0)
+        return f"answer {len(calls)}"
+
+    assert asyncio.run(policy.call("GET", send)) == "answer 2"
+    assert policy.hedged == 1
+
+
+def test_open_circuit_serves_the_last_loaded_profiles(backend, monkeypatch):
+    policy = Resilience(retries=0, failure_threshold=1)
+    backend([profile("anna", skills=["Python"])], resilience=policy)
+    monkeypatch.setattr(server, "_resilience", policy)
+
+    async def scenario():
+        await server.get_profile("anna")
+        await server.find_collaborators("python")
+        server._profile_cache.ttl = 0  # every cached entry is now expired
+        policy.breaker.before_call()
+        policy.breaker.record(_down())
+        return await server.get_profile("anna"), await server.find_collaborators("python")
+
+    cached_profile, search = asyncio.run(scenario())
+    assert policy.breaker.state == "open" and policy.breaker.rejected == 2
+    assert cached_profile["found"] and cached_profile["stale"]
+    assert [r["id"] for r in search["results"]] == ["anna"]
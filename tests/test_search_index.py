@@ -0,0 +1,51 @@
+import asyncio
+import random
+
+import server
+from conftest import PEOPLE, baseline_search
+from search_index import NgramIndex
+
+QUERIES = ["python", "Python consulting", "marketing", "code", "saas", "dev", "co-founder", "er", "x", "nothing here"]
+
+
+def test_short_queries_are_answered_by_the_posting_list_alone():
+    index = NgramIndex(3)
+    for entry_id, text in enumerate(["python", "ansible", "typescript"]):
+        index.add(entry_id, text)
+
+    assert index.exact("py")
+    assert index.candidates("py") == {0}
+    assert index.candidates("y") == {0, 2}
+    assert index.candidates("zz") == set()
+    assert index.candidates("") is None
+
+
+def test_long_query_candidates_contain_every_real_match():
+    rng = random.Random(3)
+    words = ["".join(rng.choice("abcde") for _ in range(rng.randint(3, 9))) for _ in range(300)]
+    index = NgramIndex(3)
+    for entry_id, word in enumerate(words):
+        index.add(entry_id, word)
+
+    for query in ("abca", "dead", "bbbb", "cabde"):
+        expected = {i for i, word in enumerate(words) if query in word}
+        assert expected <= index.candidates(query)
+
+
+def test_removed_entries_are_no_longer_candidates():
+    index = NgramIndex(3)
+    index.add(1, "python")
+    index.remove(1, "python")
+
+    assert index.candidates("pyt") == set()
+    assert not index.postings
+
+
+def test_find_collaborators_matches_the_full_scan(backend):
+    backend(PEOPLE)
+
+    for query in QUERIES:
+        result = asyncio.run(server.find_collaborators(query, max_results=10))
+        expected = baseline_search(PEOPLE, query)
+        assert [(r["id"], r["score"], r["reasons"]) for r in result["results"]] == expected, query
+        assert result["matches_found"] == len(expected)
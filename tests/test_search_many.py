@@ -0,0 +1,45 @@
+import asyncio
+
+import server
+from conftest import PEOPLE, profile
+from matching import MatchEngine
+
+QUERIES = ["python", "marketing", "", "nothing here", "code", "pyhton", "saas", "er"]
+
+
+def test_search_many_equals_search_per_query():
+    engine = MatchEngine(PEOPLE)
+    engine.remove("cara")  # dead entries must not match
+
+    assert engine.search_many(QUERIES, 3) == [engine.search(q, 3) for q in QUERIES]
+    assert engine.search_many(QUERIES) == [engine.search(q) for q in QUERIES]
+
+
+def test_more_than_64_queries_are_chunked():
+    engine = MatchEngine(PEOPLE + [profile(f"p{i}", skills=[f"Skill {i:03d}"]) for i in range(100)])
+    queries = [f"skill {i:03d}" for i in range(100)]
+
+    assert engine.search_many(queries, 1) == [engine.search(q, 1) for q in queries]
+
+
+def test_batch_tool_returns_one_result_per_query(backend):
+    backend(PEOPLE)
+
+    async def scenario():
+        batch = await server.find_collaborators_batch(["python", "pyhton", "marketing"], max_results=2)
+        single = [await server.find_collaborators(q, max_results=2) for q in ["python", "pyhton", "marketing"]]
+        ranked = await server.find_collaborators_batch(["code reviews"], mode="ranked")
+        return batch, single, ranked
+
+    batch, single, ranked = asyncio.run(scenario())
+    assert batch["queries"] == 3
+    assert batch["results"] == single
+    assert ranked["results"] == [asyncio.run(server.find_collaborators("code reviews", mode="ranked"))]
+
+
+def test_batch_tool_limits_the_number_of_queries(backend):
+    backend(PEOPLE)
+
+    limit = server.MAX_BATCH_QUERIES
+    result = asyncio.run(server.find_collaborators_batch(["python"] * (limit + 1)))
+    assert result == {"error": f"Too many queries ({limit + 1}). The limit is {limit} per call."}
@@ -0,0 +1,154 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+from conftest import PEOPLE, profile
+from matching import MatchEngine
+from semantic import SemanticIndex, VectorStore, explain, features, open_vector_store
+
+
+def test_features_stem_pair_and_tag_concepts():
+    assert features("Automatyzacja sieci") == ["automa", "sieci", "automa sieci", "~automation"]
+    assert features("automatyzacji")[0] == features("Automatyzację")[0]
+    assert features("the of") == []
+
+
+def test_embeddings_are_unit_length_and_deterministic():
+    index = SemanticIndex()
+    vector = index.embed("Python consulting and code reviews")
+
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.array_equal(vector, SemanticIndex().embed("Python consulting and code reviews"))
+    assert not index.embed("").any()
+
+
+def test_related_wording_finds_the_concept():
+    engine = MatchEngine(PEOPLE)
+
+    found, results = engine.semantic_search("need someone to grow my audience", 1)
+    assert found >= 1
+    assert results[0]["profile"]["id"] == "bob"
+    assert results[0]["reasons"][0] == "Related: marketing"
+
+    _, results = engine.semantic_search("szukam kogoś do automatyzacji", 1)
+    assert results[0]["profile"]["id"] == "cara"
+
+
+def test_hash_collisions_are_not_reported_as_results():
+    # matches_found may count a bucket collision; results need a shared concept or word
+    assert MatchEngine(PEOPLE).semantic_search("zzzz qqqq", 5)[1] == []
+
+
+def test_explain_names_shared_concepts_then_words():
+    assert explain("python data", PEOPLE[5]) == ["Related: data", "Related: development", "Word: data", "Word: python"]
+    # seeks is what the profile wants, not what it is
+    assert explain("mentoring", PEOPLE[5]) == []
+
+
+def test_removed_profiles_drop_out():
+    engine = MatchEngine(PEOPLE)
+    engine.remove("bob")
+
+    assert "bob" not in [r["profile"]["id"] for r in engine.semantic_search("marketing", 10)[1]]
+
+
+def test_rebuild_reuses_vectors_of_unchanged_profiles(monkeypatch):
+    old = MatchEngine(PEOPLE)
+    embedded = []
+    original = SemanticIndex.embed
+    monkeypatch.setattr(SemanticIndex, "embed", lambda self, text: embedded.append(text) or original(self, text))
+
+    changed = [profile("anna", skills=["Rust"]), *PEOPLE[1:], profile("zoe", offers=["Growth marketing"])]
+    new = MatchEngine(changed, previous=old)
+
+    # Only the edited and the added profile were embedded again
+    assert len(embedded) == 2
+    fresh = MatchEngine(changed)
+    assert new.semantic_search("marketing audience") == fresh.semantic_search("marketing audience")
+    assert np.array_equal(new._semantic.vector(1), old._semantic.vector(1))
+
+
+@pytest.fixture
+def count_embeddings(monkeypatch):
+    embedded = []
+    original = SemanticIndex.embed
+    monkeypatch.setattr(SemanticIndex, "embed", lambda self, text: embedded.append(text) or original(self, text))
+    return embedded
+
+
+def test_stored_vectors_survive_a_restart(tmp_path, count_embeddings):
+    store = VectorStore(str(tmp_path))
+    first = MatchEngine(PEOPLE, vector_store=store)
+    store.close()
+    assert len(count_embeddings) == len(PEOPLE)
+
+    store = VectorStore(str(tmp_path))
+    changed = [profile("anna", skills=["Rust"]), *PEOPLE[1:]]
+    restarted = MatchEngine(changed, vector_store=store)
+
+    # Only the profile whose text changed was embedded again
+    assert count_embeddings[len(PEOPLE):] == ["Rust"]
+    assert np.array_equal(restarted._semantic.vector(1), first._semantic.vector(1))
+    assert restarted.semantic_search("marketing audience") == MatchEngine(changed).semantic_search("marketing audience")
+
+
+def test_store_grows_and_compacts_on_open(tmp_path):
+    store = VectorStore(str(tmp_path), dimensions=4, capacity=2)
+    for version in range(9):
+        store.put("anna", f"v{version}", np.full(4, version, dtype=np.float32))
+    store.put("bob", "b", np.ones(4, dtype=np.float32))
+    store.close()
+
+    store = VectorStore(str(tmp_path), dimensions=4, capacity=2)
+    assert len(store) == 2 and store._count == 2
+    assert store.get("anna", "v8").tolist() == [8.0] * 4
+    assert store.get("anna", "v7") is None
+    assert store.get("bob", "b").tolist() == [1.0] * 4
+    assert len(list(tmp_path.glob("vectors-*.f32"))) == 1
+
+
+def test_a_cut_off_key_line_is_ignored(tmp_path):
+    store = VectorStore(str(tmp_path), dimensions=4)
+    store.put("anna", "a", np.ones(4, dtype=np.float32))
+    store.close()
+    with open(tmp_path / "vectors.keys", "a") as f:
+        f.write('[1, 12')
+
+    assert VectorStore(str(tmp_path), dimensions=4).get("anna", "a").tolist() == [1.0] * 4
+
+
+def test_one_process_owns_a_store_directory(tmp_path, capsys):
+    owner = VectorStore(str(tmp_path))
+
+    assert open_vector_store(str(tmp_path)) is None
+    assert "kept in memory only" in capsys.readouterr().err
+    assert open_vector_store("") is None
+    owner.close()
+    reopened = open_vector_store(str(tmp_path))
+    assert reopened is not None
+    reopened.close()
+
+
+def test_written_profiles_are_stored(backend, tmp_path, monkeypatch):
+    backend(PEOPLE)
+    store = VectorStore(str(tmp_path))
+    monkeypatch.setattr(server, "_vector_store", store)
+
+    async def scenario():
+        await server.get_match_engine()
+        server._profile_written(profile("zoe", offers=["Growth marketing"]))
+
+    asyncio.run(scenario())
+    assert len(store) == len(PEOPLE) + 1
+    assert store.get("zoe", "Growth marketing") is not None
+
+
+def test_semantic_tool(backend):
+    backend(PEOPLE)
+
+    result = asyncio.run(server.find_collaborators_semantic("looking for investors", max_results=1))
+
+    assert result["matches_found"] >= 1
+    assert result["results"][0]["id"] == "dan"
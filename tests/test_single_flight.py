@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import server
+from conftest import PEOPLE, record_round_trips
+from single_flight import SingleFlight
+
+
+def test_concurrent_coroutines_share_one_fetch():
+    flights = SingleFlight()
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do_async("profiles", fetch) for _ in range(20)))
+
+    results = asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.stats() == {"calls": 1, "shared": 19, "shared_ratio": 0.95, "in_flight": 0}
+
+
+def test_concurrent_threads_share_one_fetch():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    fetches, results = [], []
+
+    def fetch():
+        fetches.append(1)
+        started.set()
+        release.wait(5)
+        return "rows"
+
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", fetch)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", fetch))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    while flights.shared < 5:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert fetches == [1] and results == ["rows"] * 6
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flights = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise ConnectionError("down")
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do_async("k", failing) for _ in range(3)), return_exceptions=True)
+
+    assert [type(e) for e in asyncio.run(scenario())] == [ConnectionError] * 3
+    with pytest.raises(ConnectionError):
+        asyncio.run(flights.do_async("k", failing))
+    assert len(attempts) == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "rows"
+
+    async def scenario():
+        impatient = asyncio.ensure_future(flights.do_async("k", fetch))
+        patient = asyncio.ensure_future(flights.do_async("k", fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(scenario()) == "rows"
+
+
+def test_forget_starts_a_fresh_call_for_later_callers():
+    flights = SingleFlight()
+    versions = iter(["old", "new"])
+
+    async def fetch():
+        value = next(versions)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        before = asyncio.ensure_future(flights.do_async("k", fetch))
+        await asyncio.sleep(0)
+        flights.forget("k")
+        return await before, await flights.do_async("k", fetch)
+
+    assert asyncio.run(scenario()) == ("old", "new")
+
+
+def test_concurrent_cold_searches_load_the_profiles_once(backend):
+    backend(PEOPLE)
+    calls = record_round_trips()
+
+    async def scenario():
+        return await asyncio.gather(*(server.find_collaborators(q) for q in ["python", "marketing", "code"] * 4))
+
+    results = asyncio.run(scenario())
+    assert all("results" in r for r in results)
+    assert calls == [("GET", "/profiles")]
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.postgres
+
+PROFILES = [("anna", "Anna", "Developer", None), ("bob", "Bob", "Designer", "bob@example.com")]
+
+
+@pytest.fixture
+def db(postgres):
+    conn = postgres("001_send_connection_request.sql", "002_respond_to_connection_request.sql")
+    conn.cursor().executemany("insert into profiles (id, name, role, email) values (%s, %s, %s, %s)", PROFILES)
+    return conn
+
+
+def _send(conn, from_user, to_user, message="Hi"):
+    return conn.execute("select send_connection_request(%s, %s, %s)", (from_user, to_user, message)).fetchone()[0]
+
+
+def _respond(conn, request_id, accept=True, message="", share_email=False):
+    return conn.execute("select respond_to_connection_request(%s, %s, %s, %s)",
+                        (request_id, accept, message, share_email)).fetchone()[0]
+
+
+def _statuses(conn):
+    return [row[0] for row in conn.execute("select status from connection_requests order by created_at")]
+
+
+def test_send_inserts_one_pending_request(db):
+    result = _send(db, "anna", "bob")
+
+    assert result["status"] == "sent"
+    assert result["to_user"] == {"id": "bob", "name": "Bob", "role": "Designer"}
+    row = db.execute("select from_user, to_user, status, message from connection_requests where id = %s",
+                     (result["request_id"],)).fetchone()
+    assert row == ("anna", "bob", "pending", "Hi")
+
+
+def test_send_reports_unknown_profiles_and_duplicates(db):
+    assert _send(db, "ghost", "bob") == {"status": "from_not_found"}
+    assert _send(db, "anna", "ghost") == {"status": "to_not_found"}
+
+    _send(db, "anna", "bob")
+    assert _send(db, "anna", "bob", "Again") == {"status": "duplicate"}
+    assert _statuses(db) == ["pending"]
+
+    # Only pending requests are unique; an answered one does not block a new one
+    db.execute("update connection_requests set status = 'declined'")
+    assert _send(db, "anna", "bob")["status"] == "sent"
+    assert _statuses(db) == ["declined", "pending"]
+
+
+def test_concurrent_sends_insert_one_request(postgres, db):
+    other = postgres()
+    results = {}
+
+    with db.transaction():
+        results["first"] = _send(db, "anna", "bob")
+        # The second insert waits on the pending-pair index until the first commits
+        second = threading.Thread(target=lambda: results.update(second=_send(other, "anna", "bob")))
+        second.start()
+        time.sleep(0.2)
+        assert second.is_alive()
+    second.join(10)
+
+    assert results["first"]["status"] == "sent"
+    assert results["second"] == {"status": "duplicate"}
+    assert _statuses(db) == ["pending"]
+
+
+def test_respond_shares_the_email_in_the_same_update(db):
+    request_id = _send(db, "anna", "bob")["request_id"]
+
+    result = _respond(db, request_id, message="Sure", share_email=True)
+
+    assert result == {"status": "ok", "from_user": "anna", "to_user": "bob", "from_name": "Anna",
+                      "contact_shared": {"email": "bob@example.com"}}
+    row = db.execute("select status, response_message, contact_shared, responded_at is not null "
+                     "from connection_requests where id = %s", (request_id,)).fetchone()
+    assert row == ("accepted", "Sure", {"email": "bob@example.com"}, True)
+
+
+def test_respond_shares_nothing_without_an_email_or_when_declining(db):
+    to_anna = _send(db, "bob", "anna")["request_id"]
+    to_bob = _send(db, "anna", "bob")["request_id"]
+
+    assert _respond(db, to_anna, share_email=True)["contact_shared"] == {}
+    assert _respond(db, to_bob, accept=False, share_email=True)["contact_shared"] == {}
+    assert _statuses(db) == ["accepted", "declined"]
+
+
+def test_respond_answers_once(db):
+    request_id = _send(db, "anna", "bob")["request_id"]
+    _respond(db, request_id, accept=False)
+
+    assert _respond(db, request_id) == {"status": "already_responded", "request_status": "declined"}
+    assert _respond(db, "nope") == {"status": "not_found"}
+    assert _statuses(db) == ["declined"]
+
+
+def test_concurrent_responds_answer_once(postgres, db):
+    request_id = _send(db, "anna", "bob")["request_id"]
+    other = postgres()
+    results = {}
+
+    with db.transaction():
+        results["accept"] = _respond(db, request_id)
+        # The second update waits on the row lock, then sees it answered
+        second = threading.Thread(target=lambda: results.update(decline=_respond(other, request_id, accept=False)))
+        second.start()
+        time.sleep(0.2)
+        assert second.is_alive()
+    second.join(10)
+
+    assert results["accept"]["status"] == "ok"
+    assert results["decline"] == {"status": "already_responded", "request_status": "accepted"}
+    assert _statuses(db) == ["accepted"]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+
+from db import Database
+from tracing import JsonlExporter, OtlpExporter, Tracer, TracingMiddleware, format_tree
+
+
+class _Collect:
+    def __init__(self):
+        self.roots = []
+
+    def export(self, root):
+        self.roots.append(root)
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.span("tool x") as span:
+        tracer.record("GET profiles", 0.1, {})
+    assert not tracer.enabled and span is None
+
+
+def test_nested_spans_form_one_tree_per_root():
+    exported = _Collect()
+    tracer = Tracer([exported])
+
+    with tracer.span("tool find", tool="find"):
+        with tracer.span("match_engine.build", profiles=3):
+            pass
+        tracer.record("GET profiles", 0.01, {"rows": 3})
+    with pytest.raises(ValueError), tracer.span("tool broken"):
+        raise ValueError("bad input")
+
+    first, second = exported.roots
+    assert [c.name for c in first.children] == ["match_engine.build", "GET profiles"]
+    assert {s.trace_id for s in first.walk()} == {first.trace_id} != {second.trace_id}
+    assert all(c.parent_id == first.span_id for c in first.children)
+    assert second.error == "ValueError: bad input"
+
+
+def test_round_trips_become_child_spans_with_their_query():
+    exported = _Collect()
+    tracer = Tracer([exported])
+    database = Database("http://postgrest.test", "key", transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b'[{"id":"a"},{"id":"b"}]')
+    ))
+    database.add_listener(tracer.on_round_trip)
+
+    async def scenario():
+        await database.table("profiles").select("id").eq("id", "a").execute()  # outside any trace
+        with tracer.span("tool get_profile"):
+            await database.table("profiles").select("id, name").eq("role", "dev").limit(2).execute()
+
+    asyncio.run(scenario())
+    root, = exported.roots
+    child, = root.children
+    assert child.name == "GET profiles"
+    assert child.attributes == {"status": 200, "rows": 2, "bytes": 23, "filters": "role=eq.dev", "select": "id,name"}
+
+
+def test_jsonl_export_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer([JsonlExporter(str(path))])
+
+    with tracer.span("tool a"):
+        tracer.record("GET profiles", 0.002, {"rows": 1})
+
+    root, child = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (root["name"], root["parent_span_id"]) == ("tool a", None)
+    assert (child["name"], child["parent_span_id"], child["trace_id"]) == ("GET profiles", root["span_id"],
+                                                                           root["trace_id"])
+    assert child["duration_ms"] == pytest.approx(2, abs=0.5)
+
+
+def test_slow_calls_print_their_tree(capsys):
+    tracer = Tracer(slow_ms=0)
+
+    with tracer.span("tool find", tool="find"):
+        tracer.record("GET profiles", 0.5, {"status": 200, "select": "*", "filters": ""})
+
+    err = capsys.readouterr().err.splitlines()
+    assert err[0].startswith("SLOW trace ")
+    assert err[1].startswith("tool find ") and err[1].endswith("tool=find")
+    assert err[2].startswith("  GET profiles 500.0 ms  status=200  select=*")
+
+
+def test_format_tree_marks_errors():
+    tracer = Tracer([_Collect()])
+    with tracer.span("tool a") as root:
+        tracer.record("POST rpc/x", 0.001, {}, error="APIError: boom")
+
+    assert format_tree(root).splitlines()[1].endswith("ERROR APIError: boom")
+
+
+def test_otlp_payload_uses_the_otlp_json_shape():
+    exporter = OtlpExporter("http://collector.test/v1/traces", service="svc")
+    tracer = Tracer([_Collect()])
+    with tracer.span("tool a", tool="a") as root:
+        tracer.record("GET profiles", 0.001, {"rows": 3, "cached": False, "ratio": 0.5, "status": None})
+
+    payload = exporter._payload([root])
+    resource, = payload["resourceSpans"]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "svc"}}]
+    server_span, client_span = resource["scopeSpans"][0]["spans"]
+    assert (server_span["kind"], client_span["kind"]) == (2, 3)
+    assert client_span["parentSpanId"] == server_span["spanId"]
+    assert client_span["attributes"] == [
+        {"key": "rows", "value": {"intValue": "3"}},
+        {"key": "cached", "value": {"boolValue": False}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+
+
+def test_middleware_traces_tool_calls_and_their_errors():
+    exported = _Collect()
+    app = FastMCP("test")
+    app.add_middleware(TracingMiddleware(Tracer([exported])))
+
+    @app.tool
+    def lookup(name: str) -> dict:
+        return {"error": f"'{name}' not found"} if name == "ghost" else {"name": name}
+
+    async def scenario():
+        async with Client(app) as client:
+            await client.call_tool("lookup", {"name": "anna"})
+            await client.call_tool("lookup", {"name": "ghost"}, raise_on_error=False)
+
+    asyncio.run(scenario())
+    assert [(r.name, r.error) for r in exported.roots] == [("tool lookup", None), ("tool lookup", "'ghost' not found")]
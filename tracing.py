@@ -0,0 +1,259 @@
+"""
+The Backroom - Request tracing
+One span tree per MCP tool call: the call is the root span, every Supabase
+round trip (table, filters, selected columns, rows, bytes, status) and
+other instrumented steps (match engine builds) are its children.
+
+Finished trees go to the configured exporters - a local JSONL file (one
+span per line, OpenTelemetry field names) and/or an OTLP/HTTP JSON
+collector - and trees slower than the slow-call threshold are printed to
+stderr, so sequential round trips and oversized selects are visible at a
+glance:
+
+    SLOW trace 4bf92f35...
+    tool find_collaborators 2013.4 ms  tool=find_collaborators
+      GET profiles 1987.0 ms  status=200  rows=5000  bytes=9812345  select=*
+      match_engine.build 21.3 ms  profiles=5000
+
+A disabled Tracer (no exporter, no threshold) costs one attribute check.
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import httpx
+from fastmcp.server.middleware import Middleware
+
+from metrics import is_error_result
+
+# Query parameters that are not filters
+_MODIFIERS = {"select", "order", "limit", "offset"}
+
+_current_span = contextvars.ContextVar("backroom_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error", "children")
+
+    def __init__(self, name: str, parent: "Span" = None, attributes: dict = None, start: float = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start = start if start is not None else time.time()
+        self.end = None
+        self.attributes = attributes or {}
+        self.error = None
+        self.children = []
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+    def walk(self):
+        """This span and all its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def format_tree(root: Span) -> str:
+    """Indented one-line-per-span rendering, children in start order."""
+    lines = []
+
+    def render(span: Span, depth: int):
+        attributes = "  ".join(f"{k}={v}" for k, v in span.attributes.items() if v not in (None, ""))
+        error = f"  ERROR {span.error}" if span.error else ""
+        lines.append(f"{'  ' * depth}{span.name} {span.duration_ms:.1f} ms  {attributes}{error}".rstrip())
+        for child in sorted(span.children, key=lambda c: c.start):
+            render(child, depth + 1)
+
+    render(root, 0)
+    return "\n".join(lines)
+
+
+class JsonlExporter:
+    """Appends every span of a finished trace to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, root: Span):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in root.walk())
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class OtlpExporter:
+    """
+    Posts finished traces to an OTLP/HTTP JSON endpoint (e.g.
+    http://collector:4318/v1/traces) from a background thread, so tool
+    calls never wait for the collector. Traces are dropped when the queue
+    is full or the collector fails.
+    """
+
+    def __init__(self, url: str, service: str = "the-backroom", max_queue: int = 1000, timeout: float = 5.0):
+        self.url = url
+        self.service = service
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        threading.Thread(target=self._run, name="otlp-exporter", daemon=True).start()
+
+    def export(self, root: Span):
+        try:
+            self._queue.put_nowait(root)
+        except queue.Full:
+            self.dropped += 1
+
+    def _payload(self, roots: list) -> dict:
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        spans = []
+        for root in roots:
+            for span in root.walk():
+                spans.append({
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": 2 if span.parent_id is None else 3,  # SERVER / CLIENT
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int((span.end or span.start) * 1e9)),
+                    "attributes": [{"key": k, "value": value(v)} for k, v in span.attributes.items() if v is not None],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service}}]},
+            "scopeSpans": [{"scope": {"name": "backroom.tracing"}, "spans": spans}],
+        }]}
+
+    def _run(self):
+        with httpx.Client(timeout=self.timeout) as client:
+            while True:
+                roots = [self._queue.get()]
+                while len(roots) < 100 and not self._queue.empty():
+                    roots.append(self._queue.get_nowait())
+                try:
+                    client.post(self.url, json=self._payload(roots)).raise_for_status()
+                except Exception as e:
+                    self.dropped += len(roots)
+                    print(f"Trace export failed: {e}", file=sys.stderr)
+
+
+class Tracer:
+    """Builds span trees per tool call and hands finished ones to exporters."""
+
+    def __init__(self, exporters: list = (), slow_ms: float = None):
+        """
+        Args:
+            exporters: objects with export(root_span)
+            slow_ms: print the span tree of calls at least this slow (None = never)
+        """
+        self.exporters = list(exporters)
+        self.slow_ms = slow_ms
+        self.enabled = bool(self.exporters) or slow_ms is not None
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        """Child of the current span (a new trace when there is none)."""
+        if not self.enabled:
+            yield None
+            return
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        if parent is not None:
+            parent.children.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = span.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(token)
+            if parent is None:
+                self._finish(span)
+
+    def record(self, name: str, seconds: float, attributes: dict, error: str = None):
+        """Add an already finished child to the current span (ignored outside traces)."""
+        parent = _current_span.get()
+        if parent is None:
+            return
+        end = time.time()
+        span = Span(name, parent, attributes, start=end - seconds)
+        span.end = end
+        span.error = error
+        parent.children.append(span)
+
+    def on_round_trip(self, round_trip: dict):
+        """db.Database listener: one child span per Supabase round trip."""
+        if _current_span.get() is None:
+            return
+        params = round_trip["params"] or []
+        select = next((v for k, v in params if k == "select"), None)
+        filters = ", ".join(f"{k}={v}" for k, v in params if k not in _MODIFIERS)
+        error = round_trip["error"]
+        self.record(
+            f"{round_trip['method']} {round_trip['path'].lstrip('/')}",
+            round_trip["seconds"],
+            {
+                "status": round_trip["status"],
+                "rows": round_trip["rows"],
+                "bytes": round_trip["bytes_received"],
+                "filters": filters,
+                "select": select,
+            },
+            error=f"{type(error).__name__}: {error}" if error is not None else None
+        )
+
+    def _finish(self, root: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(root)
+            except Exception as e:
+                print(f"Trace export failed: {e}", file=sys.stderr)
+        if self.slow_ms is not None and root.duration_ms >= self.slow_ms:
+            print(f"SLOW trace {root.trace_id}\n{format_tree(root)}", file=sys.stderr)
+
+
+class TracingMiddleware(Middleware):
+    """FastMCP middleware making every tools/call a root span."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+
+    async def on_call_tool(self, context, call_next):
+        with self.tracer.span(f"tool {context.message.name}", tool=context.message.name) as span:
+            result = await call_next(context)
+            if span is not None and is_error_result(result):
+                structured = getattr(result, "structured_content", None)
+                span.error = str(structured.get("error")) if isinstance(structured, dict) else "tool error"
+            return result